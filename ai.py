@@ -0,0 +1,153 @@
+import argparse
+import os
+import random
+import threading
+import time
+from array import array
+from game_client import GameClient
+from game import BitBoard, SYMMETRIES, _HAS_WIN, _LEGAL_MOVES
+
+
+def negamax(x, o, table):
+    board = BitBoard(x, o)
+    key, sym = board.canonical()
+    entry = table.get(key)
+    if entry is not None:
+        return entry[0]
+    x_to_move = board.turn() == 'X'
+    mover, other = (x, o) if x_to_move else (o, x)
+    if _HAS_WIN[other]:
+        score = -(1 + len(_LEGAL_MOVES[x | o]))
+        table[key] = (score, 0)
+        return score
+    moves = _LEGAL_MOVES[x | o]
+    if not moves:
+        table[key] = (0, 0)
+        return 0
+    best, best_mask = None, 0
+    for pos in moves:
+        placed = mover | 1 << pos
+        child = -(negamax(placed, o, table) if x_to_move else negamax(x, placed, table))
+        if best is None or child > best:
+            best, best_mask = child, 0
+        if child == best:
+            best_mask |= 1 << pos
+    perm = SYMMETRIES[sym]
+    canonical_mask = sum(1 << i for i in range(9) if best_mask >> perm[i] & 1)
+    table[key] = (best, canonical_mask)
+    return best
+
+
+class Solver:
+    def __init__(self, path=None):
+        self.table = {}
+        if path and os.path.exists(path):
+            self.load(path)
+        else:
+            negamax(0, 0, self.table)
+
+    def save(self, path):
+        packed = array('I', (key | (score + 16) << 18 | mask << 23 for key, (score, mask) in self.table.items()))
+        with open(path, 'wb') as f:
+            packed.tofile(f)
+
+    def load(self, path):
+        packed = array('I')
+        with open(path, 'rb') as f:
+            packed.frombytes(f.read())
+        self.table = {v & 0x3FFFF: (((v >> 18) & 0x1F) - 16, v >> 23) for v in packed}
+
+    def lookup(self, board):
+        key, sym = board.canonical()
+        score, mask = self.table[key]
+        perm = SYMMETRIES[sym]
+        return score, [perm[i] for i in range(9) if mask >> i & 1]
+
+    def score(self, board):
+        return self.lookup(board)[0]
+
+    def best_moves(self, board):
+        return self.lookup(board)[1]
+
+    def best_move(self, board, rng=random):
+        moves = self.best_moves(board)
+        return rng.choice(moves) if moves else None
+
+
+_solver = None
+
+
+def get_solver():
+    global _solver
+    if _solver is None:
+        _solver = Solver()
+    return _solver
+
+
+class BotClient(GameClient):
+    def __init__(self, host='localhost', port=5000, solver=None, seed=None, rematch=True, max_games=None):
+        super().__init__(host, port)
+        self.solver = solver or get_solver()
+        self.rng = random.Random(seed)
+        self.rematch = rematch
+        self.max_games = max_games
+        self.games_played = 0
+        self.results = {'win': 0, 'loss': 0, 'draw': 0}
+        self.done = threading.Event()
+
+    def handle_msg(self, msg):
+        super().handle_msg(msg)
+        t = msg.get('type')
+        if t == 'round_over':
+            self.games_played += 1
+            if msg['winner'] == 'Draw':
+                self.results['draw'] += 1
+            elif msg['winner'] == self.symbol:
+                self.results['win'] += 1
+            else:
+                self.results['loss'] += 1
+            if self.max_games and self.games_played >= self.max_games:
+                self.done.set()
+            elif self.rematch:
+                self.vote_restart()
+        elif t == 'restart_vote' and self.rematch and not self.done.is_set():
+            self.vote_restart()
+        self.play()
+
+    def play(self):
+        if self.game_active and self.my_turn and self.board.winner() is None:
+            move = self.solver.best_move(self.board, self.rng)
+            if move is not None:
+                self.send_move(move)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfect-play bot clients")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--bots', type=int, default=1)
+    parser.add_argument('--games', type=int, default=0, help="games per bot (0 = play forever)")
+    parser.add_argument('--table', help="solver table file to load or generate")
+    args = parser.parse_args()
+
+    solver = Solver(args.table)
+    if args.table and not os.path.exists(args.table):
+        solver.save(args.table)
+    bots = [BotClient(args.host, args.port, solver, seed=i, max_games=args.games or None) for i in range(args.bots)]
+    start = time.time()
+    for bot in bots:
+        if not bot.connect():
+            print(f"Connection to {args.host}:{args.port} failed")
+            raise SystemExit(1)
+    try:
+        for bot in bots:
+            while not bot.done.wait(0.5):
+                pass
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.time() - start
+    games = sum(bot.games_played for bot in bots) // 2
+    print(f"{games} games in {elapsed:.1f}s ({games / elapsed:.1f} games/s)")
+    for bot in bots:
+        print(f"Bot {bot.symbol}: {bot.results}")
+        bot.disconnect()
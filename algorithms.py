@@ -1,4 +1,187 @@
+import binascii
+import struct
+import zlib
+from math import gcd
+
+_PARITY = bytes(bin(i).count('1') & 1 for i in range(256))
+
+class BitBuffer:
+    __slots__ = ('data', 'nbits')
+
+    def __init__(self, data=b'', nbits=None):
+        self.data = bytearray(data)
+        if nbits is None:
+            nbits = len(self.data) * 8
+        if not 0 <= nbits <= len(self.data) * 8:
+            raise ValueError(f'nbits={nbits} does not fit in {len(self.data)} bytes')
+        self.nbits = nbits
+        del self.data[(nbits + 7) // 8:]
+        pad = -nbits % 8
+        if pad:
+            self.data[-1] &= (0xFF << pad) & 0xFF
+
+    @classmethod
+    def from_bits(cls, bits):
+        n = len(bits)
+        if not n:
+            return cls()
+        pad = -n % 8
+        return cls((int(bits, 2) << pad).to_bytes((n + pad) // 8, 'big'), n)
+
+    @classmethod
+    def from_int(cls, value, nbits):
+        pad = -nbits % 8
+        value &= (1 << nbits) - 1
+        return cls((value << pad).to_bytes((nbits + pad) // 8, 'big'), nbits)
+
+    @classmethod
+    def from_text(cls, text):
+        try:
+            return cls(text.encode('latin-1'))
+        except UnicodeEncodeError:
+            return cls.from_bits(''.join(format(ord(c), '08b') for c in text))
+
+    def to_int(self):
+        return int.from_bytes(self.data, 'big') >> (len(self.data) * 8 - self.nbits)
+
+    def to_bits(self):
+        return format(self.to_int(), f'0{self.nbits}b') if self.nbits else ''
+
+    def to_text(self):
+        return self.data[:self.nbits // 8].decode('latin-1')
+
+    def copy(self):
+        return BitBuffer(self.data, self.nbits)
+
+    def count(self):
+        return bin(int.from_bytes(self.data, 'big')).count('1')
+
+    def flip(self, position):
+        self.data[position >> 3] ^= 0x80 >> (position & 7)
+
+    def __len__(self):
+        return self.nbits
+
+    def __bytes__(self):
+        return bytes(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.nbits)
+            if step != 1:
+                raise ValueError('BitBuffer slices must be contiguous')
+            stop = max(start, stop)
+            if start % 8 == 0 and (stop % 8 == 0 or stop == self.nbits):
+                return BitBuffer(self.data[start // 8:(stop + 7) // 8], stop - start)
+            end = (stop + 7) // 8
+            chunk = int.from_bytes(self.data[start // 8:end], 'big')
+            return BitBuffer.from_int(chunk >> (end * 8 - stop), stop - start)
+        if index < 0:
+            index += self.nbits
+        if not 0 <= index < self.nbits:
+            raise IndexError('BitBuffer index out of range')
+        return (self.data[index >> 3] >> (7 - (index & 7))) & 1
+
+    def __add__(self, other):
+        other = to_packed(other)
+        if self.nbits % 8 == 0:
+            return BitBuffer(self.data + other.data, self.nbits + other.nbits)
+        return BitBuffer.from_int((self.to_int() << other.nbits) | other.to_int(), self.nbits + other.nbits)
+
+    def __xor__(self, other):
+        other = to_packed(other)
+        if other.nbits != self.nbits:
+            raise ValueError('BitBuffer XOR requires equal lengths')
+        value = int.from_bytes(self.data, 'big') ^ int.from_bytes(other.data, 'big')
+        return BitBuffer(value.to_bytes(len(self.data), 'big'), self.nbits)
+
+    def __eq__(self, other):
+        if isinstance(other, BitBuffer):
+            return self.nbits == other.nbits and self.data == other.data
+        if isinstance(other, str):
+            return self.to_bits() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        bits = self.to_bits()
+        if len(bits) > 64:
+            bits = bits[:64] + '...'
+        return f'BitBuffer({bits!r}, nbits={self.nbits})'
+
+def to_packed(data):
+    if isinstance(data, BitBuffer):
+        return data
+    if isinstance(data, str):
+        return BitBuffer.from_bits(data)
+    return BitBuffer(data)
+
+def pack_bits(bits):
+    return BitBuffer.from_bits(bits)
+
+def unpack_bits(buf):
+    return buf.to_bits() if isinstance(buf, BitBuffer) else buf
+
+def _join_fields(fields):
+    out = bytearray()
+    value = nbits = 0
+    for field, width in fields:
+        value = (value << width) | field
+        nbits += width
+        if nbits >= 64:
+            keep = nbits & 7
+            out += (value >> keep).to_bytes(nbits >> 3, 'big')
+            value &= (1 << keep) - 1
+            nbits = keep
+    total = len(out) * 8 + nbits
+    if nbits:
+        pad = -nbits % 8
+        out += (value << pad).to_bytes((nbits + pad) // 8, 'big')
+    return BitBuffer(out, total)
+
+def _pack_units(units, width, tail=0, tail_bits=0):
+    out = bytearray()
+    value = 0
+    for i, unit in enumerate(units, 1):
+        value = (value << width) | unit
+        if not i & 7:
+            out += value.to_bytes(width, 'big')
+            value = 0
+    nbits = len(units) % 8 * width + tail_bits
+    if nbits:
+        pad = -nbits % 8
+        out += (((value << tail_bits) | tail) << pad).to_bytes((nbits + pad) // 8, 'big')
+    return BitBuffer(out, len(units) * width + tail_bits)
+
+def _unpack_units(buf, width):
+    data = buf.data
+    n = buf.nbits // width
+    if width == 8:
+        units = list(data[:n])
+        full = n
+    else:
+        group = 8 // gcd(width, 8)
+        group_bytes = group * width // 8
+        mask = (1 << width) - 1
+        shifts = range((group - 1) * width, -1, -width)
+        units = []
+        full = n - n % group
+        for off in range(0, full // group * group_bytes, group_bytes):
+            acc = int.from_bytes(data[off:off + group_bytes], 'big')
+            units.extend((acc >> s) & mask for s in shifts)
+    start = full * width
+    rest = buf.nbits - start
+    acc = int.from_bytes(data[start // 8:], 'big') >> (len(data) * 8 - buf.nbits)
+    for _ in range(n - full):
+        rest -= width
+        units.append((acc >> rest) & ((1 << width) - 1))
+    return units, acc & ((1 << rest) - 1), rest
+
 def calculate_parity(data_bits, parity_type='even'):
+    if isinstance(data_bits, BitBuffer):
+        odd = data_bits.count() & 1
+        return BitBuffer.from_int(odd if parity_type == 'even' else 1 - odd, 1)
     ones_count = data_bits.count('1')
     if parity_type == 'even':
         return '1' if ones_count % 2 != 0 else '0'
@@ -8,25 +191,218 @@ def calculate_parity(data_bits, parity_type='even'):
 def check_parity(data_with_parity, parity_type='even'):
     return calculate_parity(data_with_parity, parity_type) == '0'
 
+def _reflect(value, width):
+    result = 0
+    for _ in range(width):
+        result = (result << 1) | (value & 1)
+        value >>= 1
+    return result
+
+class CRC:
+    def __init__(self, width, poly, init=0, refin=False, refout=None, xorout=0, name=None, slices=4):
+        if width < 1 or not 0 <= poly < (1 << width):
+            raise ValueError(f'Invalid CRC generator: width={width}, poly={poly:#x}')
+        self.width = width
+        self.poly = poly
+        self.init = init
+        self.refin = refin
+        self.refout = refin if refout is None else refout
+        self.xorout = xorout
+        self.name = name or f'crc{width}'
+        self.mask = (1 << width) - 1
+        self.native = None
+        if refin:
+            self.reg_width = width
+            self.reg_poly = _reflect(poly, width)
+            self.reg_init = _reflect(init, width)
+        else:
+            self.reg_width = max(8, (width + 7) // 8 * 8)
+            self.reg_poly = poly << (self.reg_width - width)
+            self.reg_init = init << (self.reg_width - width)
+        self.reg_mask = (1 << self.reg_width) - 1
+        self.slices = 1
+        if slices > 1 and self.reg_width % 8 == 0 and self.reg_width >= 16:
+            self.slices = min(slices, self.reg_width // 8)
+        self.tables = self._build_tables()
+        self.table = self.tables[0]
+
+    def __repr__(self):
+        return f'CRC({self.name}, width={self.width}, poly={self.poly:#x})'
+
+    def _build_tables(self):
+        top = 1 << (self.reg_width - 1)
+        table = []
+        for i in range(256):
+            if self.refin:
+                reg = i
+                for _ in range(8):
+                    reg = (reg >> 1) ^ self.reg_poly if reg & 1 else reg >> 1
+            else:
+                reg = i << (self.reg_width - 8)
+                for _ in range(8):
+                    reg = ((reg << 1) ^ self.reg_poly) & self.reg_mask if reg & top else (reg << 1) & self.reg_mask
+            table.append(reg)
+        tables = [table]
+        for _ in range(1, self.slices):
+            prev = tables[-1]
+            if self.refin:
+                tables.append([table[v & 0xFF] ^ (v >> 8) for v in prev])
+            else:
+                hi = self.reg_width - 8
+                tables.append([table[v >> hi] ^ ((v << 8) & self.reg_mask) for v in prev])
+        return tables
+
+    def start(self):
+        return self.reg_init
+
+    def update(self, reg, data):
+        data = memoryview(data).cast('B')
+        n = len(data)
+        i = 0
+        if self.slices > 1 and n >= 16 * self.slices:
+            i = n - n % self.slices
+            reg = self._update_sliced(reg, data[:i])
+        table = self.table
+        if self.refin:
+            for b in data[i:]:
+                reg = table[(reg ^ b) & 0xFF] ^ (reg >> 8)
+        else:
+            hi = self.reg_width - 8
+            mask = self.reg_mask
+            for b in data[i:]:
+                reg = table[(reg >> hi) ^ b] ^ ((reg << 8) & mask)
+        return reg
+
+    def _update_sliced(self, reg, data):
+        k = self.slices
+        tables = self.tables[::-1]
+        if self.refin:
+            order = 'little'
+            shifts = [8 * j for j in range(k)]
+        else:
+            order = 'big'
+            shifts = [self.reg_width - 8 * (j + 1) for j in range(k)]
+        keep_shift = 8 * k
+        for off in range(0, len(data), k):
+            word = int.from_bytes(data[off:off + k], order)
+            if self.refin:
+                reg ^= word
+                rest = reg >> keep_shift
+            else:
+                reg ^= word << (self.reg_width - keep_shift)
+                rest = (reg << keep_shift) & self.reg_mask
+            acc = rest
+            for j in range(k):
+                acc ^= tables[j][(reg >> shifts[j]) & 0xFF]
+            reg = acc
+        return reg
+
+    def update_bits(self, reg, value, nbits):
+        if self.refin:
+            raise ValueError('Bit-level updates require a non-reflected CRC')
+        top = self.reg_width - 1
+        mask = self.reg_mask
+        poly = self.reg_poly
+        for k in range(nbits - 1, -1, -1):
+            bit = ((reg >> top) ^ (value >> k)) & 1
+            reg = (reg << 1) & mask
+            if bit:
+                reg ^= poly
+        return reg
+
+    def finish(self, reg):
+        if not self.refin:
+            reg >>= self.reg_width - self.width
+        if self.refin != self.refout:
+            reg = _reflect(reg, self.width)
+        return reg ^ self.xorout
+
+    def compute(self, data):
+        if self.native:
+            return self.native(data)
+        return self.finish(self.update(self.reg_init, data))
+
+    def compute_bits(self, value, nbits):
+        rem = nbits % 8
+        head = (value >> rem).to_bytes(nbits // 8, 'big')
+        reg = self.update(self.reg_init, head)
+        return self.finish(self.update_bits(reg, value & ((1 << rem) - 1), rem))
+
+    def compute_packed(self, buf):
+        full, rem = divmod(buf.nbits, 8)
+        reg = self.update(self.reg_init, memoryview(buf.data)[:full])
+        if rem:
+            reg = self.update_bits(reg, buf.data[full] >> (8 - rem), rem)
+        return self.finish(reg)
+
+    def compute_str(self, data):
+        return format(self.compute_bits(int(data, 2) if data else 0, len(data)), f'0{self.width}b')
+
+    def _mulmod(self, a, b):
+        full = self.poly | 1 << self.width
+        result = 0
+        while b:
+            if b & 1:
+                result ^= a
+            b >>= 1
+            a <<= 1
+            if a >> self.width & 1:
+                a ^= full
+        return result
+
+    def combine(self, crc1, crc2, nbits2):
+        if self.refin or self.init or self.xorout:
+            raise ValueError(f'{self.name} cannot be combined: init, xorout and reflection must be off')
+        result, base = 1, self._mulmod(1, 2)
+        while nbits2:
+            if nbits2 & 1:
+                result = self._mulmod(result, base)
+            base = self._mulmod(base, base)
+            nbits2 >>= 1
+        return self._mulmod(crc1, result) ^ crc2
+
+CRC_PRESETS = {
+    'crc3': CRC(3, 0x3, name='crc3'),
+    'crc8': CRC(8, 0x07, name='crc8'),
+    'crc16-ccitt': CRC(16, 0x1021, init=0xFFFF, name='crc16-ccitt'),
+    'crc16-xmodem': CRC(16, 0x1021, name='crc16-xmodem'),
+    'crc32': CRC(32, 0x04C11DB7, init=0xFFFFFFFF, refin=True, xorout=0xFFFFFFFF, name='crc32'),
+}
+CRC_PRESETS['crc16-xmodem'].native = lambda data: binascii.crc_hqx(data, 0)
+CRC_PRESETS['crc32'].native = lambda data: zlib.crc32(data)
+
+_crc_cache = {}
+
+def get_crc(divisor="1011"):
+    if isinstance(divisor, CRC):
+        return divisor
+    if divisor in CRC_PRESETS:
+        return CRC_PRESETS[divisor]
+    crc = _crc_cache.get(divisor)
+    if crc is None:
+        if len(divisor) < 2 or divisor[0] != '1' or set(divisor) - {'0', '1'}:
+            raise ValueError(f'Invalid CRC divisor: {divisor!r}')
+        crc = _crc_cache[divisor] = CRC(len(divisor) - 1, int(divisor[1:], 2))
+    return crc
+
 def calculate_crc(data, divisor="1011"):
-    crc_length = len(divisor) - 1
-    dividend = list(data + '0' * crc_length)
-    for i in range(len(data)):
-        if dividend[i] == '1':
-            for j in range(len(divisor)):
-                dividend[i + j] = str(int(dividend[i + j]) ^ int(divisor[j]))
-    return ''.join(dividend[-crc_length:])
+    crc = get_crc(divisor)
+    if isinstance(data, BitBuffer):
+        return BitBuffer.from_int(crc.compute_packed(data), crc.width)
+    return crc.compute_str(data)
 
 def verify_crc(data_with_crc, divisor="1011"):
-    dividend = list(data_with_crc)
-    for i in range(len(data_with_crc) - len(divisor) + 1):
-        if dividend[i] == '1':
-            for j in range(len(divisor)):
-                dividend[i + j] = str(int(dividend[i + j]) ^ int(divisor[j]))
-    remainder = ''.join(dividend[-(len(divisor)-1):])
-    return remainder == '0' * (len(divisor) - 1)
+    crc = get_crc(divisor)
+    if len(data_with_crc) < crc.width:
+        return False
+    split = len(data_with_crc) - crc.width
+    if isinstance(data_with_crc, BitBuffer):
+        return crc.compute_packed(data_with_crc[:split]) == data_with_crc[split:].to_int()
+    return crc.compute_str(data_with_crc[:split]) == data_with_crc[split:]
 
 def encode_hamming(data):
+    if isinstance(data, BitBuffer):
+        return BitBuffer.from_int(_HAMMING_ENCODE[data.to_int() & 0xF], 7)
     if len(data) != 4:
         data = data.zfill(4)[-4:]
     d = [int(b) for b in data]
@@ -39,6 +415,9 @@ def encode_hamming(data):
 def decode_hamming(encoded):
     if len(encoded) != 7:
         return None, 0, False
+    if isinstance(encoded, BitBuffer):
+        nibble, error_pos = _HAMMING_DECODE[encoded.to_int()]
+        return BitBuffer.from_int(nibble, 4), error_pos, error_pos != 0
     bits = [int(b) for b in encoded]
     c1 = bits[0] ^ bits[2] ^ bits[4] ^ bits[6]
     c2 = bits[1] ^ bits[2] ^ bits[5] ^ bits[6]
@@ -52,7 +431,364 @@ def decode_hamming(encoded):
     data = ''.join(str(corrected[i]) for i in [2, 4, 5, 6])
     return data, error_pos, was_corrected
 
+_HAMMING_ENCODE = [int(encode_hamming(format(n, '04b')), 2) for n in range(16)]
+_HAMMING_DECODE = []
+for _cw in range(128):
+    _data, _pos, _ = decode_hamming(format(_cw, '07b'))
+    _HAMMING_DECODE.append((int(_data, 2), _pos))
+_HAMMING_ENCODE_TABLE = bytes(_HAMMING_ENCODE[i & 0xF] for i in range(256))
+_HAMMING_DATA_TABLE = bytes(_HAMMING_DECODE[i & 0x7F][0] for i in range(256))
+_HAMMING_SYNDROME_TABLE = bytes(_HAMMING_DECODE[i & 0x7F][1] for i in range(256))
+_HIGH_NIBBLE = bytes(i >> 4 for i in range(256))
+_LOW_NIBBLE = bytes(i & 0xF for i in range(256))
+_SHIFT_NIBBLE = bytes((i << 4) & 0xFF for i in range(256))
+
+def _split_nibbles(buf):
+    if buf.nbits % 8:
+        nibbles, tail, tail_bits = _unpack_units(buf, 4)
+        return bytes(nibbles), tail, tail_bits
+    data = bytes(buf.data)
+    nibbles = bytearray(2 * len(data))
+    nibbles[0::2] = data.translate(_HIGH_NIBBLE)
+    nibbles[1::2] = data.translate(_LOW_NIBBLE)
+    return bytes(nibbles), 0, 0
+
+def _join_nibbles(nibbles):
+    pairs = len(nibbles) // 2
+    high = nibbles[0:2 * pairs:2].translate(_SHIFT_NIBBLE)
+    low = nibbles[1:2 * pairs:2]
+    joined = (int.from_bytes(high, 'big') | int.from_bytes(low, 'big')).to_bytes(pairs, 'big')
+    buf = BitBuffer(joined)
+    if len(nibbles) % 2:
+        buf = buf + BitBuffer.from_int(nibbles[-1], 4)
+    return buf
+
+def encode_hamming_batch(nibbles):
+    if isinstance(nibbles, BitBuffer):
+        nibbles, tail, tail_bits = _split_nibbles(nibbles)
+        codewords = nibbles.translate(_HAMMING_ENCODE_TABLE)
+        return _pack_units(codewords, 7, tail << (4 - tail_bits), 4 if tail_bits else 0)
+    return bytes(nibbles).translate(_HAMMING_ENCODE_TABLE)
+
+def decode_hamming_batch(codewords):
+    packed = isinstance(codewords, BitBuffer)
+    if packed:
+        codewords = bytes(_unpack_units(codewords, 7)[0])
+    else:
+        codewords = bytes(codewords)
+    data = codewords.translate(_HAMMING_DATA_TABLE)
+    syndromes = codewords.translate(_HAMMING_SYNDROME_TABLE)
+    if packed:
+        data = _join_nibbles(data)
+    return data, syndromes
+
+class ReedSolomonError(ValueError):
+    pass
+
+_SECDED_ENCODE = [(cw << 1) | _PARITY[cw] for cw in _HAMMING_ENCODE]
+_SECDED_ENCODE_TABLE = bytes(_SECDED_ENCODE[i & 0xF] for i in range(256))
+
+def _secded_entry(byte):
+    cw = byte >> 1
+    nibble, syndrome = _HAMMING_DECODE[cw]
+    if not _PARITY[byte]:
+        if not syndrome:
+            return nibble, 0
+        raw = (cw >> 4 & 1) << 3 | (cw >> 2 & 1) << 2 | (cw >> 1 & 1) << 1 | (cw & 1)
+        return raw, 2
+    return nibble, 1
+
+_SECDED_DATA_TABLE = bytes(_secded_entry(i)[0] for i in range(256))
+_SECDED_STATUS_TABLE = bytes(_secded_entry(i)[1] for i in range(256))
+
+def _status_indices(statuses, status):
+    indices = []
+    i = statuses.find(status)
+    while i >= 0:
+        indices.append(i)
+        i = statuses.find(status, i + 1)
+    return indices
+
+def secded_encode(data):
+    nibbles, _, _ = _split_nibbles(BitBuffer(bytes(data)))
+    return nibbles.translate(_SECDED_ENCODE_TABLE)
+
+def secded_decode(code):
+    code = bytes(code)
+    statuses = code.translate(_SECDED_STATUS_TABLE)
+    data = bytes(_join_nibbles(code.translate(_SECDED_DATA_TABLE)))
+    return data, _status_indices(statuses, 1), _status_indices(statuses, 2)
+
+_H72_POSITIONS = [p for p in range(3, 72) if p & (p - 1)]
+_H72_INDEX = {p: i for i, p in enumerate(_H72_POSITIONS)}
+_H72_TABLES = []
+for _byte in range(8):
+    _positions = _H72_POSITIONS[8 * _byte:8 * _byte + 8]
+    _table = []
+    for _v in range(256):
+        _check = 0
+        for _k in range(8):
+            if _v >> (7 - _k) & 1:
+                _check ^= _positions[_k]
+        _table.append(_check)
+    _H72_TABLES.append(_table)
+
+def _h72_check(word):
+    check = 0
+    parity = 0
+    for table, b in zip(_H72_TABLES, word):
+        check ^= table[b]
+        parity ^= b
+    return check, _PARITY[parity]
+
+def hamming72_encode(data):
+    data = bytes(data)
+    out = bytearray()
+    for i in range(0, len(data), 8):
+        word = data[i:i + 8]
+        check, parity = _h72_check(word)
+        out += word
+        out.append(check << 1 | (parity ^ _PARITY[check]))
+    return bytes(out)
+
+def hamming72_decode(code):
+    code = bytes(code)
+    out = bytearray()
+    corrected = []
+    failed = []
+    for index, i in enumerate(range(0, len(code), 9)):
+        block = code[i:i + 9]
+        word = bytearray(block[:-1])
+        if not word:
+            failed.append(index)
+            continue
+        check, parity = _h72_check(word)
+        syndrome = (block[-1] >> 1) ^ check
+        if parity ^ _PARITY[block[-1]]:
+            if syndrome & (syndrome - 1):
+                bit = _H72_INDEX.get(syndrome)
+                if bit is None or bit >= 8 * len(word):
+                    failed.append(index)
+                else:
+                    word[bit >> 3] ^= 0x80 >> (bit & 7)
+                    corrected.append(index)
+            else:
+                corrected.append(index)
+        elif syndrome:
+            failed.append(index)
+        out += word
+    return bytes(out), corrected, failed
+
+RS_NSYM = 8
+RS_BLOCK = 255
+_GF_EXP = [0] * 512
+_GF_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    _GF_EXP[_i] = _x
+    _GF_LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11D
+for _i in range(255, 512):
+    _GF_EXP[_i] = _GF_EXP[_i - 255]
+
+def gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return _GF_EXP[_GF_LOG[a] + _GF_LOG[b]]
+
+def gf_div(a, b):
+    if b == 0:
+        raise ZeroDivisionError('GF(256) division by zero')
+    if a == 0:
+        return 0
+    return _GF_EXP[(_GF_LOG[a] + 255 - _GF_LOG[b]) % 255]
+
+def gf_pow(a, power):
+    return _GF_EXP[(_GF_LOG[a] * power) % 255]
+
+def gf_inverse(a):
+    return _GF_EXP[255 - _GF_LOG[a]]
+
+def gf_poly_scale(p, x):
+    return [gf_mul(c, x) for c in p]
+
+def gf_poly_add(p, q):
+    r = [0] * max(len(p), len(q))
+    for i, c in enumerate(p):
+        r[i + len(r) - len(p)] = c
+    for i, c in enumerate(q):
+        r[i + len(r) - len(q)] ^= c
+    return r
+
+def gf_poly_mul(p, q):
+    r = [0] * (len(p) + len(q) - 1)
+    for j, b in enumerate(q):
+        if b:
+            for i, a in enumerate(p):
+                if a:
+                    r[i + j] ^= _GF_EXP[_GF_LOG[a] + _GF_LOG[b]]
+    return r
+
+def gf_poly_eval(p, x):
+    y = p[0]
+    for c in p[1:]:
+        y = gf_mul(y, x) ^ c
+    return y
+
+def _gf_mul_table(c):
+    return bytes(gf_mul(c, v) for v in range(256))
+
+_RS_GENERATOR = [1]
+for _i in range(RS_NSYM):
+    _RS_GENERATOR = gf_poly_mul(_RS_GENERATOR, [1, gf_pow(2, _i)])
+_RS_GEN_TABLES = [_gf_mul_table(c) for c in _RS_GENERATOR[1:]]
+_RS_FEEDBACK = [int.from_bytes(bytes(t[fb] for t in _RS_GEN_TABLES), 'big') for fb in range(256)]
+_RS_MASK = (1 << (8 * RS_NSYM)) - 1
+_RS_ROOT_TABLES = [_gf_mul_table(gf_pow(2, i)) for i in range(RS_NSYM)]
+
+def _rs_parity(data):
+    reg = 0
+    shift = 8 * (RS_NSYM - 1)
+    feedback = _RS_FEEDBACK
+    for b in data:
+        reg = ((reg << 8) & _RS_MASK) ^ feedback[b ^ (reg >> shift)]
+    return reg.to_bytes(RS_NSYM, 'big')
+
+def _rs_syndromes(block):
+    synd = [0]
+    for table in _RS_ROOT_TABLES:
+        s = 0
+        for b in block:
+            s = table[s] ^ b
+        synd.append(s)
+    return synd
+
+def _rs_error_locator(synd):
+    err_loc = [1]
+    old_loc = [1]
+    for i in range(RS_NSYM):
+        k = i + 1
+        delta = synd[k]
+        for j in range(1, len(err_loc)):
+            delta ^= gf_mul(err_loc[-(j + 1)], synd[k - j])
+        old_loc = old_loc + [0]
+        if delta:
+            if len(old_loc) > len(err_loc):
+                new_loc = gf_poly_scale(old_loc, delta)
+                old_loc = gf_poly_scale(err_loc, gf_inverse(delta))
+                err_loc = new_loc
+            err_loc = gf_poly_add(err_loc, gf_poly_scale(old_loc, delta))
+    while err_loc and err_loc[0] == 0:
+        del err_loc[0]
+    if (len(err_loc) - 1) * 2 > RS_NSYM:
+        raise ReedSolomonError('Too many errors to correct')
+    return err_loc
+
+def _rs_error_positions(err_loc, n):
+    positions = [n - 1 - i for i in range(n) if gf_poly_eval(err_loc, gf_pow(2, i)) == 0]
+    if len(positions) != len(err_loc) - 1:
+        raise ReedSolomonError('Error locator does not match the block')
+    return positions
+
+def _rs_correct(block, synd, positions):
+    coef_pos = [len(block) - 1 - p for p in positions]
+    err_loc = [1]
+    for i in coef_pos:
+        err_loc = gf_poly_mul(err_loc, gf_poly_add([1], [gf_pow(2, i), 0]))
+    product = gf_poly_mul(synd[::-1], err_loc)
+    err_eval = product[-len(err_loc):][::-1]
+    xs = [gf_pow(2, -(255 - p)) for p in coef_pos]
+    for i, xi in enumerate(xs):
+        xi_inv = gf_inverse(xi)
+        prime = 1
+        for j, xj in enumerate(xs):
+            if j != i:
+                prime = gf_mul(prime, 1 ^ gf_mul(xi_inv, xj))
+        if prime == 0:
+            raise ReedSolomonError('Could not find error magnitude')
+        y = gf_mul(xi, gf_poly_eval(err_eval[::-1], xi_inv))
+        block[positions[i]] ^= gf_div(y, prime)
+    return block
+
+def rs_encode(data):
+    data = bytes(data)
+    step = RS_BLOCK - RS_NSYM
+    out = bytearray()
+    for i in range(0, len(data), step):
+        chunk = data[i:i + step]
+        out += chunk
+        out += _rs_parity(chunk)
+    return bytes(out)
+
+def rs_decode_block(block):
+    block = bytearray(block)
+    synd = _rs_syndromes(block)
+    if not any(synd):
+        return bytes(block[:-RS_NSYM]), 0
+    positions = _rs_error_positions(_rs_error_locator(synd)[::-1], len(block))
+    _rs_correct(block, synd, positions)
+    if any(_rs_syndromes(block)):
+        raise ReedSolomonError('Could not correct block')
+    return bytes(block[:-RS_NSYM]), len(positions)
+
+def rs_decode(code):
+    code = bytes(code)
+    out = bytearray()
+    corrected = []
+    failed = []
+    for index, i in enumerate(range(0, len(code), RS_BLOCK)):
+        block = code[i:i + RS_BLOCK]
+        if len(block) <= RS_NSYM:
+            failed.append(index)
+            continue
+        try:
+            data, count = rs_decode_block(block)
+        except ReedSolomonError:
+            failed.append(index)
+            data = block[:-RS_NSYM]
+        else:
+            if count:
+                corrected.append(index)
+        out += data
+    return bytes(out), corrected, failed
+
+FEC_CODECS = {
+    'secded': (secded_encode, secded_decode, 'secded_8_4', 'codeword'),
+    'hamming72': (hamming72_encode, hamming72_decode, 'hamming_72_64', 'word'),
+    'rs': (rs_encode, rs_decode, f'rs_{RS_BLOCK}_{RS_BLOCK - RS_NSYM}', 'block'),
+}
+FEC_UNITS = {'secded': (1, 2, 1), 'hamming72': (8, 9, 9), 'rs': (RS_BLOCK - RS_NSYM, RS_BLOCK, RS_BLOCK)}
+
+_PARITY9 = [(b << 1) | _PARITY[b] for b in range(256)]
+
+def _fold_sum(total, block_size):
+    max_val = (1 << block_size) - 1
+    while total > max_val:
+        total = (total & max_val) + (total >> block_size)
+    return total
+
+def _packed_block_sum(buf, block_size, pad_last):
+    step = block_size // 8
+    data = buf.data
+    nbytes = len(data) if pad_last else buf.nbits // block_size * step
+    if step == 1:
+        return sum(data[:nbytes])
+    total = 0
+    for i in range(0, nbytes, step):
+        chunk = data[i:i + step]
+        total += int.from_bytes(chunk, 'big') << (8 * (step - len(chunk)))
+    return total
+
 def calculate_checksum(data, block_size=8):
+    if isinstance(data, BitBuffer):
+        if block_size % 8:
+            return BitBuffer.from_bits(calculate_checksum(data.to_bits(), block_size))
+        if not data.nbits:
+            raise IndexError('checksum of empty data')
+        total = _fold_sum(_packed_block_sum(data, block_size, True), block_size)
+        return BitBuffer.from_int((1 << block_size) - 1 - total, block_size)
     blocks = [data[i:i+block_size] for i in range(0, len(data), block_size)]
     if len(blocks[-1]) < block_size:
         blocks[-1] = blocks[-1].ljust(block_size, '0')
@@ -67,6 +803,11 @@ def calculate_checksum(data, block_size=8):
     return format(checksum, f'0{block_size}b')
 
 def verify_checksum(data_with_checksum, block_size=8):
+    if isinstance(data_with_checksum, BitBuffer):
+        if block_size % 8:
+            return verify_checksum(data_with_checksum.to_bits(), block_size)
+        total = _fold_sum(_packed_block_sum(data_with_checksum, block_size, False), block_size)
+        return total == (1 << block_size) - 1
     blocks = [data_with_checksum[i:i+block_size] for i in range(0, len(data_with_checksum), block_size)]
     total = 0
     for block in blocks:
@@ -82,12 +823,19 @@ def int_to_binary(num, bits=4):
     return format(num, f'0{bits}b')
 
 def binary_to_int(binary):
+    if isinstance(binary, BitBuffer):
+        return binary.to_int()
     return int(binary, 2)
 
-def text_to_binary(text):
-    return ''.join(format(ord(c), '08b') for c in text)
+def text_to_binary(text, packed=False):
+    buf = BitBuffer.from_text(text)
+    return buf if packed else buf.to_bits()
 
 def binary_to_text(binary):
+    if isinstance(binary, BitBuffer):
+        return binary.to_text()
+    if not set(binary) - {'0', '1'}:
+        return BitBuffer.from_bits(binary).to_text()
     chars = [binary[i:i+8] for i in range(0, len(binary), 8)]
     result = ''
     for c in chars:
@@ -99,112 +847,440 @@ def binary_to_text(binary):
     return result
 
 def flip_bit(data, position):
+    if isinstance(data, BitBuffer):
+        data = data.copy()
+        if 0 <= position < data.nbits:
+            data.flip(position)
+        return data
     bits = list(data)
     if 0 <= position < len(bits):
         bits[position] = '1' if bits[position] == '0' else '0'
     return ''.join(bits)
 
+def flip_bits(data, positions):
+    packed = to_packed(data)
+    n = packed.nbits
+    mask = 0
+    for pos in positions:
+        if 0 <= pos < n:
+            mask ^= 1 << (n - 1 - pos)
+    result = packed ^ BitBuffer.from_int(mask, n)
+    return result if isinstance(data, BitBuffer) else result.to_bits()
+
 def delete_random_bit(data):
     import random
     if len(data) <= 1:
-        return '', 0
+        return (BitBuffer() if isinstance(data, BitBuffer) else ''), 0
     pos = random.randint(0, len(data) - 1)
     return data[:pos] + data[pos+1:], pos
 
-def encode_message(text, method='crc'):
-    binary = text_to_binary(text)
+BLOCK_CONTROL_BITS = {'crc': 3, 'checksum': 8}
+
+def _block_control(data, method):
+    return calculate_crc(data) if method == 'crc' else calculate_checksum(data)
+
+def encode_blocks(binary, method, block_size):
+    step = block_size * 8
+    fields = []
+    controls = []
+    for start in range(0, binary.nbits, step):
+        block = binary[start:start + step]
+        control = _block_control(block, method)
+        fields.append((block.to_int(), block.nbits))
+        fields.append((control.to_int(), control.nbits))
+        controls.append(control.to_bits())
+    return _join_fields(fields), ''.join(controls)
+
+def split_blocks(encoded_data, method, block_size):
+    unit = block_size * 8 + BLOCK_CONTROL_BITS[method]
+    return [encoded_data[i:i + unit] for i in range(0, len(encoded_data), unit)]
+
+def join_blocks(blocks):
+    if blocks and isinstance(blocks[0], BitBuffer):
+        return _join_fields((b.to_int(), b.nbits) for b in blocks)
+    return ''.join(blocks)
+
+def decode_blocks(encoded_data, method, block_size, first=0):
+    result = {'valid': True, 'errors_detected': False, 'errors_corrected': False, 'error_details': [], 'decoded_text': '', 'received_control': '', 'calculated_control': '', 'control_match': True, 'blocks': 0, 'failed_blocks': []}
+    width = BLOCK_CONTROL_BITS[method]
+    received = []
+    calculated = []
+    text = []
+    for i, block in enumerate(split_blocks(to_packed(encoded_data), method, block_size), first):
+        result['blocks'] += 1
+        if len(block) <= width:
+            result['failed_blocks'].append(i)
+            result['error_details'].append(f'Block {i} truncated')
+            continue
+        data = block[:len(block) - width]
+        got = block[len(block) - width:].to_bits()
+        want = _block_control(data, method).to_bits()
+        received.append(got)
+        calculated.append(want)
+        text.append(data.to_text())
+        if got != want:
+            result['failed_blocks'].append(i)
+            result['error_details'].append(f"{'CRC' if method == 'crc' else 'Checksum'} mismatch in block {i}")
+    result['received_control'] = ''.join(received)
+    result['calculated_control'] = ''.join(calculated)
+    result['decoded_text'] = ''.join(text)
+    result['control_match'] = not result['failed_blocks']
+    result['errors_detected'] = bool(result['failed_blocks'])
+    result['valid'] = not result['errors_detected']
+    return result
+
+def encode_message(text, method='crc', packed=False, block_size=None):
+    binary = text_to_binary(text, packed=True)
     result = {'original_text': text, 'binary': binary, 'method': method, 'control_info': '', 'encoded_data': ''}
     
-    if method == 'parity':
-        encoded = ''
-        for i in range(0, len(binary), 8):
-            block = binary[i:i+8]
-            if len(block) == 8:
-                parity = calculate_parity(block)
-                encoded += block + parity
+    if block_size and method in BLOCK_CONTROL_BITS:
+        result['encoded_data'], result['control_info'] = encode_blocks(binary, method, block_size)
+        result['block_size'] = block_size
+    elif method == 'parity':
+        units = [_PARITY9[b] for b in binary.data[:binary.nbits // 8]]
         result['control_info'] = 'parity_bits'
-        result['encoded_data'] = encoded
+        result['encoded_data'] = _pack_units(units, 9)
     elif method == 'crc':
         crc = calculate_crc(binary)
-        result['control_info'] = crc
+        result['control_info'] = crc.to_bits()
         result['encoded_data'] = binary + crc
     elif method == 'hamming':
-        encoded = ''
-        for i in range(0, len(binary), 4):
-            block = binary[i:i+4]
-            if len(block) == 4:
-                hamming = encode_hamming(block)
-                encoded += hamming
-            else:
-                encoded += block.ljust(4, '0')
         result['control_info'] = 'hamming_7_4'
-        result['encoded_data'] = encoded
+        result['encoded_data'] = encode_hamming_batch(binary)
+    elif method in FEC_CODECS:
+        encode, _, control, _ = FEC_CODECS[method]
+        result['control_info'] = control
+        result['encoded_data'] = BitBuffer(encode(binary.data))
     elif method == 'checksum':
         checksum = calculate_checksum(binary)
-        result['control_info'] = checksum
+        result['control_info'] = checksum.to_bits()
         result['encoded_data'] = binary + checksum
+    if not packed:
+        result['binary'] = binary.to_bits()
+        result['encoded_data'] = unpack_bits(result['encoded_data'])
     return result
 
-def decode_message(encoded_data, method='crc'):
+def decode_message(encoded_data, method='crc', block_size=None):
+    if block_size and method in BLOCK_CONTROL_BITS:
+        return decode_blocks(encoded_data, method, block_size)
     result = {'valid': True, 'errors_detected': False, 'errors_corrected': False, 'error_details': [], 'decoded_text': '', 'received_control': '', 'calculated_control': '', 'control_match': True}
+    encoded_data = to_packed(encoded_data)
+    n = encoded_data.nbits
     
     if method == 'parity':
-        decoded = ''
-        for i in range(0, len(encoded_data), 9):
-            block = encoded_data[i:i+9]
-            if len(block) >= 8:
-                data = block[:8]
-                received_parity = block[8] if len(block) > 8 else '0'
-                calculated_parity = calculate_parity(data)
-                result['received_control'] += received_parity
-                result['calculated_control'] += calculated_parity
-                if received_parity != calculated_parity:
-                    result['errors_detected'] = True
-                    result['error_details'].append(f'Parity error at block {i//9}')
-                    result['control_match'] = False
-                decoded += data
-        result['decoded_text'] = binary_to_text(decoded)
+        units, tail, tail_bits = _unpack_units(encoded_data, 9)
+        if tail_bits == 8:
+            units.append(tail << 1)
+        decoded = bytearray(u >> 1 for u in units)
+        received = ''.join('1' if u & 1 else '0' for u in units)
+        calculated = ''.join('1' if _PARITY[b] else '0' for b in decoded)
+        result['received_control'] = received
+        result['calculated_control'] = calculated
+        if received != calculated:
+            result['errors_detected'] = True
+            result['control_match'] = False
+            for i, (r, c) in enumerate(zip(received, calculated)):
+                if r != c:
+                    result['error_details'].append(f'Parity error at block {i}')
+        result['decoded_text'] = decoded.decode('latin-1')
     elif method == 'crc':
-        if len(encoded_data) > 3:
-            data = encoded_data[:-3]
-            received_crc = encoded_data[-3:]
-            calculated_crc = calculate_crc(data)
+        if n > 3:
+            data = encoded_data[:n - 3]
+            received_crc = encoded_data[n - 3:].to_bits()
+            calculated_crc = calculate_crc(data).to_bits()
             result['received_control'] = received_crc
             result['calculated_control'] = calculated_crc
             result['control_match'] = (received_crc == calculated_crc)
             if not result['control_match']:
                 result['errors_detected'] = True
                 result['error_details'].append(f'CRC mismatch')
-            result['decoded_text'] = binary_to_text(data)
+            result['decoded_text'] = data.to_text()
     elif method == 'hamming':
-        decoded = ''
-        for i in range(0, len(encoded_data), 7):
-            block = encoded_data[i:i+7]
-            if len(block) == 7:
-                data, error_pos, was_corrected = decode_hamming(block)
-                if data:
-                    decoded += data
-                    if was_corrected:
-                        result['errors_corrected'] = True
-                        result['error_details'].append(f'Hamming corrected bit {error_pos}')
-        result['decoded_text'] = binary_to_text(decoded)
+        decoded, syndromes = decode_hamming_batch(encoded_data)
+        for error_pos in syndromes:
+            if error_pos:
+                result['errors_corrected'] = True
+                result['error_details'].append(f'Hamming corrected bit {error_pos}')
+        result['decoded_text'] = decoded.to_text()
         result['control_match'] = not result['errors_detected']
     elif method == 'checksum':
-        if len(encoded_data) > 8:
-            data = encoded_data[:-8]
-            received_checksum = encoded_data[-8:]
-            calculated_checksum = calculate_checksum(data)
+        if n > 8:
+            data = encoded_data[:n - 8]
+            received_checksum = encoded_data[n - 8:].to_bits()
+            calculated_checksum = calculate_checksum(data).to_bits()
             result['received_control'] = received_checksum
             result['calculated_control'] = calculated_checksum
             result['control_match'] = (received_checksum == calculated_checksum)
             if not result['control_match']:
                 result['errors_detected'] = True
                 result['error_details'].append('Checksum mismatch')
-            result['decoded_text'] = binary_to_text(data)
+            result['decoded_text'] = data.to_text()
+    elif method in FEC_CODECS:
+        _, decode, _, unit = FEC_CODECS[method]
+        data, corrected, failed = decode(encoded_data.data[:n // 8])
+        for i in corrected:
+            result['error_details'].append(f'Corrected {unit} {i}')
+        for i in failed:
+            result['error_details'].append(f'Uncorrectable {unit} {i}')
+        if n % 8:
+            result['error_details'].append(f'{n % 8} trailing bits')
+        result['errors_corrected'] = bool(corrected)
+        result['errors_detected'] = bool(failed) or n % 8 != 0
+        result['control_match'] = not result['errors_detected']
+        result['decoded_text'] = data.decode('latin-1')
+        result['valid'] = not result['errors_detected']
+        return result
     result['valid'] = not result['errors_detected'] or result['errors_corrected']
     return result
 
-def encode_move(position, symbol):
+METHODS = ('parity', 'crc', 'hamming', 'checksum') + tuple(FEC_CODECS)
+STREAM_METHODS = METHODS
+STREAM_CHUNK = 8192
+
+def _stream_input(data):
+    if isinstance(data, BitBuffer):
+        return data
+    if isinstance(data, str):
+        return BitBuffer.from_text(data)
+    return BitBuffer(data)
+
+class StreamEncoder:
+    def __init__(self, method='crc'):
+        if method not in STREAM_METHODS:
+            raise ValueError(f'Unsupported stream method: {method}')
+        self.method = method
+        self.control_info = ''
+        self.bits_in = 0
+        self.bits_out = 0
+        self.finalized = False
+        self._pending = BitBuffer()
+        self._crc = get_crc()
+        self._reg = self._crc.start()
+        self._total = 0
+        self._fec = FEC_CODECS.get(method)
+
+    def update(self, data):
+        if self.finalized:
+            raise ValueError('update() after finalize()')
+        buf = _stream_input(data)
+        self.bits_in += buf.nbits
+        if self._fec:
+            buf = self._pending + buf
+            step = FEC_UNITS[self.method][0]
+            full = buf.nbits // 8 // step * step
+            out = BitBuffer(self._fec[0](buf.data[:full]))
+            self._pending = buf[full * 8:]
+        elif self.method in ('crc', 'checksum'):
+            out = buf
+            buf = self._pending + buf
+            full = buf.nbits // 8
+            if self.method == 'crc':
+                self._reg = self._crc.update(self._reg, memoryview(buf.data)[:full])
+            else:
+                self._total = _fold_sum(self._total + sum(buf.data[:full]), 8)
+            self._pending = buf[full * 8:]
+        elif self.method == 'parity':
+            buf = self._pending + buf
+            full = buf.nbits // 8
+            out = _pack_units([_PARITY9[b] for b in buf.data[:full]], 9)
+            self._pending = buf[full * 8:]
+        else:
+            buf = self._pending + buf
+            cut = buf.nbits - buf.nbits % 4
+            out = encode_hamming_batch(buf[:cut])
+            self._pending = buf[cut:]
+        self.bits_out += out.nbits
+        return out
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError('finalize() called twice')
+        self.finalized = True
+        pending = self._pending
+        out = BitBuffer()
+        if self._fec:
+            out = BitBuffer(self._fec[0](pending.data))
+            self.control_info = self._fec[2]
+        elif self.method == 'crc':
+            reg = self._crc.update_bits(self._reg, pending.to_int(), pending.nbits)
+            out = BitBuffer.from_int(self._crc.finish(reg), self._crc.width)
+            self.control_info = out.to_bits()
+        elif self.method == 'checksum':
+            total = _fold_sum(self._total + (pending.data[0] if pending.nbits else 0), 8)
+            out = BitBuffer.from_int(0xFF - total, 8)
+            self.control_info = out.to_bits()
+        elif self.method == 'parity':
+            self.control_info = 'parity_bits'
+        else:
+            if pending.nbits:
+                out = BitBuffer.from_int(pending.to_int() << (4 - pending.nbits), 4)
+            self.control_info = 'hamming_7_4'
+        self._pending = BitBuffer()
+        self.bits_out += out.nbits
+        return out
+
+class StreamDecoder:
+    def __init__(self, method='crc'):
+        if method not in STREAM_METHODS:
+            raise ValueError(f'Unsupported stream method: {method}')
+        self.method = method
+        self.result = None
+        self.bits_in = 0
+        self.bytes_out = 0
+        self.finalized = False
+        self._pending = BitBuffer()
+        self._crc = get_crc()
+        self._reg = self._crc.start()
+        self._total = 0
+        self._block = 0
+        self._errors = []
+        self._corrected = False
+        self._received = []
+        self._calculated = []
+        self._fec = FEC_CODECS.get(method)
+        self._failed = []
+
+    def _trailer_bits(self):
+        return self._crc.width if self.method == 'crc' else 8
+
+    def update(self, data):
+        if self.finalized:
+            raise ValueError('update() after finalize()')
+        data = to_packed(data)
+        self.bits_in += data.nbits
+        buf = self._pending + data
+        if self._fec:
+            step = FEC_UNITS[self.method][1]
+            full = buf.nbits // 8 // step * step
+            out = self._decode_fec(buf.data[:full])
+            self._pending = buf[full * 8:]
+        elif self.method == 'parity':
+            units, _, _ = _unpack_units(buf, 9)
+            out = self._check_parity(units)
+            self._pending = buf[len(units) * 9:]
+        elif self.method == 'hamming':
+            cut = buf.nbits // 14 * 14
+            data, syndromes = decode_hamming_batch(buf[:cut])
+            self._note_syndromes(syndromes)
+            out = bytes(data)
+            self._pending = buf[cut:]
+        else:
+            keep = self._trailer_bits()
+            full = max(0, buf.nbits - keep) // 8
+            out = bytes(buf.data[:full])
+            if self.method == 'crc':
+                self._reg = self._crc.update(self._reg, out)
+            else:
+                self._total = _fold_sum(self._total + sum(out), 8)
+            self._pending = buf[full * 8:]
+        self.bytes_out += len(out)
+        return out
+
+    def _check_parity(self, units):
+        out = bytes(u >> 1 for u in units)
+        received = ''.join('1' if u & 1 else '0' for u in units)
+        calculated = ''.join('1' if _PARITY[b] else '0' for b in out)
+        self._received.append(received)
+        self._calculated.append(calculated)
+        if received != calculated:
+            for i, (r, c) in enumerate(zip(received, calculated), self._block):
+                if r != c:
+                    self._errors.append(f'Parity error at block {i}')
+        self._block += len(units)
+        return out
+
+    def _decode_fec(self, code):
+        data, corrected, failed = self._fec[1](bytes(code))
+        self._errors.extend(i + self._block for i in corrected)
+        self._failed.extend(i + self._block for i in failed)
+        self._block += -(-len(code) // FEC_UNITS[self.method][2])
+        return data
+
+    def _note_syndromes(self, syndromes):
+        for error_pos in syndromes:
+            if error_pos:
+                self._corrected = True
+                self._errors.append(f'Hamming corrected bit {error_pos}')
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError('finalize() called twice')
+        self.finalized = True
+        result = {'valid': True, 'errors_detected': False, 'errors_corrected': False, 'error_details': self._errors, 'received_control': '', 'calculated_control': '', 'control_match': True, 'bits_in': self.bits_in}
+        pending = self._pending
+        out = b''
+        if self._fec:
+            out = self._decode_fec(pending.data[:pending.nbits // 8])
+            unit = self._fec[3]
+            trailing = self.bits_in % 8
+            corrected, self._errors = self._errors, [f'Corrected {unit} {i}' for i in self._errors]
+            self._errors += [f'Uncorrectable {unit} {i}' for i in self._failed]
+            if trailing:
+                self._errors.append(f'{trailing} trailing bits')
+            result['error_details'] = self._errors
+            result['errors_corrected'] = bool(corrected)
+            result['errors_detected'] = bool(self._failed) or trailing != 0
+            result['control_match'] = not result['errors_detected']
+        elif self.method == 'parity':
+            if pending.nbits == 8:
+                out = self._check_parity([pending.to_int() << 1])
+            result['received_control'] = ''.join(self._received)
+            result['calculated_control'] = ''.join(self._calculated)
+            result['errors_detected'] = bool(self._errors)
+            result['control_match'] = not self._errors
+        elif self.method == 'hamming':
+            if pending.nbits >= 7:
+                self._note_syndromes(decode_hamming_batch(pending[:7])[1])
+            result['errors_corrected'] = self._corrected
+        elif self.bits_in > self._trailer_bits():
+            keep = self._trailer_bits()
+            data, control = pending[:pending.nbits - keep], pending[pending.nbits - keep:]
+            if self.method == 'crc':
+                reg = self._crc.update_bits(self._reg, data.to_int(), data.nbits)
+                calculated = BitBuffer.from_int(self._crc.finish(reg), keep)
+            else:
+                total = _fold_sum(self._total + (data.to_int() << (8 - data.nbits) if data.nbits else 0), 8)
+                calculated = BitBuffer.from_int(0xFF - total, 8)
+            result['received_control'] = control.to_bits()
+            result['calculated_control'] = calculated.to_bits()
+            result['control_match'] = control == calculated
+            if not result['control_match']:
+                result['errors_detected'] = True
+                self._errors.append('CRC mismatch' if self.method == 'crc' else 'Checksum mismatch')
+        if self._fec:
+            result['valid'] = not result['errors_detected']
+        else:
+            result['valid'] = not result['errors_detected'] or result['errors_corrected']
+        self.bytes_out += len(out)
+        self._pending = BitBuffer()
+        self.result = result
+        return out
+
+def encode_stream(text, method='crc', packed=False, block_size=None, chunk=STREAM_CHUNK):
+    if method not in STREAM_METHODS or block_size:
+        return encode_message(text, method, packed, block_size)
+    encoder = StreamEncoder(method)
+    parts = [encoder.update(text[i:i + chunk]) for i in range(0, len(text), chunk)]
+    parts.append(encoder.finalize())
+    encoded = join_blocks(parts)
+    return {'original_text': text, 'method': method, 'control_info': encoder.control_info,
+            'encoded_data': encoded if packed else encoded.to_bits()}
+
+def decode_stream(encoded_data, method='crc', block_size=None, chunk=STREAM_CHUNK):
+    if method not in STREAM_METHODS or block_size:
+        return decode_message(encoded_data, method, block_size)
+    decoder = StreamDecoder(method)
+    step = chunk * 8
+    parts = [decoder.update(encoded_data[i:i + step]) for i in range(0, len(encoded_data), step)]
+    parts.append(decoder.finalize())
+    result = dict(decoder.result, decoded_text=b''.join(parts).decode('latin-1'))
+    del result['bits_in']
+    return result
+
+MOVE_FRAME_BITS = 11
+MOVE_FRAME_BYTES = 2
+
+def _encode_move(position, symbol):
     pos_binary = int_to_binary(position, 4)
     symbol_bit = '0' if symbol == 'X' else '1'
     data = pos_binary
@@ -213,34 +1289,69 @@ def encode_move(position, symbol):
     parity = calculate_parity(hamming + crc)
     return {'position': position, 'symbol': symbol, 'binary': pos_binary, 'hamming': hamming, 'crc': crc, 'parity': parity, 'full_data': hamming + crc + parity}
 
+def _decode_move_entry(frame):
+    errors = []
+    hamming = frame >> 4
+    if _PARITY[frame & 0xFF] ^ _PARITY[frame >> 8]:
+        errors.append('Parity check failed')
+    if get_crc().compute_bits(hamming, 7) != (frame >> 1) & 7:
+        errors.append('CRC check failed')
+    nibble, error_pos = _HAMMING_DECODE[hamming]
+    corrections = (f'Hamming corrected bit at position {error_pos}',) if error_pos else ()
+    return nibble % 9, not errors or bool(error_pos), tuple(errors), corrections
+
+_MOVE_ENCODE = {(p, s): _encode_move(p, s) for p in range(16) for s in ('X', 'O')}
+_MOVE_FRAMES = tuple(int(_MOVE_ENCODE[p, 'X']['full_data'], 2) for p in range(16))
+_MOVE_FRAME_BYTES = tuple(f.to_bytes(MOVE_FRAME_BYTES, 'big') for f in _MOVE_FRAMES)
+_MOVE_DECODE = tuple(_decode_move_entry(f) for f in range(1 << MOVE_FRAME_BITS))
+_MOVE_POSITIONS = bytes(e[0] for e in _MOVE_DECODE)
+_MOVE_STATUS = bytes(2 if not e[1] else 1 if e[3] else 0 for e in _MOVE_DECODE)
+
+def encode_move(position, symbol):
+    entry = _MOVE_ENCODE.get((position, symbol))
+    return dict(entry) if entry else _encode_move(position, symbol)
+
 def decode_move(full_data, expected_symbol=None):
-    result = {'valid': True, 'errors': [], 'corrections': [], 'position': None, 'symbol': expected_symbol}
     if len(full_data) < 11:
-        result['valid'] = False
-        result['errors'].append('Data too short')
-        return result
-    hamming = full_data[:7]
-    crc = full_data[7:10]
-    parity = full_data[10] if len(full_data) > 10 else '0'
-    parity_valid = check_parity(hamming + crc + parity)
-    if not parity_valid:
-        result['errors'].append('Parity check failed')
-    crc_valid = verify_crc(hamming + crc)
-    if not crc_valid:
-        result['errors'].append('CRC check failed')
-    decoded_data, error_pos, was_corrected = decode_hamming(hamming)
-    if was_corrected:
-        result['corrections'].append(f'Hamming corrected bit at position {error_pos}')
-    if decoded_data:
-        result['position'] = binary_to_int(decoded_data)
-        if result['position'] > 8:
-            result['position'] = result['position'] % 9
-    if result['errors'] and not was_corrected:
-        result['valid'] = False
-    return result
+        return {'valid': False, 'errors': ['Data too short'], 'corrections': [], 'position': None, 'symbol': expected_symbol}
+    try:
+        frame = int(full_data[:11], 2)
+    except ValueError:
+        frame = -1
+    return decode_move_frame(frame, expected_symbol)
+
+def encode_move_frame(position):
+    return _MOVE_FRAMES[position & 0xF]
+
+def decode_move_frame(frame, expected_symbol=None):
+    if isinstance(frame, (bytes, bytearray)):
+        frame = int.from_bytes(frame, 'big')
+    if not 0 <= frame < 1 << MOVE_FRAME_BITS:
+        return {'valid': False, 'errors': ['Frame out of range'], 'corrections': [], 'position': None, 'symbol': expected_symbol}
+    position, valid, errors, corrections = _MOVE_DECODE[frame]
+    return {'valid': valid, 'errors': list(errors), 'corrections': list(corrections), 'position': position, 'symbol': expected_symbol}
+
+def encode_moves(positions):
+    return b''.join([_MOVE_FRAME_BYTES[p & 0xF] for p in positions])
+
+def decode_moves(data):
+    n = len(data) // MOVE_FRAME_BYTES
+    frames = struct.unpack(f'>{n}H', data[:n * MOVE_FRAME_BYTES])
+    if max(data[0:n * MOVE_FRAME_BYTES:MOVE_FRAME_BYTES], default=0) >> (MOVE_FRAME_BITS - 8):
+        statuses = bytearray(_MOVE_STATUS[f] if f >> MOVE_FRAME_BITS == 0 else 2 for f in frames)
+        frames = [f & ((1 << MOVE_FRAME_BITS) - 1) for f in frames]
+    else:
+        statuses = bytes(map(_MOVE_STATUS.__getitem__, frames))
+    return bytes(map(_MOVE_POSITIONS.__getitem__, frames)), bytes(statuses)
 
 if __name__ == "__main__":
     print("Testing Error Detection Algorithms")
+    batch_data, batch_syndromes = decode_hamming_batch(range(128))
+    assert encode_hamming_batch(range(16)) == bytes(int(encode_hamming(format(n, '04b')), 2) for n in range(16))
+    for cw in range(128):
+        data, error_pos, _ = decode_hamming(format(cw, '07b'))
+        assert (int(data, 2), error_pos) == (batch_data[cw], batch_syndromes[cw])
+    print("Hamming batch path matches per-codeword functions")
     for method in ['parity', 'crc', 'hamming', 'checksum']:
         print(f"\n--- {method.upper()} ---")
         msg = "Hi"
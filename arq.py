@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+from algorithms import join_blocks, split_blocks
+from parallel import encode_message, decode_message
+
+
+class ArqStats:
+    FIELDS = ('frames_sent', 'retransmits', 'repairs', 'timeouts', 'acks', 'naks', 'busy', 'failed',
+              'delivered', 'delivered_bytes', 'bits_sent', 'duplicates', 'out_of_order', 'naks_sent')
+
+    def __init__(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+        self.started = time.time()
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        elapsed = time.time() - self.started
+        data['goodput_bps'] = round(self.delivered_bytes * 8 / elapsed, 1) if elapsed else 0.0
+        data['efficiency'] = round(self.delivered_bytes * 8 / self.bits_sent, 4) if self.bits_sent else 0.0
+        return data
+
+
+class Frame:
+    __slots__ = ('seq', 'msg', 'encoded', 'sent_at', 'retries', 'deferred')
+
+    def __init__(self, seq, msg):
+        self.seq = seq
+        self.msg = msg
+        self.encoded = msg['encoded']
+        self.sent_at = 0.0
+        self.retries = 0
+        self.deferred = False
+
+
+class ArqSender:
+    def __init__(self, send, window=8, timeout=1.0, max_retries=10, stats=None):
+        self.send = send
+        self.window = window
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.stats = stats or ArqStats()
+        self.lock = threading.RLock()
+        self.next_seq = 0
+        self.base = 0
+        self.outstanding = {}
+        self.queue = deque()
+
+    def submit(self, text, method, block_size=None):
+        enc = encode_message(text, method, block_size=block_size)
+        msg = {'type': 'chat', 'text': text, 'method': method, 'encoded': enc['encoded_data']}
+        if block_size:
+            msg['block_size'] = block_size
+        with self.lock:
+            self.queue.append(msg)
+            self.fill()
+        return True
+
+    def fill(self):
+        while self.queue and self.next_seq < self.base + self.window:
+            msg = self.queue.popleft()
+            msg['seq'] = self.next_seq
+            frame = self.outstanding[self.next_seq] = Frame(self.next_seq, msg)
+            self.next_seq += 1
+            self.transmit(frame, msg)
+
+    def transmit(self, frame, msg):
+        frame.sent_at = time.monotonic()
+        self.stats.frames_sent += 1
+        self.stats.bits_sent += len(msg['encoded'])
+        self.send(msg)
+
+    def advance(self):
+        self.base = min(self.outstanding, default=self.next_seq)
+        self.fill()
+
+    def on_ack(self, seq):
+        with self.lock:
+            frame = self.outstanding.pop(seq, None)
+            if frame is None:
+                return
+            self.stats.acks += 1
+            self.stats.delivered += 1
+            self.stats.delivered_bytes += len(frame.msg['text'])
+            self.advance()
+
+    def on_nak(self, seq, blocks=None):
+        with self.lock:
+            frame = self.outstanding.get(seq)
+            if frame is None:
+                return
+            self.stats.naks += 1
+            self.retransmit(frame, blocks)
+
+    def on_busy(self, seq, delay=None):
+        with self.lock:
+            frame = self.outstanding.get(seq)
+            if frame is None:
+                return
+            self.stats.busy += 1
+            frame.deferred = True
+            frame.sent_at = time.monotonic() + (self.timeout if delay is None else delay) - self.timeout
+
+    def retransmit(self, frame, blocks=None):
+        if frame.deferred:
+            frame.deferred = False
+            self.transmit(frame, frame.msg)
+            return
+        frame.retries += 1
+        if frame.retries > self.max_retries:
+            del self.outstanding[frame.seq]
+            self.stats.failed += 1
+            self.send({'type': 'chat_skip', 'seq': frame.seq})
+            self.advance()
+            return
+        self.stats.retransmits += 1
+        block_size = frame.msg.get('block_size')
+        if blocks and block_size:
+            pieces = split_blocks(frame.encoded, frame.msg['method'], block_size)
+            msg = dict(frame.msg, repair=blocks, encoded=join_blocks([pieces[i] for i in blocks]))
+            self.stats.repairs += 1
+        else:
+            msg = frame.msg
+        self.transmit(frame, msg)
+
+    def poll(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            for frame in [f for f in self.outstanding.values() if now - f.sent_at > self.timeout]:
+                self.stats.timeouts += not frame.deferred
+                self.retransmit(frame)
+
+    def idle(self):
+        with self.lock:
+            return not self.outstanding and not self.queue
+
+
+class ArqReceiver:
+    def __init__(self, send, window=8, stats=None):
+        self.send = send
+        self.window = window
+        self.stats = stats or ArqStats()
+        self.lock = threading.Lock()
+        self.base = 0
+        self.buffer = {}
+        self.damaged = {}
+
+    def receive(self, msg):
+        seq = msg['seq']
+        with self.lock:
+            if seq < self.base or seq in self.buffer:
+                self.stats.duplicates += 1
+                self.send({'type': 'chat_ack', 'seq': seq})
+                return []
+            if seq >= self.base + self.window:
+                return []
+            if msg.get('repair') is not None:
+                msg = self.repair(msg)
+                if msg is None:
+                    self.stats.naks_sent += 1
+                    self.send({'type': 'chat_nak', 'seq': seq})
+                    return []
+            elif 'result' not in msg:
+                msg['result'] = decode_message(msg['encoded'], msg['method'], msg.get('block_size'))
+            result = msg['result']
+            if not result['valid']:
+                self.stats.naks_sent += 1
+                nak = {'type': 'chat_nak', 'seq': seq}
+                if result.get('failed_blocks') and msg.get('block_size'):
+                    self.damaged[seq] = msg
+                    nak['blocks'] = result['failed_blocks']
+                self.send(nak)
+                return []
+            self.damaged.pop(seq, None)
+            self.send({'type': 'chat_ack', 'seq': seq})
+            if seq != self.base:
+                self.stats.out_of_order += 1
+            self.buffer[seq] = msg
+            return self.release()
+
+    def skip(self, seq):
+        with self.lock:
+            if seq >= self.base:
+                self.buffer[seq] = None
+                self.damaged.pop(seq, None)
+            return self.release()
+
+    def release(self):
+        delivered = []
+        while self.base in self.buffer:
+            msg = self.buffer.pop(self.base)
+            self.base += 1
+            if msg is not None:
+                self.stats.delivered += 1
+                self.stats.delivered_bytes += len(msg['result']['decoded_text'])
+                delivered.append(msg)
+        return delivered
+
+    def repair(self, msg):
+        damaged = self.damaged.get(msg['seq'])
+        if damaged is None:
+            return None
+        method, block_size = damaged['method'], damaged['block_size']
+        blocks = split_blocks(damaged['encoded'], method, block_size)
+        for index, piece in zip(msg['repair'], split_blocks(msg['encoded'], method, block_size)):
+            if index < len(blocks):
+                blocks[index] = piece
+        encoded = join_blocks(blocks)
+        return dict(damaged, encoded=encoded, modified=damaged.get('modified') or msg.get('modified'),
+                    result=decode_message(encoded, method, block_size))
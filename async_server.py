@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from framing import FrameReader, FrameError, encode_frame
+from game import Match, add_hold_args
+from journal import add_journal_args, journal_from_args
+from metrics import add_metrics_args, metrics_from_args
+from policies import add_policy_args, policy_from_args
+from profiling import add_profile_args, profiler_from_args
+from spectators import add_spectator_args
+
+
+class Player:
+    __slots__ = ('pid', 'writer', 'address', 'symbol', 'match')
+
+    def __init__(self, pid, writer, address):
+        self.pid = pid
+        self.writer = writer
+        self.address = address
+        self.symbol = None
+        self.match = None
+
+
+class AsyncMITMServer:
+    def __init__(self, host='localhost', port=5000, policy=None, journal=None, spectator_port=None,
+                 spectator_queue=256, spectator_policy='coalesce', hold_timeout=None, queue_limit=32,
+                 metrics=None):
+        self.host = host
+        self.port = port
+        self.policy = policy
+        self.journal = journal
+        self.spectator_port = spectator_port
+        self.spectator_queue = spectator_queue
+        self.spectator_policy = spectator_policy
+        self.spectator_server = None
+        self.hold_timeout = hold_timeout
+        self.queue_limit = queue_limit
+        self.metrics = metrics
+        if metrics:
+            metrics.watch(self)
+        self.binary_frames = True
+        self.matches = {}
+        self.lobby = deque()
+        self.running = False
+        self.loop = None
+        self.loop_thread = None
+        self.server = None
+        self.player_ids = itertools.count(1)
+        self.match_ids = itertools.count(1)
+
+    def list_matches(self):
+        return list(self.matches.values())
+
+    async def serve(self, ready=None):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=1024)
+        if self.spectator_port:
+            self.spectator_server = await asyncio.start_server(self.handle_spectator, self.host,
+                                                               self.spectator_port, backlog=1024)
+        self.running = True
+        if ready:
+            ready.set()
+        async with self.server:
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+        if self.spectator_server:
+            self.spectator_server.close()
+        self.running = False
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    def start(self):
+        ready = threading.Event()
+        threading.Thread(target=lambda: asyncio.run(self.serve(ready)), daemon=True).start()
+        ready.wait(5)
+
+    def stop(self):
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+
+    async def handle_client(self, reader, writer):
+        player = Player(next(self.player_ids), writer, writer.get_extra_info('peername'))
+        self.pair(player)
+        frames = FrameReader()
+        metrics = self.metrics
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if metrics:
+                    metrics.read(len(data))
+                for msg in frames.feed(data):
+                    if metrics:
+                        start = time.perf_counter()
+                    if player.match:
+                        player.match.process_message(player.symbol, msg)
+                    if metrics:
+                        metrics.handled(msg.get('type'), time.perf_counter() - start)
+        except ConnectionError:
+            if metrics:
+                metrics.error('receive')
+        except FrameError:
+            if metrics:
+                metrics.error('frame')
+        except Exception as e:
+            if metrics:
+                metrics.error('handler')
+            print(f"Error handling player {player.pid}: {e!r}")
+        finally:
+            self.drop(player)
+            writer.close()
+
+    async def handle_spectator(self, reader, writer):
+        frames = FrameReader()
+        msgs = []
+        try:
+            while not msgs:
+                data = await reader.read(65536)
+                if not data:
+                    writer.close()
+                    return
+                msgs = frames.feed(data)
+        except (ConnectionError, FrameError):
+            writer.close()
+            return
+        match_id = msgs[0].get('match')
+        match = self.matches.get(match_id) if match_id else self.matches.get(max(self.matches, default=None))
+        if match is None:
+            writer.write(encode_frame({'type': 'spectate_end', 'match': match_id, 'note': 'No such match'}))
+            writer.close()
+            return
+        ready = asyncio.Event()
+        hub = match.spectators
+        sub = hub.subscribe(writer, lambda: self.loop.call_soon_threadsafe(ready.set))
+        eof = asyncio.ensure_future(reader.read())
+        eof.add_done_callback(lambda _: (setattr(sub, 'closed', True), ready.set()))
+        try:
+            while not sub.closed:
+                await ready.wait()
+                ready.clear()
+                for frame in hub.take(sub):
+                    writer.write(frame)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            eof.cancel()
+            hub.unsubscribe(sub)
+            writer.close()
+
+    def pair(self, player):
+        while self.lobby:
+            other = self.lobby.popleft()
+            if not other.writer.is_closing():
+                break
+        else:
+            self.lobby.append(player)
+            return
+        match = Match(next(self.match_ids), self.send)
+        match.policy = self.policy
+        match.journal = self.journal
+        match.metrics = self.metrics
+        match.spectators.binary = self.binary_frames
+        match.spectators.limit = self.spectator_queue
+        match.spectators.policy = self.spectator_policy
+        match.hold_timeout = self.hold_timeout
+        match.chats.limit = self.queue_limit
+        self.matches[match.match_id] = match
+        for p, symbol in ((other, 'X'), (player, 'O')):
+            p.symbol = symbol
+            p.match = match
+            match.add_player(symbol, p, p.address)
+        match.start_game()
+
+    def drop(self, player):
+        match = player.match
+        if match is None:
+            try:
+                self.lobby.remove(player)
+            except ValueError:
+                pass
+            return
+        player.match = None
+        match.remove_player(player.symbol)
+        self.matches.pop(match.match_id, None)
+        match.spectators.close('Player disconnected')
+        for other in list(match.players.values()):
+            other.match = None
+            match.remove_player(other.symbol)
+            self.send(other, {'type': 'server_end', 'note': 'Opponent disconnected'})
+            self.pair(other)
+
+    def send(self, player, msg):
+        writer = player.writer
+        if writer.is_closing():
+            return
+        frame = encode_frame(msg, self.binary_frames)
+        if self.metrics:
+            self.metrics.sent(msg.get('type'), len(frame))
+        if threading.get_ident() == self.loop_thread:
+            writer.write(frame)
+        else:
+            self.loop.call_soon_threadsafe(writer.write, frame)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless multi-match MITM server")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--gui', action='store_true', help="attach the control panel to one match")
+    add_policy_args(parser)
+    add_journal_args(parser)
+    add_spectator_args(parser)
+    add_hold_args(parser)
+    add_metrics_args(parser)
+    add_profile_args(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    server = AsyncMITMServer(args.host, args.port, policy_from_args(args), journal_from_args(args),
+                             args.spectator_port, args.spectator_queue, args.spectator_policy,
+                             args.hold_timeout, args.queue_limit, metrics_from_args(args))
+    if args.gui:
+        from server import ServerGUI
+        ServerGUI(server).run()
+    else:
+        print(f"Listening on {args.host}:{args.port}" +
+              (f", spectators on {args.spectator_port}" if args.spectator_port else ""))
+        try:
+            server.run()
+        except KeyboardInterrupt:
+            pass
+    if server.policy:
+        for key, count in sorted(server.policy.counts.items()):
+            print(f"{key}: {count}")
+        server.policy.close()
+    if server.journal:
+        print(f"Journal: {server.journal.records} records written to {server.journal.path}")
+        server.journal.close()
+    if server.metrics:
+        server.metrics.exporter.close()
+    if profiler:
+        print(profiler.close())
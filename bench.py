@@ -0,0 +1,220 @@
+import argparse
+import csv
+import json
+import platform
+import random
+import sys
+import time
+from algorithms import (BitBuffer, calculate_parity, calculate_crc, verify_crc, encode_hamming, decode_hamming,
+                        encode_hamming_batch, decode_hamming_batch, calculate_checksum, encode_message,
+                        decode_message, encode_move, decode_move, encode_moves, decode_moves, METHODS)
+
+IMPLS = ('string', 'packed')
+DEFAULT_SIZES = (16, 1024, 65536, 1048576)
+
+
+def payload(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+def chunks(bits, width):
+    return [bits[i:i + width] for i in range(0, len(bits) - width + 1, width)]
+
+
+def setup_parity(data, impl):
+    buf = BitBuffer(data)
+    if impl == 'string':
+        bits = buf.to_bits()
+        return lambda: calculate_parity(bits)
+    return lambda: calculate_parity(buf)
+
+
+def setup_crc(data, impl):
+    buf = BitBuffer(data)
+    if impl == 'string':
+        bits = buf.to_bits()
+        return lambda: calculate_crc(bits)
+    return lambda: calculate_crc(buf)
+
+
+def setup_verify_crc(data, impl):
+    buf = BitBuffer(data)
+    buf = buf + calculate_crc(buf)
+    if impl == 'string':
+        bits = buf.to_bits()
+        return lambda: verify_crc(bits)
+    return lambda: verify_crc(buf)
+
+
+def setup_hamming_encode(data, impl):
+    buf = BitBuffer(data)
+    if impl == 'string':
+        nibbles = chunks(buf.to_bits(), 4)
+        return lambda: [encode_hamming(n) for n in nibbles]
+    return lambda: encode_hamming_batch(buf)
+
+
+def setup_hamming_decode(data, impl):
+    encoded = encode_hamming_batch(BitBuffer(data))
+    if impl == 'string':
+        codewords = chunks(encoded.to_bits(), 7)
+        return lambda: [decode_hamming(cw) for cw in codewords]
+    return lambda: decode_hamming_batch(encoded)
+
+
+def setup_checksum(data, impl):
+    buf = BitBuffer(data)
+    if impl == 'string':
+        bits = buf.to_bits()
+        return lambda: calculate_checksum(bits)
+    return lambda: calculate_checksum(buf)
+
+
+def setup_encode_message(method):
+    def setup(data, impl):
+        text = data.decode('latin-1')
+        return lambda: encode_message(text, method, packed=impl == 'packed')
+    return setup
+
+
+def setup_decode_message(method):
+    def setup(data, impl):
+        encoded = encode_message(data.decode('latin-1'), method, packed=impl == 'packed')['encoded_data']
+        return lambda: decode_message(encoded, method)
+    return setup
+
+
+def setup_moves(data, impl):
+    if impl != 'string':
+        positions = [b % 9 for b in data]
+        return lambda: encode_moves(positions)
+    moves = [(b % 9, 'XO'[b >> 7]) for b in data]
+    return lambda: [encode_move(pos, sym) for pos, sym in moves]
+
+
+def setup_decode_moves(data, impl):
+    if impl != 'string':
+        frames = encode_moves(b % 9 for b in data)
+        return lambda: decode_moves(frames)
+    frames = [(encode_move(b % 9, 'XO'[b >> 7])['full_data'], 'XO'[b >> 7]) for b in data]
+    return lambda: [decode_move(frame, sym) for frame, sym in frames]
+
+
+CASES = {
+    'parity': setup_parity,
+    'crc': setup_crc,
+    'verify_crc': setup_verify_crc,
+    'hamming_encode': setup_hamming_encode,
+    'hamming_decode': setup_hamming_decode,
+    'checksum': setup_checksum,
+    'encode_move': setup_moves,
+    'decode_move': setup_decode_moves,
+}
+for _method in METHODS:
+    CASES[f'encode_message_{_method}'] = setup_encode_message(_method)
+    CASES[f'decode_message_{_method}'] = setup_decode_message(_method)
+
+
+def measure(fn, repeat=5, budget=1.0):
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    times = [first]
+    deadline = start + budget
+    while len(times) < repeat and time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[0], times[len(times) // 2], len(times)
+
+
+def run(cases=None, impls=IMPLS, sizes=DEFAULT_SIZES, repeat=5, budget=1.0, seed=0, progress=None):
+    results = []
+    for size in sizes:
+        data = payload(size, seed)
+        for name in cases or CASES:
+            for impl in impls:
+                fn = CASES[name](data, impl)
+                if fn is None:
+                    continue
+                best, median, runs = measure(fn, repeat, budget)
+                row = {'case': name, 'impl': impl, 'size': size, 'best_s': best, 'median_s': median,
+                       'runs': runs, 'mb_per_s': round(size / best / 1e6, 3) if best else 0.0}
+                results.append(row)
+                if progress:
+                    progress(row)
+    return results
+
+
+def row_key(row):
+    return row['case'], row['impl'], row['size']
+
+
+def compare(results, baseline, tolerance=0.25):
+    base = {row_key(row): row for row in baseline['results']}
+    report = []
+    for row in results:
+        old = base.get(row_key(row))
+        if old is None or not old['best_s']:
+            continue
+        ratio = row['best_s'] / old['best_s']
+        report.append(dict(row, baseline_s=old['best_s'], ratio=round(ratio, 3), regression=ratio > 1 + tolerance))
+    return report
+
+
+def environment():
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'machine': platform.machine(), 'platform': platform.platform(), 'time': time.time()}
+
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_row(row):
+    print(f"{row['case']:<26}{row['impl']:<8}{row['size']:>9}  {row['best_s'] * 1000:>10.3f} ms  {row['mb_per_s']:>9.3f} MB/s")
+
+
+def parse_size(text):
+    units = {'k': 1024, 'm': 1024 * 1024}
+    text = text.strip().lower()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Codec benchmarks for algorithms.py")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help="default: all")
+    parser.add_argument('--impl', nargs='+', choices=IMPLS, default=list(IMPLS))
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=list(DEFAULT_SIZES),
+                        help="payload sizes in bytes (k/m suffixes allowed); moves cases use one move per byte")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds per measurement before stopping early")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--csv', help="write results to this file")
+    parser.add_argument('--baseline', help="compare against a results file written with --json")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before a regression is reported")
+    args = parser.parse_args()
+
+    results = run(args.cases, args.impl, args.sizes, args.repeat, args.budget, args.seed, print_row)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    if args.csv and results:
+        write_csv(results, args.csv)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report = compare(results, json.load(f), args.tolerance)
+        regressions = [row for row in report if row['regression']]
+        print(f"\nCompared {len(report)} results with {args.baseline}: {len(regressions)} regressions")
+        for row in regressions:
+            print(f"  {row['case']} {row['impl']} {row['size']}: {row['baseline_s'] * 1000:.3f} ms -> "
+                  f"{row['best_s'] * 1000:.3f} ms (x{row['ratio']})")
+        if regressions:
+            sys.exit(1)
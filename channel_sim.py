@@ -0,0 +1,187 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from algorithms import BitBuffer, encode_message, decode_message, flip_bits, METHODS
+from policies import BitErrorRate
+
+OUTCOMES = ('clean', 'false_alarm', 'corrected', 'benign', 'detected', 'false_correction', 'undetected')
+
+
+class BinarySymmetric:
+    def __init__(self, ber):
+        self.ber = ber
+        self.errors = BitErrorRate(ber)
+
+    def corrupt(self, buf, rng):
+        positions = self.errors.error_positions(len(buf), rng)
+        return (flip_bits(buf, positions) if positions else buf), len(positions)
+
+
+class Burst:
+    def __init__(self, rate, length=8):
+        self.rate = rate
+        self.length = int(length)
+
+    def corrupt(self, buf, rng):
+        n = len(buf)
+        if not n or rng.random() >= self.rate:
+            return buf, 0
+        start = rng.randrange(n)
+        positions = [p for p in range(start, min(n, start + self.length)) if rng.random() < 0.5]
+        positions = positions or [start]
+        return flip_bits(buf, positions), len(positions)
+
+
+class GilbertElliott:
+    def __init__(self, p_gb, p_bg, ber_bad=0.5, ber_good=0.0):
+        self.p_gb = p_gb
+        self.p_bg = p_bg
+        self.good = BitErrorRate(ber_good)
+        self.bad = BitErrorRate(ber_bad)
+
+    def sojourn(self, p, rng):
+        if p >= 1:
+            return 1
+        if p <= 0:
+            return math.inf
+        return 1 + int(math.log(1 - rng.random()) / math.log(1 - p))
+
+    def corrupt(self, buf, rng):
+        n = len(buf)
+        bad = rng.random() < self.p_gb / (self.p_gb + self.p_bg) if self.p_gb + self.p_bg else False
+        positions = []
+        i = 0
+        while i < n:
+            span = min(n - i, self.sojourn(self.p_bg if bad else self.p_gb, rng))
+            state = self.bad if bad else self.good
+            positions.extend(i + p for p in state.error_positions(span, rng))
+            i += span
+            bad = not bad
+        return (flip_bits(buf, positions) if positions else buf), len(positions)
+
+
+class Deletion:
+    def __init__(self, rate):
+        self.rate = rate
+        self.errors = BitErrorRate(rate)
+
+    def corrupt(self, buf, rng):
+        positions = self.errors.error_positions(len(buf), rng)
+        if not positions:
+            return buf, 0
+        bits = buf.to_bits()
+        kept = []
+        last = 0
+        for pos in positions:
+            kept.append(bits[last:pos])
+            last = pos + 1
+        kept.append(bits[last:])
+        return BitBuffer.from_bits(''.join(kept)), len(positions)
+
+
+CHANNELS = {
+    'bsc': BinarySymmetric,
+    'burst': Burst,
+    'gilbert': GilbertElliott,
+    'delete': Deletion,
+}
+
+
+def parse_channel(spec):
+    name, *params = spec.split(':')
+    if name not in CHANNELS:
+        raise ValueError(f'Unknown channel: {spec}')
+    return CHANNELS[name](*(float(p) for p in params))
+
+
+def classify(original, result, injected):
+    flagged = result['errors_detected'] or result['errors_corrected']
+    if not injected:
+        return 'false_alarm' if flagged else 'clean'
+    if result['errors_detected']:
+        return 'detected'
+    if result['decoded_text'] == original:
+        return 'corrected' if result['errors_corrected'] else 'benign'
+    return 'false_correction' if result['errors_corrected'] else 'undetected'
+
+
+def run_trials(job):
+    method, spec, trials, msg_bytes, seed = job
+    channel = parse_channel(spec)
+    rng = random.Random(seed)
+    counts = dict.fromkeys(OUTCOMES, 0)
+    bit_errors = encoded_bits = 0
+    start = time.perf_counter()
+    for _ in range(trials):
+        text = rng.randbytes(msg_bytes).decode('latin-1')
+        encoded = encode_message(text, method, packed=True)['encoded_data']
+        received, injected = channel.corrupt(encoded, rng)
+        counts[classify(text, decode_message(received, method), injected)] += 1
+        bit_errors += injected
+        encoded_bits += len(encoded)
+    return counts, bit_errors, encoded_bits, time.perf_counter() - start
+
+
+def simulate(method, spec, trials, msg_bytes=4, procs=None, seed=0, chunk=10000):
+    procs = procs or os.cpu_count() or 1
+    jobs = [(method, spec, min(chunk, trials - i), msg_bytes, f"{seed}:{method}:{spec}:{i}")
+            for i in range(0, trials, chunk)]
+    start = time.perf_counter()
+    if procs == 1 or len(jobs) == 1:
+        results = [run_trials(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(min(procs, len(jobs))) as pool:
+            results = pool.map(run_trials, jobs)
+    elapsed = time.perf_counter() - start
+    counts = dict.fromkeys(OUTCOMES, 0)
+    bit_errors = encoded_bits = 0
+    for part, errors, bits, _ in results:
+        for name in OUTCOMES:
+            counts[name] += part[name]
+        bit_errors += errors
+        encoded_bits += bits
+    corrupted = trials - counts['clean'] - counts['false_alarm']
+    return {
+        'method': method,
+        'channel': spec,
+        'trials': trials,
+        'msg_bytes': msg_bytes,
+        'counts': counts,
+        'corrupted': corrupted,
+        'undetected_rate': counts['undetected'] / corrupted if corrupted else 0.0,
+        'false_correction_rate': counts['false_correction'] / corrupted if corrupted else 0.0,
+        'residual_error_rate': (counts['undetected'] + counts['false_correction']) / trials if trials else 0.0,
+        'observed_ber': bit_errors / encoded_bits if encoded_bits else 0.0,
+        'elapsed_s': round(elapsed, 3),
+        'trials_per_sec': round(trials / elapsed, 1) if elapsed else 0.0,
+        'encoded_mbit_per_sec': round(encoded_bits / elapsed / 1e6, 3) if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo channel simulator for the chat codecs")
+    parser.add_argument('--methods', nargs='+', choices=METHODS, default=list(METHODS))
+    parser.add_argument('--channels', nargs='+', default=['bsc:0.001', 'bsc:0.01', 'burst:1:8', 'gilbert:0.01:0.3', 'delete:0.001'],
+                        help="bsc:ber | burst:rate[:length] | gilbert:p_gb:p_bg[:ber_bad[:ber_good]] | delete:rate")
+    parser.add_argument('--trials', type=int, default=100000)
+    parser.add_argument('--msg-bytes', type=int, default=4)
+    parser.add_argument('--procs', type=int, default=0, help="worker processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the results to this file")
+    args = parser.parse_args()
+
+    reports = []
+    print(f"{'method':<10}{'channel':<20}{'corrupted':>10}{'undetected':>12}{'false corr':>12}{'trials/s':>12}")
+    for spec in args.channels:
+        for method in args.methods:
+            report = simulate(method, spec, args.trials, args.msg_bytes, args.procs, args.seed)
+            reports.append(report)
+            print(f"{method:<10}{spec:<20}{report['corrupted']:>10}{report['undetected_rate']:>12.2e}"
+                  f"{report['false_correction_rate']:>12.2e}{report['trials_per_sec']:>12.0f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
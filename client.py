@@ -1,9 +1,9 @@
-import socket
-import threading
+import argparse
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, font
-import json
-from algorithms import encode_move, encode_message, decode_message
+from game_client import GameClient
+from gui_events import GuiEventQueue, RingLog
+from profiling import add_profile_args, profiler_from_args
 
 COLORS = {
     'bg_dark': '#0d1117',
@@ -20,110 +20,6 @@ COLORS = {
     'o_color': '#79c0ff',
 }
 
-class GameClient:
-    def __init__(self, host='localhost', port=5000):
-        self.host = host
-        self.port = port
-        self.socket = None
-        self.symbol = None
-        self.my_turn = False
-        self.gui = None
-        self.connected = False
-        self.game_active = False
-        
-    def connect(self):
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
-            threading.Thread(target=self.receive_loop, daemon=True).start()
-            return True
-        except:
-            return False
-    
-    def receive_loop(self):
-        while self.connected:
-            try:
-                data = self.socket.recv(4096)
-                if not data:
-                    break
-                msg = json.loads(data.decode())
-                self.handle_msg(msg)
-            except:
-                break
-    
-    def handle_msg(self, msg):
-        t = msg.get('type')
-        if t == 'assign':
-            self.symbol = msg['symbol']
-            self.safe_gui(lambda: self.gui.set_symbol(self.symbol))
-            self.safe_gui(lambda: self.gui.notify(f"You are Player {self.symbol}", 'success'))
-        elif t == 'game_start':
-            self.game_active = True
-            self.my_turn = (msg['current'] == self.symbol)
-            self.safe_gui(lambda: self.gui.reset_board())
-            self.safe_gui(lambda: self.gui.notify("Game started!", 'success'))
-            self.safe_gui(lambda: self.gui.set_turn(self.my_turn))
-        elif t == 'move_made':
-            pos = msg['position']
-            sym = msg['symbol']
-            self.safe_gui(lambda: self.gui.set_cell(pos, sym))
-            if msg.get('modified'):
-                self.safe_gui(lambda: self.gui.notify("Move was MODIFIED!", 'warning'))
-        elif t == 'turn':
-            self.my_turn = (msg['current'] == self.symbol)
-            self.safe_gui(lambda: self.gui.set_turn(self.my_turn))
-        elif t == 'round_over':
-            self.game_active = False
-            self.my_turn = False
-            self.safe_gui(lambda: self.gui.show_result(msg['winner'], msg['reason']))
-        elif t == 'restart_vote':
-            from_p = msg['from']
-            self.safe_gui(lambda: self.gui.notify(f"Player {from_p} wants rematch!", 'info'))
-            self.safe_gui(lambda: self.gui.show_restart_prompt(from_p))
-        elif t == 'server_restart':
-            self.safe_gui(lambda: self.gui.notify(f"Server restarted", 'info'))
-        elif t == 'server_end':
-            self.game_active = False
-            self.safe_gui(lambda: self.gui.notify("Server ended game", 'error'))
-        elif t == 'chat_msg':
-            self.safe_gui(lambda: self.gui.receive_chat(msg))
-    
-    def safe_gui(self, func):
-        if self.gui:
-            self.gui.root.after(0, func)
-    
-    def send(self, msg):
-        try:
-            self.socket.send(json.dumps(msg).encode())
-            return True
-        except:
-            return False
-    
-    def send_move(self, pos):
-        if not self.my_turn or not self.game_active:
-            return False
-        encoded = encode_move(pos, self.symbol)
-        self.send({'type': 'move', 'position': pos, 'symbol': self.symbol, 'encoded': encoded})
-        self.my_turn = False
-        self.safe_gui(lambda: self.gui.set_turn(False))
-        return True
-    
-    def send_chat(self, text, method):
-        enc = encode_message(text, method)
-        self.send({'type': 'chat', 'text': text, 'method': method, 'encoded': enc['encoded_data']})
-    
-    def vote_restart(self):
-        self.send({'type': 'vote_restart'})
-    
-    def surrender(self):
-        self.send({'type': 'surrender'})
-    
-    def disconnect(self):
-        self.connected = False
-        if self.socket:
-            self.socket.close()
-
 class ModernButton(tk.Canvas):
     def __init__(self, parent, text, command, bg=COLORS['accent'], fg='white', width=120, height=36):
         super().__init__(parent, width=width, height=height, bg=COLORS['bg_dark'], highlightthickness=0, cursor='hand2')
@@ -157,8 +53,8 @@ class ClientGUI:
     def __init__(self, client):
         self.client = client
         self.client.gui = self
-        self.board = ['' for _ in range(9)]
         self.root = tk.Tk()
+        self.events = GuiEventQueue(self.root)
         self.root.title("XO Game")
         self.root.geometry("800x600")
         self.root.configure(bg=COLORS['bg_dark'])
@@ -173,6 +69,8 @@ class ClientGUI:
         self.cell_font = font.Font(family='Segoe UI', size=32, weight='bold')
         self.small_font = font.Font(family='Consolas', size=9)
         self.setup_ui()
+        self.notif_log = RingLog(self.notif, self.events, 200)
+        self.chat_log = RingLog(self.chat, self.events, 1000)
         
     def setup_ui(self):
         # Header section
@@ -257,8 +155,11 @@ class ClientGUI:
         method_frame.grid(row=2, column=0, sticky='ew', padx=12, pady=5)
         tk.Label(method_frame, text="Method:", font=self.small_font, bg=COLORS['bg_card'], fg=COLORS['text_secondary']).pack(side='left')
         self.method = tk.StringVar(value='crc')
-        for txt, val in [('Parity', 'parity'), ('CRC', 'crc'), ('Hamming', 'hamming')]:
+        for txt, val in [('Parity', 'parity'), ('CRC', 'crc'), ('Hamming', 'hamming'), ('SECDED', 'secded'), ('H(72,64)', 'hamming72'), ('RS', 'rs')]:
             tk.Radiobutton(method_frame, text=txt, variable=self.method, value=val, bg=COLORS['bg_card'], fg=COLORS['text_secondary'], selectcolor=COLORS['bg_dark'], font=self.small_font).pack(side='left', padx=5)
+        tk.Label(method_frame, text="Block:", font=self.small_font, bg=COLORS['bg_card'], fg=COLORS['text_secondary']).pack(side='left', padx=(10, 0))
+        self.block_size = tk.Spinbox(method_frame, from_=0, to=4096, increment=8, width=5, font=self.small_font, bg=COLORS['bg_dark'], fg=COLORS['text_primary'], buttonbackground=COLORS['bg_card'], bd=0)
+        self.block_size.pack(side='left', padx=5)
         
         input_frame = tk.Frame(chat_card, bg=COLORS['bg_card'])
         input_frame.grid(row=3, column=0, sticky='ew', padx=12, pady=10)
@@ -282,35 +183,38 @@ class ClientGUI:
     def set_cell(self, pos, sym):
         if 0 <= pos <= 8:
             colors = {'X': COLORS['x_color'], 'O': COLORS['o_color']}
-            self.board[pos] = sym
             cell = self.btns[pos]
             self.board_canvas.itemconfig(cell['text'], text=sym, fill=colors.get(sym, COLORS['text_primary']))
             self.board_canvas.tag_unbind(f'cell_{pos}', '<Enter>')
             self.board_canvas.tag_unbind(f'cell_{pos}', '<Leave>')
     
     def reset_board(self):
-        self.board = ['' for _ in range(9)]
         for i, cell in enumerate(self.btns):
             self.board_canvas.itemconfig(cell['text'], text='', fill=COLORS['text_primary'])
             self.board_canvas.itemconfig(cell['rect'], fill=COLORS['bg_card'])
             self.board_canvas.tag_bind(f'cell_{i}', '<Enter>', lambda e, r=cell['rect']: self.board_canvas.itemconfig(r, fill=COLORS['bg_hover']))
             self.board_canvas.tag_bind(f'cell_{i}', '<Leave>', lambda e, r=cell['rect']: self.board_canvas.itemconfig(r, fill=COLORS['bg_card']))
     
+    def sync_board(self, cells):
+        self.reset_board()
+        for pos, sym in enumerate(cells):
+            if sym:
+                self.set_cell(pos, sym)
+        self.notify("Board resynced with server", 'warning')
+    
     def click_cell(self, pos):
         if not self.client.my_turn:
             self.notify("Not your turn!", 'warning')
             return
-        if self.board[pos]:
+        if not self.client.board.is_empty(pos):
             self.notify("Cell occupied!", 'warning')
             return
         if not self.client.game_active:
             return
-        self.set_cell(pos, self.client.symbol)
         self.client.send_move(pos)
     
     def notify(self, msg, level='info'):
-        self.notif.insert('end', f"{msg}\n")
-        self.notif.see('end')
+        self.notif_log.write(f"{msg}\n")
     
     def show_result(self, winner, reason):
         if winner == 'Draw':
@@ -356,23 +260,29 @@ class ClientGUI:
         if not txt:
             return
         self.entry.delete(0, 'end')
-        self.chat.insert('end', f"You [{self.method.get()}]: {txt}\n")
-        self.chat.see('end')
-        self.client.send_chat(txt, self.method.get())
+        self.chat_log.write(f"You [{self.method.get()}]: {txt}\n")
+        try:
+            block_size = int(self.block_size.get())
+        except ValueError:
+            block_size = 0
+        self.client.send_chat(txt, self.method.get(), block_size or None)
     
     def receive_chat(self, msg):
-        result = decode_message(msg['encoded'], msg['method'])
-        self.chat.insert('end', f"\nFrom: {msg['from']} [{msg['method']}]\n")
+        result = msg['result']
+        lines = [f"\nFrom: {msg['from']} [{msg['method']}]\n"]
         if msg.get('modified'):
-            self.chat.insert('end', "MODIFIED BY SERVER!\n")
-        self.chat.insert('end', f"Recv: {result['received_control']}\n")
-        self.chat.insert('end', f"Calc: {result['calculated_control']}\n")
-        self.chat.insert('end', f"Match: {'YES' if result['control_match'] else 'NO'}\n")
-        self.chat.insert('end', f"Text: {result['decoded_text']}\n\n")
-        self.chat.see('end')
+            lines.append("MODIFIED BY SERVER!\n")
+        lines.append(f"Recv: {result['received_control']}\n")
+        lines.append(f"Calc: {result['calculated_control']}\n")
+        lines.append(f"Match: {'YES' if result['control_match'] else 'NO'}\n")
+        if result.get('failed_blocks'):
+            lines.append(f"Failed blocks: {result['failed_blocks']} of {result['blocks']}\n")
+        lines.append(f"Text: {result['decoded_text']}\n\n")
+        self.chat_log.write(''.join(lines))
         self.notify(f"Message from {msg['from']}", 'info')
     
     def quit(self):
+        self.events.stop()
         self.client.disconnect()
         self.root.destroy()
     
@@ -383,7 +293,16 @@ class ClientGUI:
         else:
             self.notify("Connection failed!", 'error')
         self.root.protocol("WM_DELETE_WINDOW", self.quit)
+        self.events.start()
         self.root.mainloop()
 
 if __name__ == "__main__":
-    ClientGUI(GameClient()).run()
+    parser = argparse.ArgumentParser(description="XO game client")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5000)
+    add_profile_args(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    ClientGUI(GameClient(args.host, args.port)).run()
+    if profiler:
+        print(profiler.close())
@@ -0,0 +1,143 @@
+import json
+import struct
+
+FRAME_JSON = 0
+FRAME_BINARY = 1
+HEADER = struct.Struct('!BI')
+MAX_FRAME = 16 * 1024 * 1024
+
+SYMBOLS = ['X', 'O']
+MOD_TYPES = [None, 'flip', 'random']
+
+MSG_MOVE = 1
+MSG_MOVE_MADE = 2
+MSG_TURN = 3
+
+MOVE = struct.Struct('!BBH')
+MOVE_MADE = struct.Struct('!BBBBBI')
+TURN = struct.Struct('!BB')
+
+
+class FrameError(ValueError):
+    pass
+
+
+def _symbol_code(symbol):
+    return SYMBOLS.index(symbol)
+
+
+def encode_binary(msg):
+    t = msg.get('type')
+    if t == 'move':
+        return MOVE.pack(MSG_MOVE, _symbol_code(msg['symbol']), msg['frame'])
+    if t == 'move_made':
+        return MOVE_MADE.pack(MSG_MOVE_MADE, msg['position'], _symbol_code(msg['symbol']),
+                              1 if msg.get('modified') else 0, MOD_TYPES.index(msg.get('mod_type')), msg['board'])
+    if t == 'turn':
+        return TURN.pack(MSG_TURN, _symbol_code(msg['current']))
+    return None
+
+
+def decode_binary(view):
+    code = view[0]
+    try:
+        if code == MSG_MOVE:
+            _, sym, frame = MOVE.unpack_from(view)
+            return {'type': 'move', 'symbol': SYMBOLS[sym], 'frame': frame}
+        if code == MSG_MOVE_MADE:
+            _, pos, sym, modified, mod_type, board = MOVE_MADE.unpack_from(view)
+            return {'type': 'move_made', 'position': pos, 'symbol': SYMBOLS[sym],
+                    'modified': bool(modified), 'mod_type': MOD_TYPES[mod_type], 'board': board}
+        if code == MSG_TURN:
+            _, sym = TURN.unpack_from(view)
+            return {'type': 'turn', 'current': SYMBOLS[sym]}
+    except (struct.error, IndexError) as e:
+        raise FrameError(f'Malformed binary message: {e}')
+    raise FrameError(f'Unknown binary message code {code}')
+
+
+def encode_frame(msg, binary=False):
+    payload = None
+    kind = FRAME_JSON
+    if binary:
+        try:
+            payload = encode_binary(msg)
+        except (KeyError, ValueError, struct.error):
+            payload = None
+        if payload is not None:
+            kind = FRAME_BINARY
+    if payload is None:
+        payload = json.dumps(msg, separators=(',', ':')).encode()
+    if len(payload) > MAX_FRAME:
+        raise FrameError(f'Frame too large: {len(payload)} bytes')
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def decode_payload(kind, view):
+    if kind == FRAME_JSON:
+        return json.loads(bytes(view))
+    if kind == FRAME_BINARY:
+        return decode_binary(view)
+    raise FrameError(f'Unknown frame kind {kind}')
+
+
+def send_frame(sock, msg, binary=False):
+    sock.sendall(encode_frame(msg, binary))
+
+
+class FrameReader:
+    def __init__(self, bufsize=65536, max_frame=MAX_FRAME):
+        self.buffer = bytearray(bufsize)
+        self.start = 0
+        self.end = 0
+        self.max_frame = max_frame
+        self.received = 0
+
+    def _reserve(self, n):
+        if len(self.buffer) - self.end >= n:
+            return
+        pending = self.end - self.start
+        if self.start and len(self.buffer) - pending >= n:
+            self.buffer[:pending] = self.buffer[self.start:self.end]
+        else:
+            grown = bytearray(max(len(self.buffer) * 2, pending + n))
+            grown[:pending] = self.buffer[self.start:self.end]
+            self.buffer = grown
+        self.start, self.end = 0, pending
+
+    def feed(self, data):
+        self._reserve(len(data))
+        self.buffer[self.end:self.end + len(data)] = data
+        self.end += len(data)
+        self.received += len(data)
+        return self.messages()
+
+    def recv(self, sock, size=65536):
+        self._reserve(size)
+        with memoryview(self.buffer) as view:
+            n = sock.recv_into(view[self.end:], size)
+        if not n:
+            return None
+        self.end += n
+        self.received += n
+        return self.messages()
+
+    def messages(self):
+        out = []
+        need = 0
+        with memoryview(self.buffer) as view:
+            while self.end - self.start >= HEADER.size:
+                kind, length = HEADER.unpack_from(view, self.start)
+                if length > self.max_frame:
+                    raise FrameError(f'Frame too large: {length} bytes')
+                frame_end = self.start + HEADER.size + length
+                if frame_end > self.end:
+                    need = frame_end - self.end
+                    break
+                out.append(decode_payload(kind, view[self.start + HEADER.size:frame_end]))
+                self.start = frame_end
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif need:
+            self._reserve(need)
+        return out
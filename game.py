@@ -0,0 +1,621 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from algorithms import decode_move_frame, decode_stream, flip_bit, flip_bits, pack_bits, unpack_bits
+from spectators import SpectatorHub
+
+
+WIN_LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+)
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in WIN_LINES)
+FULL_MASK = 0x1FF
+MAX_SEQ = 0xFFFFFFFF
+
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+)
+
+_HAS_WIN = bytes(any(m & w == w for w in WIN_MASKS) for m in range(512))
+_LEGAL_MOVES = tuple(tuple(i for i in range(9) if not m >> i & 1) for m in range(512))
+_POPCOUNT = bytes(bin(m).count('1') for m in range(512))
+_SYMMETRY_TABLES = tuple(
+    tuple(sum(1 << i for i in range(9) if m >> perm[i] & 1) for m in range(512))
+    for perm in SYMMETRIES
+)
+
+
+def other_symbol(symbol):
+    return 'O' if symbol == 'X' else 'X'
+
+
+def valid_seq(seq):
+    return seq if type(seq) is int and 0 <= seq < MAX_SEQ else None
+
+
+class BitBoard:
+    __slots__ = ('x', 'o')
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_cells(cls, cells):
+        board = cls()
+        for pos, sym in enumerate(cells):
+            if sym:
+                board.place(pos, sym)
+        return board
+
+    @classmethod
+    def from_key(cls, key):
+        return cls(key & FULL_MASK, key >> 9)
+
+    def copy(self):
+        return BitBoard(self.x, self.o)
+
+    def reset(self):
+        self.x = self.o = 0
+
+    @property
+    def occupied(self):
+        return self.x | self.o
+
+    def cell(self, pos):
+        bit = 1 << pos
+        if self.x & bit:
+            return 'X'
+        if self.o & bit:
+            return 'O'
+        return ''
+
+    def is_empty(self, pos):
+        return not (self.x | self.o) >> pos & 1
+
+    def place(self, pos, symbol):
+        bit = 1 << pos
+        if not 0 <= pos <= 8 or (self.x | self.o) & bit:
+            return False
+        if symbol == 'X':
+            self.x |= bit
+        else:
+            self.o |= bit
+        return True
+
+    def legal_moves(self):
+        return _LEGAL_MOVES[self.x | self.o]
+
+    def turn(self):
+        return 'X' if _POPCOUNT[self.x] == _POPCOUNT[self.o] else 'O'
+
+    def winner(self):
+        if _HAS_WIN[self.x]:
+            return 'X'
+        if _HAS_WIN[self.o]:
+            return 'O'
+        if self.x | self.o == FULL_MASK:
+            return 'Draw'
+        return None
+
+    def key(self):
+        return self.x | self.o << 9
+
+    def canonical(self):
+        best, best_sym = None, 0
+        for sym, table in enumerate(_SYMMETRY_TABLES):
+            k = table[self.x] | table[self.o] << 9
+            if best is None or k < best:
+                best, best_sym = k, sym
+        return best, best_sym
+
+    def canonical_key(self):
+        return self.canonical()[0]
+
+    def to_list(self):
+        return [self.cell(i) for i in range(9)]
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.x == other.x and self.o == other.o
+
+    def __hash__(self):
+        return self.key()
+
+    def __repr__(self):
+        return f"BitBoard({''.join(self.cell(i) or '.' for i in range(9))!r})"
+
+
+class HoldQueue:
+    def __init__(self, limit=32):
+        self.limit = limit
+        self.queues = {'X': deque(), 'O': deque()}
+        self.held = 0
+        self.forwarded = 0
+        self.expired = 0
+        self.refused = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def __len__(self):
+        return sum(len(q) for q in self.queues.values())
+
+    def depth(self, symbol):
+        return len(self.queues[symbol])
+
+    def full(self, symbol):
+        return len(self.queues[symbol]) >= self.limit
+
+    def push(self, item):
+        queue = self.queues[item['symbol']]
+        item['held_at'] = time.monotonic()
+        queue.append(item)
+        self.held += 1
+        self.max_depth = max(self.max_depth, len(queue))
+
+    def head(self):
+        heads = [q[0] for q in self.queues.values() if q]
+        return min(heads, key=lambda item: item['held_at']) if heads else None
+
+    def find(self, symbol, seq):
+        if seq is None:
+            return None
+        for item in self.queues.get(symbol, ()):
+            if item.get('seq') == seq:
+                return item
+        return None
+
+    def holds(self, item):
+        return any(held is item for held in self.queues.get(item.get('symbol'), ()))
+
+    def remove(self, item):
+        queue = self.queues.get(item.get('symbol'))
+        if not queue:
+            return False
+        for i, held in enumerate(queue):
+            if held is item:
+                del queue[i]
+                break
+        else:
+            return False
+        wait = time.monotonic() - item['held_at']
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.forwarded += 1
+        return True
+
+    def clear(self):
+        for queue in self.queues.values():
+            queue.clear()
+
+    def stats(self):
+        return {'depth': {s: len(q) for s, q in self.queues.items()}, 'limit': self.limit, 'held': self.held,
+                'forwarded': self.forwarded, 'expired': self.expired, 'refused': self.refused,
+                'max_depth': self.max_depth, 'wait_max_ms': round(self.wait_max * 1000, 3),
+                'wait_avg_ms': round(self.wait_total / self.forwarded * 1000, 3) if self.forwarded else 0.0}
+
+
+class HoldSweeper:
+    def __init__(self):
+        self.deadlines = []
+        self.order = itertools.count()
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def schedule(self, deadline, match):
+        entry = (deadline, next(self.order), match)
+        with self.cond:
+            heapq.heappush(self.deadlines, entry)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='hold_sweeper', daemon=True)
+                self.thread.start()
+            elif self.deadlines[0] is entry:
+                self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.deadlines or self.deadlines[0][0] > time.monotonic():
+                    self.cond.wait(self.deadlines[0][0] - time.monotonic() if self.deadlines else None)
+                now = time.monotonic()
+                due = set()
+                while self.deadlines and self.deadlines[0][0] <= now:
+                    due.add(heapq.heappop(self.deadlines)[2])
+            for match in due:
+                match.expire_due()
+
+
+SWEEPER = HoldSweeper()
+
+
+class Match:
+    def __init__(self, match_id, send):
+        self.match_id = match_id
+        self.send = send
+        self.players = {}
+        self.observer = None
+        self.intercept = False
+        self.policy = None
+        self.journal = None
+        self.metrics = None
+        self.spectators = SpectatorHub(self)
+        self.policy_queue = deque()
+        self.lock = threading.RLock()
+        self.hold_timeout = None
+        self.moves = HoldQueue(1)
+        self.chats = HoldQueue()
+        self.board = BitBoard()
+        self.current_player = 'X'
+        self.game_active = False
+        self.restart_votes = set()
+
+    @property
+    def pending_move(self):
+        return self.moves.head()
+
+    @property
+    def pending_chat(self):
+        return self.chats.head()
+
+    def queue_stats(self):
+        with self.lock:
+            return {'moves': self.moves.stats(), 'chats': self.chats.stats()}
+
+    @property
+    def game_board(self):
+        return self.board.to_list()
+
+    def notify(self, event, *args):
+        observer = self.observer
+        if observer:
+            getattr(observer, event)(*args)
+
+    def add_player(self, symbol, handle, address=None):
+        with self.lock:
+            self.players[symbol] = handle
+        if self.journal:
+            self.journal.connect(self.match_id, symbol)
+        self.send(handle, {'type': 'assign', 'symbol': symbol})
+        if address:
+            self.notify('log', f"Player {symbol} connected from {address[0]}", 'success')
+        self.notify('update_player_status', symbol, True)
+
+    def remove_player(self, symbol):
+        with self.lock:
+            self.players.pop(symbol, None)
+            self.game_active = False
+        if self.journal:
+            self.journal.disconnect(self.match_id, symbol)
+        self.notify('update_player_status', symbol, False)
+
+    def start_game(self):
+        with self.lock:
+            self.board = BitBoard()
+            self.current_player = 'X'
+            self.game_active = True
+            self.restart_votes = set()
+            self.moves.clear()
+
+            self.broadcast({'type': 'game_start', 'current': 'X', 'board': self.board.to_list()})
+            if self.journal:
+                self.journal.game_start(self.match_id)
+
+        self.notify('reset_board')
+        self.notify('log', "Game started!", 'success')
+        self.notify('update_status', "Game in progress")
+
+    def process_message(self, symbol, msg):
+        msg_type = msg.get('type')
+
+        with self.lock:
+            if msg_type == 'move':
+                if self.game_active:
+                    frame = msg.get('frame')
+                    if not isinstance(frame, (int, bytes, bytearray)):
+                        self.reject_move(symbol, "Move without a frame")
+                        return
+                    decoded = decode_move_frame(frame, symbol)
+                    if not decoded['valid']:
+                        self.reject_move(symbol, ', '.join(decoded['errors']))
+                        return
+                    position = decoded['position']
+                    for note in decoded['corrections']:
+                        self.notify('log', f"Move from {symbol}: {note}", 'warning')
+                    if symbol != self.current_player or self.pending_move is not None:
+                        self.reject_move(symbol, "Not your turn", position)
+                        return
+                    if position is None or not 0 <= position <= 8 or not self.board.is_empty(position):
+                        self.reject_move(symbol, f"Illegal move {position}", position)
+                        return
+                    move = {
+                        'player_id': symbol,
+                        'symbol': symbol,
+                        'position': position,
+                        'original': position,
+                        'frame': frame
+                    }
+                    if self.policy:
+                        self.policy_queue.append(('move', move))
+                        self.run_policy()
+                    elif not self.intercept:
+                        self.forward_move(move)
+                    else:
+                        self.hold(self.moves, move)
+                        self.show_pending('move', self.pending_move)
+
+            elif msg_type == 'chat':
+                encoded = pack_bits(msg['encoded'])
+                chat = {
+                    'player_id': symbol,
+                    'symbol': symbol,
+                    'text': msg['text'],
+                    'method': msg['method'],
+                    'encoded': encoded,
+                    'sent': encoded,
+                    'block_size': msg.get('block_size'),
+                    'seq': valid_seq(msg.get('seq')),
+                    'repair': msg.get('repair')
+                }
+                held = self.chats.find(symbol, chat['seq'])
+                if self.policy:
+                    self.policy_queue.append(('chat', chat))
+                    self.run_policy()
+                elif not self.intercept:
+                    self.forward_chat(chat)
+                elif held is not None:
+                    held.update(chat, held_at=held['held_at'])
+                    self.send_held(symbol, chat['seq'])
+                elif self.chats.full(symbol):
+                    self.chats.refused += 1
+                    self.notify('log', f"Chat queue for {symbol} full, asking sender to back off", 'warning')
+                    self.send_to_symbol(symbol, {'type': 'chat_busy', 'seq': chat['seq'],
+                                                 'depth': self.chats.depth(symbol),
+                                                 'retry_after': self.hold_timeout or 1.0})
+                else:
+                    self.hold(self.chats, chat)
+                    self.send_held(symbol, chat['seq'])
+                    if self.pending_chat is chat:
+                        self.show_pending('chat', chat)
+                    else:
+                        self.notify('log', f"Chat from {symbol} queued ({len(self.chats)} held)", 'info')
+
+            elif msg_type in ('chat_ack', 'chat_nak', 'chat_skip'):
+                seq = valid_seq(msg.get('seq'))
+                if seq is None:
+                    self.notify('log', f"Dropping {msg_type} from {symbol} with bad seq {msg.get('seq')!r}", 'warning')
+                    return
+                if msg_type == 'chat_skip' and self.chats.find(symbol, seq) is not None:
+                    self.notify('log', f"Ignoring skip of held chat #{seq} from {symbol}", 'info')
+                    return
+                self.send_to_symbol(other_symbol(symbol), dict(msg, **{'from': symbol}))
+                if self.journal:
+                    blocks = msg.get('blocks')
+                    self.journal.chat_reply(self.match_id, symbol, msg_type, seq,
+                                            blocks if isinstance(blocks, list) else None)
+                if self.metrics:
+                    self.metrics.chat_reply(self.match_id, symbol, msg_type, seq)
+
+            elif msg_type == 'surrender':
+                self.end_round(other_symbol(symbol), f"Player {symbol} surrendered")
+
+            elif msg_type == 'vote_restart':
+                if self.game_active:
+                    return
+
+                self.restart_votes.add(symbol)
+                other = other_symbol(symbol)
+
+                self.notify('log', f"Player {symbol} voted for restart ({len(self.restart_votes)}/2)", 'info')
+
+                if other not in self.restart_votes:
+                    self.send_to_symbol(other, {
+                        'type': 'restart_vote',
+                        'from': symbol,
+                        'message': f'Player {symbol} wants to play again!'
+                    })
+
+                if len(self.restart_votes) >= 2:
+                    self.notify('log', "Both players voted! Starting new game...", 'success')
+                    self.start_game()
+
+    def reject_move(self, symbol, reason, position=None):
+        if self.journal:
+            self.journal.move_rejected(self.match_id, symbol, position)
+        self.notify('log', f"Rejected move from {symbol}: {reason}", 'error')
+        self.send_to_symbol(symbol, {'type': 'move_rejected', 'reason': reason, 'board': self.board.key(),
+                                     'current': self.current_player})
+
+    def send_held(self, symbol, seq):
+        if seq is not None:
+            self.send_to_symbol(symbol, {'type': 'chat_busy', 'seq': seq, 'held': True,
+                                         'retry_after': self.hold_timeout or 1.0})
+
+    def release_pending(self, kind, edit=None):
+        with self.lock:
+            item = self.pending_move if kind == 'move' else self.pending_chat
+            if item is None:
+                return None
+            args = (edit(item) or ()) if edit else ()
+            (self.forward_move if kind == 'move' else self.forward_chat)(item, *args)
+            return item
+
+    def hold(self, queue, item):
+        queue.push(item)
+        if self.hold_timeout:
+            SWEEPER.schedule(item['held_at'] + self.hold_timeout, self)
+
+    def expire_due(self):
+        with self.lock:
+            if not self.hold_timeout:
+                return
+            cutoff = time.monotonic() - self.hold_timeout
+            for queue, forward in ((self.moves, self.forward_move), (self.chats, self.forward_chat)):
+                item = queue.head()
+                while item is not None and item['held_at'] <= cutoff:
+                    queue.expired += 1
+                    self.notify('log', f"Hold timeout, auto-forwarding {'chat' if queue is self.chats else 'move'} "
+                                       f"from {item['symbol']}", 'warning')
+                    forward(item)
+                    if queue.holds(item):
+                        break
+                    item = queue.head()
+
+    def show_pending(self, kind, item):
+        if item:
+            self.notify('show_pending_' + kind, item)
+        else:
+            self.notify('clear_pending_' + kind)
+
+    def run_policy(self):
+        with self.lock:
+            while self.policy_queue:
+                kind, item = self.policy_queue.popleft()
+                if kind == 'move':
+                    decision = self.policy.process_move(self, item)
+                    if decision:
+                        item['position'], mod_type = decision
+                        self.forward_move(item, True, mod_type)
+                    else:
+                        self.forward_move(item)
+                else:
+                    decision = self.policy.process_chat(self, item)
+                    if decision:
+                        item['encoded'] = decision[0]
+                    self.forward_chat(item, inject_error=bool(decision))
+
+    def send_to_symbol(self, symbol, msg):
+        handle = self.players.get(symbol)
+        if handle is not None:
+            self.send(handle, msg)
+
+    def broadcast(self, msg):
+        for handle in list(self.players.values()):
+            self.send(handle, msg)
+        self.spectators.publish(msg)
+
+    def forward_move(self, move, modified=False, mod_type=None):
+        with self.lock:
+            if not move or 'held_at' in move and not self.moves.remove(move):
+                return
+            if not self.game_active:
+                return
+
+            pos = move['position']
+            symbol = move['symbol']
+
+            if self.board.place(pos, symbol):
+
+                self.broadcast({
+                    'type': 'move_made',
+                    'position': pos,
+                    'symbol': symbol,
+                    'modified': modified,
+                    'mod_type': mod_type,
+                    'board': self.board.key()
+                })
+
+                self.notify('update_board', pos, symbol)
+                if self.journal:
+                    self.journal.move(self.match_id, symbol, move.get('original', pos), pos, modified, mod_type)
+                if modified and self.metrics:
+                    self.metrics.tamper('move', mod_type)
+
+                winner = self.check_winner()
+                if winner:
+                    if winner == 'Draw':
+                        self.end_round('Draw', "It's a draw!")
+                    else:
+                        self.end_round(winner, f"Player {winner} wins!")
+                else:
+                    self.current_player = other_symbol(self.current_player)
+                    self.broadcast({'type': 'turn', 'current': self.current_player})
+        self.show_pending('move', self.pending_move)
+
+    def forward_chat(self, chat, inject_error=False, error_type=None):
+        with self.lock:
+            if not chat or 'held_at' in chat and not self.chats.remove(chat):
+                return
+
+            encoded = chat['encoded']
+            if inject_error and error_type:
+                if error_type == 'flip_bit' and len(encoded) > 0:
+                    pos = random.randint(0, len(encoded)-1)
+                    encoded = flip_bit(encoded, pos)
+                    self.notify('log', f"Flipped bit at position {pos}", 'warning')
+                elif error_type == 'flip_multi' and len(encoded) > 0:
+                    positions = [random.randint(0, len(encoded)-1) for _ in range(min(3, len(encoded)))]
+                    encoded = flip_bits(encoded, positions)
+                    self.notify('log', "Flipped multiple bits", 'warning')
+
+            out = {
+                'type': 'chat_msg',
+                'from': chat['symbol'],
+                'encoded': unpack_bits(encoded),
+                'method': chat['method'],
+                'original': chat['text'],
+                'modified': inject_error
+            }
+            for key in ('block_size', 'seq', 'repair'):
+                if chat.get(key) is not None:
+                    out[key] = chat[key]
+            self.send_to_symbol(other_symbol(chat['symbol']), out)
+            self.spectators.publish(out)
+            recovered = False
+            if inject_error and chat.get('repair') is None and (self.journal or self.metrics):
+                result = decode_stream(encoded, chat['method'], chat.get('block_size'))
+                recovered = result['valid'] and result['decoded_text'] == chat['text']
+            if self.journal:
+                self.journal.chat(self.match_id, chat['symbol'], chat['method'], chat.get('seq'),
+                                  chat.get('sent', chat['encoded']), encoded, inject_error, recovered)
+            if self.metrics:
+                self.metrics.chat_forwarded(self.match_id, chat['symbol'], chat['method'], chat.get('seq'),
+                                            inject_error, error_type, recovered)
+        self.show_pending('chat', self.pending_chat)
+
+    def end_round(self, winner, reason):
+        with self.lock:
+            self.game_active = False
+            self.restart_votes = set()
+
+            self.broadcast({
+                'type': 'round_over',
+                'winner': winner,
+                'reason': reason
+            })
+            if self.journal:
+                self.journal.round_over(self.match_id, winner)
+
+        self.notify('log', f"Round over: {reason}", 'info')
+        self.notify('update_status', "Round ended")
+
+    def server_restart(self, note=""):
+        self.broadcast({'type': 'server_restart', 'note': note})
+        self.start_game()
+
+    def server_end(self, note=""):
+        with self.lock:
+            self.game_active = False
+            self.broadcast({'type': 'server_end', 'note': note})
+        self.notify('log', f"Game ended: {note}", 'error')
+
+    def check_winner(self):
+        return self.board.winner()
+
+
+def add_hold_args(parser):
+    parser.add_argument('--hold-timeout', type=float,
+                        help="auto-forward intercepted moves and chats after this many seconds")
+    parser.add_argument('--queue-limit', type=int, default=32,
+                        help="intercepted chats held per player before the sender is told to back off")
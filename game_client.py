@@ -0,0 +1,186 @@
+import socket
+import threading
+import time
+from algorithms import encode_move_frame
+from arq import ArqReceiver, ArqSender, ArqStats
+from framing import FrameReader, encode_frame
+from game import BitBoard
+from parallel import encode_message, decode_message
+
+
+class GameClient:
+    def __init__(self, host='localhost', port=5000):
+        self.host = host
+        self.port = port
+        self.socket = None
+        self.send_lock = threading.Lock()
+        self.symbol = None
+        self.my_turn = False
+        self.gui = None
+        self.connected = False
+        self.game_active = False
+        self.board = BitBoard()
+        self.resyncs = 0
+        self.binary_frames = True
+        self.arq = True
+        self.sender_stats = ArqStats()
+        self.receiver_stats = ArqStats()
+        self.reset_arq()
+
+    def reset_arq(self):
+        self.chat_sender = ArqSender(self.send, stats=self.sender_stats)
+        self.chat_receiver = ArqReceiver(self.send, stats=self.receiver_stats)
+
+    def arq_stats(self):
+        return {'sent': self.sender_stats.to_dict(), 'received': self.receiver_stats.to_dict()}
+        
+    def connect(self):
+        try:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.socket.connect((self.host, self.port))
+            self.connected = True
+            threading.Thread(target=self.receive_loop, name='receive_loop', daemon=True).start()
+            threading.Thread(target=self.arq_loop, name='arq_loop', daemon=True).start()
+            return True
+        except:
+            return False
+    
+    def receive_loop(self):
+        reader = FrameReader()
+        while self.connected:
+            try:
+                msgs = reader.recv(self.socket)
+                if msgs is None:
+                    break
+                for msg in msgs:
+                    self.handle_msg(msg)
+            except:
+                break
+    
+    def arq_loop(self):
+        while self.connected:
+            time.sleep(self.chat_sender.timeout / 4)
+            self.chat_sender.poll()
+    
+    def handle_msg(self, msg):
+        t = msg.get('type')
+        if t == 'assign':
+            self.symbol = msg['symbol']
+            self.reset_arq()
+            self.safe_gui(lambda: self.gui.set_symbol(self.symbol))
+            self.safe_gui(lambda: self.gui.notify(f"You are Player {self.symbol}", 'success'))
+        elif t == 'game_start':
+            self.board = BitBoard.from_cells(msg.get('board', []))
+            self.game_active = True
+            self.my_turn = (msg['current'] == self.symbol)
+            self.safe_gui(lambda: self.gui.reset_board(), 'board')
+            self.safe_gui(lambda: self.gui.notify("Game started!", 'success'))
+            self.safe_gui(lambda: self.gui.set_turn(self.my_turn), 'turn')
+        elif t == 'move_made':
+            pos = msg['position']
+            sym = msg['symbol']
+            self.board.place(pos, sym)
+            self.safe_gui(lambda: self.gui.set_cell(pos, sym), ('cell', pos))
+            self.check_board(msg.get('board'))
+            if msg.get('modified'):
+                self.safe_gui(lambda: self.gui.notify("Move was MODIFIED!", 'warning'))
+        elif t == 'move_rejected':
+            self.check_board(msg.get('board'))
+            self.my_turn = self.game_active and msg.get('current', self.symbol) == self.symbol
+            self.safe_gui(lambda: self.gui.notify(f"Move rejected: {msg['reason']}", 'error'))
+            self.safe_gui(lambda: self.gui.set_turn(self.my_turn), 'turn')
+        elif t == 'turn':
+            self.my_turn = (msg['current'] == self.symbol)
+            self.safe_gui(lambda: self.gui.set_turn(self.my_turn), 'turn')
+        elif t == 'round_over':
+            self.game_active = False
+            self.my_turn = False
+            self.safe_gui(lambda: self.gui.show_result(msg['winner'], msg['reason']))
+        elif t == 'restart_vote':
+            from_p = msg['from']
+            self.safe_gui(lambda: self.gui.notify(f"Player {from_p} wants rematch!", 'info'))
+            self.safe_gui(lambda: self.gui.show_restart_prompt(from_p))
+        elif t == 'server_restart':
+            self.safe_gui(lambda: self.gui.notify(f"Server restarted", 'info'))
+        elif t == 'server_end':
+            self.game_active = False
+            self.safe_gui(lambda: self.gui.notify("Server ended game", 'error'))
+        elif t == 'chat_msg':
+            if 'seq' not in msg:
+                msg['result'] = decode_message(msg['encoded'], msg['method'], msg.get('block_size'))
+                self.deliver_chat(msg)
+                return
+            for delivered in self.chat_receiver.receive(msg):
+                self.deliver_chat(delivered)
+            if 'result' in msg and not msg['result']['valid']:
+                self.safe_gui(lambda: self.gui.notify(f"Corrupted chat #{msg['seq']}, retransmission requested", 'warning'))
+        elif t == 'chat_ack':
+            self.chat_sender.on_ack(msg['seq'])
+        elif t == 'chat_nak':
+            self.chat_sender.on_nak(msg['seq'], msg.get('blocks'))
+        elif t == 'chat_busy':
+            if msg.get('seq') is not None:
+                self.chat_sender.on_busy(msg['seq'], msg.get('retry_after'))
+            else:
+                self.safe_gui(lambda: self.gui.notify("Server busy, chat was not delivered", 'warning'))
+        elif t == 'chat_skip':
+            for delivered in self.chat_receiver.skip(msg['seq']):
+                self.deliver_chat(delivered)
+    
+    def check_board(self, key):
+        if key is None or key == self.board.key():
+            return True
+        self.resyncs += 1
+        self.board = BitBoard.from_key(key)
+        cells = self.board.to_list()
+        self.safe_gui(lambda: self.gui.sync_board(cells), 'board')
+        return False
+
+    def deliver_chat(self, msg):
+        self.safe_gui(lambda: self.gui.receive_chat(msg))
+    
+    def safe_gui(self, func, key=None):
+        if self.gui:
+            self.gui.events.post(func, key=key)
+    
+    def send(self, msg):
+        try:
+            frame = encode_frame(msg, self.binary_frames)
+            with self.send_lock:
+                self.socket.sendall(frame)
+            return True
+        except:
+            return False
+    
+    def send_move(self, pos):
+        if not self.my_turn or not self.game_active:
+            return False
+        self.send({'type': 'move', 'symbol': self.symbol, 'frame': encode_move_frame(pos)})
+        self.my_turn = False
+        self.safe_gui(lambda: self.gui.set_turn(False), 'turn')
+        return True
+    
+    def send_chat(self, text, method, block_size=None):
+        if self.arq:
+            return self.chat_sender.submit(text, method, block_size)
+        enc = encode_message(text, method, block_size=block_size)
+        msg = {'type': 'chat', 'text': text, 'method': method, 'encoded': enc['encoded_data']}
+        if block_size:
+            msg['block_size'] = block_size
+        return self.send(msg)
+    
+    def vote_restart(self):
+        self.send({'type': 'vote_restart'})
+    
+    def surrender(self):
+        self.send({'type': 'surrender'})
+    
+    def disconnect(self):
+        self.connected = False
+        if self.socket:
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.socket.close()
@@ -0,0 +1,103 @@
+import sys
+import threading
+from collections import deque
+
+
+class GuiEventQueue:
+    def __init__(self, root, interval=50, batch=2000):
+        self.root = root
+        self.interval = interval
+        self.batch = batch
+        self.events = deque()
+        self.keyed = {}
+        self.lock = threading.Lock()
+        self.serial = 0
+        self.posted = 0
+        self.coalesced = 0
+        self.handled = 0
+        self.running = False
+
+    def post(self, func, *args, key=None):
+        with self.lock:
+            self.serial += 1
+            self.posted += 1
+            if key is not None:
+                if key in self.keyed:
+                    self.coalesced += 1
+                self.keyed[key] = self.serial
+            self.events.append((self.serial, key, func, args))
+
+    def start(self):
+        self.running = True
+        self.root.after(self.interval, self.drain)
+
+    def stop(self):
+        self.running = False
+
+    def drain(self):
+        if not self.running:
+            return
+        ready = []
+        with self.lock:
+            for _ in range(min(self.batch, len(self.events))):
+                serial, key, func, args = self.events.popleft()
+                if key is not None:
+                    if self.keyed.get(key) != serial:
+                        continue
+                    del self.keyed[key]
+                ready.append((func, args))
+            more = bool(self.events)
+        self.root.after(1 if more else self.interval, self.drain)
+        for func, args in ready:
+            try:
+                func(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        self.handled += len(ready)
+
+    def stats(self):
+        return {'posted': self.posted, 'coalesced': self.coalesced, 'handled': self.handled,
+                'queued': len(self.events)}
+
+
+class GuiProxy:
+    def __init__(self, target, events, keys=None):
+        self.target = target
+        self.events = events
+        self.keys = keys or {}
+        self.active = True
+
+    def __getattr__(self, name):
+        method = getattr(self.target, name)
+        key = self.keys.get(name)
+
+        def post(*args):
+            self.events.post(self.call, method, *args, key=key(*args) if key else None)
+        return post
+
+    def call(self, method, *args):
+        if self.active:
+            method(*args)
+
+
+class RingLog:
+    def __init__(self, widget, events, limit=1000):
+        self.widget = widget
+        self.events = events
+        self.limit = limit
+        self.pending = deque(maxlen=limit)
+
+    def write(self, text):
+        self.pending.append(text)
+        self.events.post(self.flush, key=self)
+
+    def flush(self):
+        lines = [self.pending.popleft() for _ in range(len(self.pending))]
+        if not lines:
+            return
+        widget = self.widget
+        widget.insert('end', ''.join(lines))
+        excess = int(widget.index('end-1c').split('.')[0]) - self.limit
+        if excess > 0:
+            widget.delete('1.0', f'{excess + 1}.0')
+        widget.see('end')
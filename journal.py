@@ -0,0 +1,258 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from algorithms import METHODS, to_packed
+
+MAGIC = b'XOJ1'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+RECORD = struct.Struct('<dIBBBBHHIIIII')
+FIELDS = ('time', 'match', 'kind', 'player', 'code', 'flags', 'a', 'b', 'seq', 'nbits', 'errors', 'before', 'after')
+KIND_OFFSET = 12
+CHUNK = RECORD.size * 8192
+
+EVENTS = ('connect', 'disconnect', 'game_start', 'move', 'move_rejected',
+          'chat', 'chat_ack', 'chat_nak', 'chat_skip', 'round_over')
+(CONNECT, DISCONNECT, GAME_START, MOVE, MOVE_REJECTED,
+ CHAT, CHAT_ACK, CHAT_NAK, CHAT_SKIP, ROUND_OVER) = range(len(EVENTS))
+PLAYERS = ('X', 'O', 'Draw')
+MOD_TYPES = (None, 'flip', 'random')
+NONE = 255
+NO_SEQ = 0xFFFFFFFF
+MODIFIED = 1
+RECOVERED = 2
+
+
+def _code(table, value):
+    try:
+        return table.index(value)
+    except ValueError:
+        return NONE
+
+
+def _name(table, code):
+    return table[code] if code < len(table) else None
+
+
+class Journal:
+    def __init__(self, path, batch=512, interval=1.0):
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.buffer = bytearray()
+        self.pending = 0
+        self.records = 0
+        self.last_flush = time.monotonic()
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self.file.flush()
+        self.stopped = threading.Event()
+        threading.Thread(target=self.flush_loop, name='journal', daemon=True).start()
+
+    def record(self, match, kind, player=None, code=NONE, flags=0, a=0, b=0, seq=NO_SEQ, nbits=0,
+               errors=0, before=0, after=0):
+        entry = RECORD.pack(time.time(), match, kind, _code(PLAYERS, player), code, flags, a, b,
+                            seq, nbits, errors, before, after)
+        with self.lock:
+            if self.file is None:
+                return
+            self.buffer += entry
+            self.pending += 1
+            self.records += 1
+            if self.pending >= self.batch or time.monotonic() - self.last_flush >= self.interval:
+                self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer.clear()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self._flush()
+
+    def flush_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        self.stopped.set()
+        with self.lock:
+            if self.file is not None:
+                self._flush()
+                self.file.close()
+                self.file = None
+
+    def connect(self, match, symbol):
+        self.record(match, CONNECT, symbol)
+
+    def disconnect(self, match, symbol):
+        self.record(match, DISCONNECT, symbol)
+
+    def game_start(self, match):
+        self.record(match, GAME_START)
+
+    def move(self, match, symbol, original, position, modified=False, mod_type=None):
+        self.record(match, MOVE, symbol, _code(MOD_TYPES, mod_type), MODIFIED if modified else 0,
+                    original, position)
+
+    def move_rejected(self, match, symbol, position=None):
+        self.record(match, MOVE_REJECTED, symbol, a=position if isinstance(position, int) and 0 <= position < NONE else NONE)
+
+    def chat(self, match, symbol, method, seq, sent, received, modified=False, recovered=False):
+        sent, received = to_packed(sent), to_packed(received)
+        errors = (sent ^ received).count() if sent.nbits == received.nbits else abs(sent.nbits - received.nbits)
+        self.record(match, CHAT, symbol, _code(METHODS, method),
+                    (MODIFIED if modified else 0) | (RECOVERED if recovered else 0),
+                    seq=NO_SEQ if seq is None else seq, nbits=received.nbits, errors=errors,
+                    before=zlib.crc32(sent.data), after=zlib.crc32(received.data))
+
+    def chat_reply(self, match, symbol, kind, seq, blocks=None):
+        self.record(match, EVENTS.index(kind), symbol, seq=seq, errors=len(blocks or ()))
+
+    def round_over(self, match, winner):
+        self.record(match, ROUND_OVER, winner)
+
+
+class JournalReader:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.size:
+            self.file.close()
+            raise ValueError(f'{path} is not a game journal')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f'{path} is not a version {VERSION} game journal')
+        self.count = (size - HEADER.size) // RECORD.size
+        self.end = HEADER.size + self.count * RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for start in range(HEADER.size, self.end, CHUNK):
+            yield from RECORD.iter_unpack(self.map[start:min(start + CHUNK, self.end)])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def records(self, start=0):
+        start = start if start >= 0 else max(0, self.count + start)
+        for i in range(start, self.count):
+            values = RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size)
+            yield self.describe(values)
+
+    def describe(self, values):
+        entry = dict(zip(FIELDS, values))
+        kind = entry['kind']
+        entry['kind'] = EVENTS[kind] if kind < len(EVENTS) else kind
+        entry['player'] = _name(PLAYERS, entry['player'])
+        if kind == CHAT:
+            entry['code'] = _name(METHODS, entry['code'])
+        elif kind == MOVE:
+            entry['code'] = _name(MOD_TYPES, entry['code'])
+        return entry
+
+    def kind_counts(self):
+        kinds = self.map[HEADER.size + KIND_OFFSET:self.end:RECORD.size]
+        return {name: kinds.count(code) for code, name in enumerate(EVENTS)}
+
+    def analyze(self):
+        games = dict.fromkeys(PLAYERS, 0)
+        moves = {'total': 0, 'tampered': 0, 'rejected': 0}
+        codecs = {}
+        last = {}
+        for _, match, kind, player, code, flags, a, b, seq, nbits, errors, before, after in self:
+            if kind == CHAT:
+                method = _name(METHODS, code) or 'unknown'
+                stats = codecs.get(method)
+                if stats is None:
+                    stats = codecs[method] = {'frames': 0, 'tampered': 0, 'bit_errors': 0, 'bits': 0,
+                                              'detected': 0, 'corrected': 0, 'accepted': 0, 'false_alarms': 0}
+                tampered = before != after or errors > 0
+                stats['frames'] += 1
+                stats['bits'] += nbits
+                stats['bit_errors'] += errors
+                stats['tampered'] += tampered
+                if seq != NO_SEQ:
+                    last[match, player, seq] = stats, tampered, flags & RECOVERED
+            elif kind == CHAT_ACK or kind == CHAT_NAK:
+                sent = last.pop((match, 1 - player, seq), None)
+                if sent is not None:
+                    stats, tampered, recovered = sent
+                    if kind == CHAT_NAK:
+                        stats['detected' if tampered else 'false_alarms'] += 1
+                    elif tampered:
+                        stats['corrected' if recovered else 'accepted'] += 1
+            elif kind == MOVE:
+                moves['total'] += 1
+                moves['tampered'] += a != b or flags & MODIFIED
+            elif kind == MOVE_REJECTED:
+                moves['rejected'] += 1
+            elif kind == ROUND_OVER and player < len(PLAYERS):
+                games[PLAYERS[player]] += 1
+        for stats in codecs.values():
+            caught = stats['detected'] + stats['corrected']
+            judged = caught + stats['accepted']
+            stats['detection_rate'] = round(caught / judged, 6) if judged else None
+            stats['observed_ber'] = stats['bit_errors'] / stats['bits'] if stats['bits'] else 0.0
+        return {'records': self.count, 'events': self.kind_counts(), 'games': games, 'moves': moves, 'codecs': codecs}
+
+
+def add_journal_args(parser):
+    parser.add_argument('--journal', help="append a binary event journal to this file")
+
+
+def journal_from_args(args):
+    return Journal(args.journal) if args.journal else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay and analyze a binary game journal")
+    parser.add_argument('path')
+    parser.add_argument('--tail', type=int, default=0, help="print the last N records")
+    parser.add_argument('--json', action='store_true', help="print the analysis as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with JournalReader(args.path) as reader:
+        for entry in reader.records(-args.tail) if args.tail else ():
+            print(entry)
+        report = reader.analyze()
+    report['scan_s'] = round(time.perf_counter() - start, 3)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['records']} records in {report['scan_s']}s")
+        print("Events: " + ", ".join(f"{k}={v}" for k, v in report['events'].items() if v))
+        print("Games: " + ", ".join(f"{k}={v}" for k, v in report['games'].items()))
+        moves = report['moves']
+        print(f"Moves: {moves['total']} total, {moves['tampered']} tampered, {moves['rejected']} rejected")
+        print(f"{'codec':<10}{'frames':>9}{'tampered':>10}{'detected':>10}{'corrected':>11}{'accepted':>10}{'rate':>9}")
+        for method, s in sorted(report['codecs'].items()):
+            rate = '-' if s['detection_rate'] is None else f"{s['detection_rate']:.4f}"
+            print(f"{method:<10}{s['frames']:>9}{s['tampered']:>10}{s['detected']:>10}{s['corrected']:>11}"
+                  f"{s['accepted']:>10}{rate:>9}")
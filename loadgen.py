@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+from algorithms import METHODS
+from framing import FrameReader, FrameError, encode_frame
+from game_client import GameClient
+
+CHAT_METHODS = METHODS
+COUNTERS = ('games', 'moves', 'chats_sent', 'chats_received', 'chat_mismatches',
+            'chat_retransmits', 'chat_failures', 'moves_rejected', 'board_resyncs', 'errors', 'connect_failures')
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class LoadStats:
+    def __init__(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.move_latencies = []
+        self.chat_latencies = []
+        self.chat_sent_at = {}
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in COUNTERS}
+        data['move_latencies'] = self.move_latencies
+        data['chat_latencies'] = self.chat_latencies
+        return data
+
+    def merge(self, data):
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + data[name])
+        self.move_latencies.extend(data['move_latencies'])
+        self.chat_latencies.extend(data['chat_latencies'])
+
+    def report(self, players, elapsed):
+        operations = self.moves + self.chats_received
+        return {
+            'players': players,
+            'elapsed_s': round(elapsed, 3),
+            'games': self.games,
+            'moves': self.moves,
+            'moves_per_sec': round(self.moves / elapsed, 1) if elapsed else 0.0,
+            'move_rtt_p50_ms': round(percentile(self.move_latencies, 50) * 1000, 3),
+            'move_rtt_p99_ms': round(percentile(self.move_latencies, 99) * 1000, 3),
+            'chats_sent': self.chats_sent,
+            'chats_received': self.chats_received,
+            'chat_latency_p50_ms': round(percentile(self.chat_latencies, 50) * 1000, 3),
+            'chat_latency_p99_ms': round(percentile(self.chat_latencies, 99) * 1000, 3),
+            'chat_mismatches': self.chat_mismatches,
+            'chat_retransmits': self.chat_retransmits,
+            'chat_failures': self.chat_failures,
+            'moves_rejected': self.moves_rejected,
+            'board_resyncs': self.board_resyncs,
+            'errors': self.errors,
+            'connect_failures': self.connect_failures,
+            'error_rate': round(self.errors / operations, 6) if operations else 0.0,
+        }
+
+
+class SimPlayer(GameClient):
+    def __init__(self, host, port, pid, stats, rng, chat_rate=0.2):
+        super().__init__(host, port)
+        self.pid = pid
+        self.stats = stats
+        self.rng = rng
+        self.chat_rate = chat_rate
+        self.chat_seq = 0
+        self.move_sent_at = None
+        self.writer = None
+
+    async def run(self, stop):
+        try:
+            reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            self.stats.connect_failures += 1
+            return
+        self.connected = True
+        frames = FrameReader()
+        ticker = asyncio.create_task(self.arq_ticker(stop))
+        try:
+            while not stop.is_set():
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for msg in frames.feed(data):
+                    self.handle_msg(msg)
+        except (ConnectionError, FrameError):
+            if not stop.is_set():
+                self.stats.errors += 1
+        finally:
+            self.connected = False
+            ticker.cancel()
+            self.writer.close()
+
+    async def arq_ticker(self, stop):
+        while not stop.is_set():
+            await asyncio.sleep(self.chat_sender.timeout / 4)
+            self.chat_sender.poll()
+
+    def send(self, msg):
+        if self.writer is None or self.writer.is_closing():
+            return False
+        self.writer.write(encode_frame(msg, self.binary_frames))
+        return True
+
+    def disconnect(self):
+        self.connected = False
+        if self.writer:
+            self.writer.close()
+
+    def handle_msg(self, msg):
+        super().handle_msg(msg)
+        t = msg.get('type')
+        if t == 'move_made':
+            if msg['symbol'] == self.symbol and self.move_sent_at is not None:
+                self.stats.move_latencies.append(time.perf_counter() - self.move_sent_at)
+                self.stats.moves += 1
+                self.move_sent_at = None
+        elif t == 'move_rejected':
+            self.stats.moves_rejected += 1
+            self.move_sent_at = None
+        elif t == 'round_over':
+            self.move_sent_at = None
+            if self.symbol == 'X':
+                self.stats.games += 1
+            self.vote_restart()
+        elif t == 'restart_vote':
+            self.vote_restart()
+        if self.game_active and self.my_turn and self.move_sent_at is None:
+            self.play()
+
+    def check_board(self, key):
+        if super().check_board(key):
+            return True
+        self.stats.board_resyncs += 1
+        return False
+
+    def deliver_chat(self, msg):
+        self.stats.chats_received += 1
+        sent_at = self.stats.chat_sent_at.pop(msg.get('original', '').split(' ', 1)[0], None)
+        if sent_at is not None:
+            self.stats.chat_latencies.append(time.perf_counter() - sent_at)
+        result = msg['result']
+        if result['decoded_text'] != msg.get('original'):
+            self.stats.chat_mismatches += 1
+            if not msg.get('modified'):
+                self.stats.errors += 1
+
+    def play(self):
+        moves = self.board.legal_moves()
+        if not moves:
+            return
+        self.move_sent_at = time.perf_counter()
+        if not self.send_move(self.rng.choice(moves)):
+            self.move_sent_at = None
+            return
+        if self.rng.random() < self.chat_rate:
+            method = CHAT_METHODS[self.chat_seq % len(CHAT_METHODS)]
+            tag = f"{self.pid}:{self.chat_seq}"
+            self.chat_seq += 1
+            self.stats.chat_sent_at[tag] = time.perf_counter()
+            self.send_chat(f"{tag} load test message", method)
+            self.stats.chats_sent += 1
+
+
+async def run_players(host, port, players, duration, chat_rate, seed, first_pid=0):
+    stats = LoadStats()
+    stop = asyncio.Event()
+    rng = random.Random(seed)
+    sims = [SimPlayer(host, port, first_pid + i, stats, random.Random(rng.random()), chat_rate)
+            for i in range(players)]
+    tasks = []
+    for i, sim in enumerate(sims):
+        tasks.append(asyncio.create_task(sim.run(stop)))
+        if i % 100 == 99:
+            await asyncio.sleep(0.01)
+    await asyncio.sleep(duration)
+    stop.set()
+    for sim in sims:
+        sim.disconnect()
+        stats.chat_retransmits += sim.sender_stats.retransmits
+        stats.chat_failures += sim.sender_stats.failed
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats.to_dict()
+
+
+def run_worker(job):
+    return asyncio.run(run_players(*job))
+
+
+def run_load(host, port, players, duration, procs=1, chat_rate=0.2, seed=0):
+    share = [players // procs + (1 if i < players % procs else 0) for i in range(procs)]
+    jobs = []
+    first = 0
+    for i, count in enumerate(share):
+        jobs.append((host, port, count, duration, chat_rate, seed + i, first))
+        first += count
+    start = time.perf_counter()
+    if procs == 1:
+        results = [run_worker(jobs[0])]
+    else:
+        with multiprocessing.Pool(procs) as pool:
+            results = pool.map(run_worker, jobs)
+    elapsed = time.perf_counter() - start
+    stats = LoadStats()
+    for data in results:
+        stats.merge(data)
+    return stats.report(players, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated player load generator")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of play")
+    parser.add_argument('--procs', type=int, default=1, help="worker processes")
+    parser.add_argument('--chat-rate', type=float, default=0.2, help="chance of a chat after each move")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run_load(args.host, args.port, args.players, args.duration, args.procs, args.chat_rate, args.seed)
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
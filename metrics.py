@@ -0,0 +1,361 @@
+import argparse
+import bisect
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+CODEC_FUNCTIONS = ('encode_message', 'decode_message', 'encode_blocks', 'decode_blocks',
+                   'encode_moves', 'decode_moves', 'encode_move_frame', 'decode_move_frame')
+PENDING_LIMIT = 65536
+MESSAGE_TYPES = frozenset(('move', 'chat', 'chat_ack', 'chat_nak', 'chat_skip', 'surrender', 'vote_restart'))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels):
+        return self.values.get(labels, 0)
+
+    def render(self):
+        with self.lock:
+            items = list(self.values.items())
+        return [f'{self.name}{_format_labels(self.labels, k)} {_format_value(v)}' for k, v in sorted(items)]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels=(), collect=None):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+    def render(self):
+        if self.collect:
+            values = self.collect()
+            with self.lock:
+                self.values = values
+        return super().render()
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        series = self.series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self):
+        with self.lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self.series.items()]
+        lines = []
+        for labels, counts, total in sorted(items):
+            running = 0
+            for bound, n in zip(self.buckets + ('+Inf',), counts):
+                running += n
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels + ("le",), labels + (bound,))} {running}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, labels)} {total!r}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, labels)} {running}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), collect=None):
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class ServerMetrics(Registry):
+    def __init__(self):
+        super().__init__()
+        self.started = time.time()
+        self.messages_in = self.counter('xo_messages_in_total', 'Frames received from players', ('type',))
+        self.messages_out = self.counter('xo_messages_out_total', 'Frames sent to players', ('type',))
+        self.bytes_in = self.counter('xo_bytes_in_total', 'Bytes received from players')
+        self.bytes_out = self.counter('xo_bytes_out_total', 'Bytes sent to players')
+        self.errors = self.counter('xo_errors_total', 'Connection and handler errors', ('where',))
+        self.handle_seconds = self.histogram('xo_handle_seconds', 'Time to process one player message', ('type',))
+        self.tampered = self.counter('xo_tamper_total', 'Moves and chats modified in transit', ('target', 'action'))
+        self.outcomes = self.counter('xo_chat_outcomes_total', 'Receiver verdicts on forwarded chat frames',
+                                     ('method', 'outcome'))
+        self.detection = self.gauge('xo_detection_rate', 'Share of tampered chat frames NAKed or corrected',
+                                    ('method',), self.detection_rates)
+        self.codec_seconds = self.histogram('xo_codec_seconds', 'Codec call time (with --codec-timing)',
+                                            ('function', 'method'))
+        self.uptime = self.gauge('xo_uptime_seconds', 'Seconds since the server started',
+                                 collect=lambda: {(): round(time.time() - self.started, 3)})
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+
+    def watch(self, server):
+        def matches():
+            return {(): len(server.list_matches())}
+
+        def depths():
+            values = {}
+            for match in server.list_matches():
+                for kind, stats in match.queue_stats().items():
+                    for symbol, depth in stats['depth'].items():
+                        values[kind, symbol] = values.get((kind, symbol), 0) + depth
+            return values
+
+        def spectators():
+            return {(): sum(len(match.spectators) for match in server.list_matches())}
+
+        self.gauge('xo_active_matches', 'Matches currently in progress', collect=matches)
+        self.gauge('xo_hold_queue_depth', 'Intercepted items waiting for the operator', ('queue', 'player'), depths)
+        self.gauge('xo_spectators', 'Connected spectators', collect=spectators)
+
+    def read(self, nbytes):
+        self.bytes_in.inc(amount=nbytes)
+
+    def handled(self, msg_type, seconds):
+        if not isinstance(msg_type, str) or msg_type not in MESSAGE_TYPES:
+            msg_type = 'other'
+        self.messages_in.inc(msg_type)
+        self.handle_seconds.observe(seconds, msg_type)
+
+    def sent(self, msg_type, nbytes):
+        self.messages_out.inc(msg_type)
+        self.bytes_out.inc(amount=nbytes)
+
+    def error(self, where):
+        self.errors.inc(where)
+
+    def tamper(self, target, action):
+        self.tampered.inc(target, action or 'policy')
+
+    def chat_forwarded(self, match, symbol, method, seq, modified, action=None, recovered=False):
+        if modified:
+            self.tamper('chat', action)
+        if seq is None:
+            return
+        with self.pending_lock:
+            if len(self.pending) >= PENDING_LIMIT:
+                del self.pending[next(iter(self.pending))]
+            self.pending[match, symbol, seq] = method, modified, recovered
+
+    def chat_reply(self, match, symbol, kind, seq):
+        with self.pending_lock:
+            sent = self.pending.pop((match, 'O' if symbol == 'X' else 'X', seq), None)
+        if sent is None or kind == 'chat_skip':
+            return
+        method, modified, recovered = sent
+        if kind == 'chat_nak':
+            outcome = 'detected' if modified else 'false_alarm'
+        elif modified:
+            outcome = 'corrected' if recovered else 'accepted'
+        else:
+            outcome = 'clean'
+        self.outcomes.inc(method, outcome)
+
+    def detection_rates(self):
+        rates = {}
+        for method in {method for method, _ in list(self.outcomes.values)}:
+            caught = self.outcomes.get(method, 'detected') + self.outcomes.get(method, 'corrected')
+            judged = caught + self.outcomes.get(method, 'accepted')
+            if judged:
+                rates[method,] = round(caught / judged, 6)
+        return rates
+
+
+def timed(histogram, name, method_index=None, default=''):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if method_index is None:
+                    method = default
+                elif len(args) > method_index:
+                    method = args[method_index]
+                else:
+                    method = kwargs.get('method', default)
+                histogram.observe(time.perf_counter() - start, name, method)
+        return wrapper
+    return decorate
+
+
+def instrument_codecs(histogram, names=CODEC_FUNCTIONS):
+    import algorithms
+    wrapped = {}
+    for name in names:
+        func = getattr(algorithms, name, None)
+        if func is None or hasattr(func, '__wrapped__'):
+            continue
+        params = inspect.signature(func).parameters
+        index = list(params).index('method') if 'method' in params else None
+        default = params['method'].default if index is not None else ''
+        if default is inspect.Parameter.empty:
+            default = ''
+        wrapped[func] = timed(histogram, name, index, default)(func)
+    _rebind(wrapped)
+    return wrapped
+
+
+def uninstrument_codecs(wrapped):
+    _rebind({wrapper: func for func, wrapper in wrapped.items()})
+
+
+def _rebind(replacements):
+    by_id = {id(old): (old, new) for old, new in replacements.items()}
+    for module in list(sys.modules.values()):
+        for name, value in list(getattr(module, '__dict__', {}).items()):
+            entry = by_id.get(id(value))
+            if entry and entry[0] is value:
+                setattr(module, name, entry[1])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    def __init__(self, registry, port=None, path=None, interval=10.0, host='localhost'):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.httpd = None
+        self.stopped = threading.Event()
+        if port:
+            self.httpd = ThreadingHTTPServer((host, port), _Handler)
+            self.httpd.daemon_threads = True
+            self.httpd.registry = registry
+            threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        if path:
+            threading.Thread(target=self.dump_loop, daemon=True).start()
+
+    def dump(self):
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.registry.render())
+        os.replace(tmp, self.path)
+
+    def dump_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.dump()
+
+    def close(self):
+        self.stopped.set()
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        if self.path:
+            self.dump()
+
+
+def add_metrics_args(parser):
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus text metrics on this port")
+    parser.add_argument('--metrics-file', help="write Prometheus text metrics to this file")
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help="seconds between metrics file dumps")
+    parser.add_argument('--codec-timing', action='store_true', help="time codec calls (adds per-call overhead)")
+
+
+def metrics_from_args(args):
+    if not (args.metrics_port or args.metrics_file):
+        if args.codec_timing:
+            print("--codec-timing has no effect without --metrics-port or --metrics-file", file=sys.stderr)
+        return None
+    metrics = ServerMetrics()
+    if args.codec_timing:
+        instrument_codecs(metrics.codec_seconds)
+    metrics.exporter = MetricsExporter(metrics, args.metrics_port, args.metrics_file, args.metrics_interval)
+    return metrics
+
+
+if __name__ == "__main__":
+    from urllib.request import urlopen
+    parser = argparse.ArgumentParser(description="Print a server's metrics")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--grep', help="only print lines containing this text")
+    args = parser.parse_args()
+    with urlopen(f'http://{args.host}:{args.port}/metrics') as response:
+        for line in response.read().decode().splitlines():
+            if not args.grep or args.grep in line:
+                print(line)
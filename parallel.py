@@ -0,0 +1,232 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+import algorithms
+from algorithms import (BitBuffer, BLOCK_CONTROL_BITS, _PARITY, _PARITY9, _pack_units, _fold_sum, _packed_block_sum,
+                        encode_blocks, encode_hamming_batch, get_crc, text_to_binary, to_packed, unpack_bits)
+
+PARALLEL_THRESHOLD = 256 * 1024
+ENCODE_BLOCK = 64 * 1024
+DECODE_UNITS = 8192
+UNIT_BITS = {'parity': 9, 'hamming': 14}
+
+
+def _run_block(task):
+    op, method, block_size, in_name, start, nbits, out_name, out_offset = task
+    shm = shared_memory.SharedMemory(name=in_name)
+    try:
+        buf = BitBuffer(bytes(shm.buf[start:start + (nbits + 7) // 8]), nbits)
+    finally:
+        shm.close()
+    if op == 'crc':
+        return get_crc().compute_packed(buf)
+    if op == 'checksum':
+        return _packed_block_sum(buf, 8, True)
+    details = None
+    if op == 'encode':
+        if block_size:
+            out, details = encode_blocks(buf, method, block_size)
+        elif method == 'parity':
+            out = _pack_units([_PARITY9[b] for b in buf.data], 9)
+        else:
+            out = encode_hamming_batch(buf)
+        out = bytes(out)
+    else:
+        if block_size:
+            first = start * 8 // (block_size * 8 + BLOCK_CONTROL_BITS[method])
+            result = algorithms.decode_blocks(buf, method, block_size, first)
+        else:
+            result = algorithms.decode_message(buf, method)
+        out = result['decoded_text'].encode('latin-1')
+        if block_size:
+            details = dict(result, decoded_text='')
+        elif method == 'parity':
+            details = result['received_control']
+        else:
+            details = result['error_details']
+    shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        shm.buf[out_offset:out_offset + len(out)] = out
+    finally:
+        shm.close()
+    return len(out), details
+
+
+class ParallelCodec:
+    def __init__(self, procs=None, threshold=PARALLEL_THRESHOLD):
+        self.procs = procs or os.cpu_count() or 1
+        self.threshold = threshold
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = multiprocessing.get_context('spawn').Pool(self.procs)
+            return self.pool
+
+    def close(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool = None
+
+    def run(self, op, method, buf, blocks, out_size=0, block_size=None):
+        shm_in = shared_memory.SharedMemory(create=True, size=max(1, len(buf.data)))
+        shm_out = shared_memory.SharedMemory(create=True, size=max(1, out_size))
+        try:
+            shm_in.buf[:len(buf.data)] = buf.data
+            tasks = [(op, method, block_size, shm_in.name, start, nbits, shm_out.name, out_offset)
+                     for start, nbits, out_offset in blocks]
+            results = self.get_pool().map(_run_block, tasks)
+            return results, bytes(shm_out.buf[:out_size])
+        finally:
+            for shm in (shm_in, shm_out):
+                shm.close()
+                shm.unlink()
+
+    def byte_blocks(self, nbits, block_bytes, out_bytes=0):
+        block_bits = block_bytes * 8
+        return [(start // 8, min(block_bits, nbits - start), start // block_bits * out_bytes)
+                for start in range(0, nbits, block_bits)]
+
+    def checksum(self, buf):
+        results, _ = self.run('checksum', None, buf, self.byte_blocks(buf.nbits, ENCODE_BLOCK))
+        return BitBuffer.from_int(255 - _fold_sum(sum(results), 8), 8)
+
+    def crc(self, buf):
+        crc = get_crc()
+        blocks = self.byte_blocks(buf.nbits, ENCODE_BLOCK)
+        results, _ = self.run('crc', None, buf, blocks)
+        value = 0
+        for (_, nbits, _), part in zip(blocks, results):
+            value = crc.combine(value, part, nbits)
+        return BitBuffer.from_int(value, crc.width)
+
+    def chunk_blocks(self, method, block_size):
+        return 8 * max(1, ENCODE_BLOCK // (8 * block_size)), block_size * 8 + BLOCK_CONTROL_BITS[method]
+
+    def encode(self, text, method='crc', packed=False, block_size=None):
+        if len(text) < self.threshold or method not in ('parity', 'crc', 'hamming', 'checksum'):
+            return algorithms.encode_stream(text, method, packed, block_size)
+        binary = text_to_binary(text, packed=True)
+        crc = get_crc()
+        if binary.nbits % 8 or (method == 'crc' and (crc.refin or crc.init or crc.xorout)):
+            return algorithms.encode_stream(text, method, packed, block_size)
+        result = {'original_text': text, 'binary': binary, 'method': method, 'control_info': '', 'encoded_data': ''}
+        if block_size and method in BLOCK_CONTROL_BITS:
+            k, unit = self.chunk_blocks(method, block_size)
+            full, rest = divmod(len(binary.data), block_size)
+            out_bits = full * unit + (rest * 8 + BLOCK_CONTROL_BITS[method] if rest else 0)
+            blocks = self.byte_blocks(binary.nbits, k * block_size, k * unit // 8)
+            results, out = self.run('encode', method, binary, blocks, (out_bits + 7) // 8, block_size)
+            result['control_info'] = ''.join(controls for _, controls in results)
+            result['encoded_data'] = BitBuffer(out, out_bits)
+            result['block_size'] = block_size
+        elif method in UNIT_BITS:
+            n = len(binary.data)
+            out_bits = n * 8 * UNIT_BITS[method] // 8
+            blocks = self.byte_blocks(binary.nbits, ENCODE_BLOCK, ENCODE_BLOCK * UNIT_BITS[method] // 8)
+            _, out = self.run('encode', method, binary, blocks, (out_bits + 7) // 8)
+            result['control_info'] = 'parity_bits' if method == 'parity' else 'hamming_7_4'
+            result['encoded_data'] = BitBuffer(out, out_bits)
+        else:
+            control = self.crc(binary) if method == 'crc' else self.checksum(binary)
+            result['control_info'] = control.to_bits()
+            result['encoded_data'] = binary + control
+        if not packed:
+            result['binary'] = binary.to_bits()
+            result['encoded_data'] = unpack_bits(result['encoded_data'])
+        return result
+
+    def decode(self, encoded_data, method='crc', block_size=None):
+        size = len(encoded_data) // 8 if isinstance(encoded_data, str) else encoded_data.nbits // 8
+        if size < self.threshold or method not in ('parity', 'crc', 'hamming', 'checksum'):
+            return algorithms.decode_stream(encoded_data, method, block_size)
+        buf = to_packed(encoded_data)
+        if block_size and method in BLOCK_CONTROL_BITS:
+            return self.decode_blocks(buf, method, block_size)
+        if method in UNIT_BITS:
+            return self.decode_units(buf, method)
+        crc = get_crc()
+        if method == 'crc' and (crc.refin or crc.init or crc.xorout):
+            return algorithms.decode_stream(buf, method)
+        result = {'valid': True, 'errors_detected': False, 'errors_corrected': False, 'error_details': [], 'decoded_text': '', 'received_control': '', 'calculated_control': '', 'control_match': True}
+        n = buf.nbits
+        trailer = BLOCK_CONTROL_BITS[method]
+        data = buf[:n - trailer]
+        received = buf[n - trailer:].to_bits()
+        calculated = (self.crc(data) if method == 'crc' else self.checksum(data)).to_bits()
+        result['received_control'] = received
+        result['calculated_control'] = calculated
+        result['control_match'] = received == calculated
+        if not result['control_match']:
+            result['errors_detected'] = True
+            result['error_details'].append('CRC mismatch' if method == 'crc' else 'Checksum mismatch')
+        result['decoded_text'] = data.to_text()
+        result['valid'] = not result['errors_detected']
+        return result
+
+    def decode_blocks(self, buf, method, block_size):
+        k, unit = self.chunk_blocks(method, block_size)
+        blocks = self.byte_blocks(buf.nbits, k * unit // 8, k * block_size)
+        results, out = self.run('decode', method, buf, blocks, len(buf.data), block_size)
+        parts = [part for _, part in results]
+        result = {'valid': True, 'errors_detected': False, 'errors_corrected': False, 'error_details': [],
+                  'decoded_text': out[:blocks[-1][2] + results[-1][0]].decode('latin-1'),
+                  'received_control': ''.join(p['received_control'] for p in parts),
+                  'calculated_control': ''.join(p['calculated_control'] for p in parts),
+                  'control_match': True, 'blocks': sum(p['blocks'] for p in parts), 'failed_blocks': []}
+        for part in parts:
+            result['error_details'].extend(part['error_details'])
+            result['failed_blocks'].extend(part['failed_blocks'])
+        result['control_match'] = not result['failed_blocks']
+        result['errors_detected'] = bool(result['failed_blocks'])
+        result['valid'] = not result['errors_detected']
+        return result
+
+    def decode_units(self, buf, method):
+        unit_bits = UNIT_BITS[method]
+        block_bytes = DECODE_UNITS * unit_bits // 8
+        blocks = self.byte_blocks(buf.nbits, block_bytes, DECODE_UNITS)
+        results, out = self.run('decode', method, buf, blocks, len(buf.data))
+        text = out[:blocks[-1][2] + results[-1][0]].decode('latin-1')
+        result = {'valid': True, 'errors_detected': False, 'errors_corrected': False, 'error_details': [], 'decoded_text': text, 'received_control': '', 'calculated_control': '', 'control_match': True}
+        if method == 'parity':
+            received = ''.join(details for _, details in results)
+            calculated = ''.join('1' if _PARITY[b] else '0' for b in out[:len(text)])
+            result['received_control'] = received
+            result['calculated_control'] = calculated
+            if received != calculated:
+                result['errors_detected'] = True
+                result['control_match'] = False
+                for i, (r, c) in enumerate(zip(received, calculated)):
+                    if r != c:
+                        result['error_details'].append(f'Parity error at block {i}')
+        else:
+            for _, details in results:
+                result['error_details'].extend(details)
+            result['errors_corrected'] = bool(result['error_details'])
+        result['valid'] = not result['errors_detected'] or result['errors_corrected']
+        return result
+
+
+_codec = None
+
+
+def get_codec():
+    global _codec
+    if _codec is None:
+        _codec = ParallelCodec()
+        atexit.register(_codec.close)
+    return _codec
+
+
+def encode_message(text, method='crc', packed=False, block_size=None):
+    return get_codec().encode(text, method, packed, block_size)
+
+
+def decode_message(encoded_data, method='crc', block_size=None):
+    return get_codec().decode(encoded_data, method, block_size)
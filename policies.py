@@ -0,0 +1,218 @@
+import json
+import math
+import random
+import time
+from collections import deque
+from algorithms import flip_bits
+
+
+class PassThrough:
+    name = 'pass'
+
+    def tamper_move(self, move, board, rng):
+        return None
+
+    def tamper_chat(self, chat, rng):
+        return None
+
+
+class FlipMove(PassThrough):
+    name = 'flip'
+
+    def __init__(self, rate=1.0):
+        self.rate = rate
+
+    def tamper_move(self, move, board, rng):
+        if rng.random() >= self.rate:
+            return None
+        position = move['position']
+        start = position + rng.randint(1, 8)
+        for step in range(9):
+            new = (start + step) % 9
+            if new != position and board.is_empty(new):
+                return new, 'flip'
+        return None
+
+
+class RandomCell(PassThrough):
+    name = 'random'
+
+    def __init__(self, rate=1.0):
+        self.rate = rate
+
+    def tamper_move(self, move, board, rng):
+        empty = board.legal_moves()
+        if not empty or rng.random() >= self.rate:
+            return None
+        return rng.choice(empty), 'random'
+
+
+class BitFlip(PassThrough):
+    name = 'flip'
+
+    def __init__(self, rate=1.0, bits=1):
+        self.rate = rate
+        self.bits = int(bits)
+
+    def tamper_chat(self, chat, rng):
+        n = len(chat['encoded'])
+        if not n or rng.random() >= self.rate:
+            return None
+        positions = [rng.randrange(n) for _ in range(min(self.bits, n))]
+        return flip_bits(chat['encoded'], positions), self.name, f"flipped bits {positions}"
+
+
+class BitErrorRate(PassThrough):
+    name = 'ber'
+
+    def __init__(self, ber):
+        self.ber = ber
+
+    def error_positions(self, n, rng):
+        if self.ber <= 0:
+            return []
+        if self.ber >= 1:
+            return list(range(n))
+        log_keep = math.log(1 - self.ber)
+        positions = []
+        i = -1
+        while True:
+            i += 1 + int(math.log(1 - rng.random()) / log_keep)
+            if i >= n:
+                return positions
+            positions.append(i)
+
+    def tamper_chat(self, chat, rng):
+        positions = self.error_positions(len(chat['encoded']), rng)
+        if not positions:
+            return None
+        return flip_bits(chat['encoded'], positions), self.name, f"flipped {len(positions)} bits"
+
+
+class BurstError(PassThrough):
+    name = 'burst'
+
+    def __init__(self, rate=1.0, length=8):
+        self.rate = rate
+        self.length = int(length)
+
+    def tamper_chat(self, chat, rng):
+        n = len(chat['encoded'])
+        if not n or rng.random() >= self.rate:
+            return None
+        start = rng.randrange(n)
+        positions = range(start, min(n, start + self.length))
+        return flip_bits(chat['encoded'], positions), self.name, f"burst of {len(positions)} bits at {start}"
+
+
+class ScriptedPolicy(PassThrough):
+    name = 'script'
+
+    def __init__(self, rules):
+        self.rules = [dict(rule, policy=parse_policy(rule['action'], rule.get('on', 'move'))) for rule in rules]
+
+    def _matches(self, rule, kind, symbol, **context):
+        if rule.get('on', kind) != kind or rule.get('player', symbol) != symbol:
+            return False
+        return all(rule[k] == v for k, v in context.items() if k in rule)
+
+    def tamper_move(self, move, board, rng):
+        number = bin(board.occupied).count('1') + 1
+        for rule in self.rules:
+            if self._matches(rule, 'move', move['symbol'], move=number):
+                return rule['policy'].tamper_move(move, board, rng)
+        return None
+
+    def tamper_chat(self, chat, rng):
+        for rule in self.rules:
+            if self._matches(rule, 'chat', chat['symbol'], method=chat['method']):
+                return rule['policy'].tamper_chat(chat, rng)
+        return None
+
+
+POLICIES = {
+    'pass': PassThrough,
+    'random': RandomCell,
+    'ber': BitErrorRate,
+    'burst': BurstError,
+}
+
+
+def parse_policy(spec, kind='move'):
+    name, *params = spec.split(':')
+    params = [float(p) for p in params]
+    if name == 'flip':
+        return FlipMove(*params) if kind == 'move' else BitFlip(*params)
+    if name not in POLICIES:
+        raise ValueError(f'Unknown policy: {spec}')
+    return POLICIES[name](*params)
+
+
+class PolicyEngine:
+    def __init__(self, move_policy=None, chat_policy=None, seed=None, log_path=None, history=1000):
+        self.move_policy = move_policy or PassThrough()
+        self.chat_policy = chat_policy or PassThrough()
+        self.seed = seed
+        self.history = deque(maxlen=history)
+        self.counts = {}
+        self.log_file = open(log_path, 'a') if log_path else None
+        self.rngs = {}
+
+    def rng_for(self, match_id):
+        rng = self.rngs.get(match_id)
+        if rng is None:
+            rng = self.rngs[match_id] = random.Random(None if self.seed is None else f"{self.seed}:{match_id}")
+        return rng
+
+    def process_move(self, match, move):
+        decision = self.move_policy.tamper_move(move, match.board, self.rng_for(match.match_id))
+        if decision:
+            self.record(match, 'move', move['symbol'], decision[1], f"cell {move['position']} -> {decision[0]}")
+        else:
+            self.record(match, 'move', move['symbol'], 'pass', str(move['position']))
+        return decision
+
+    def process_chat(self, match, chat):
+        decision = self.chat_policy.tamper_chat(chat, self.rng_for(match.match_id))
+        if decision:
+            self.record(match, 'chat', chat['symbol'], decision[1], decision[2])
+        else:
+            self.record(match, 'chat', chat['symbol'], 'pass', chat['method'])
+        return decision
+
+    def record(self, match, kind, symbol, action, detail):
+        entry = {'time': time.time(), 'match': match.match_id, 'kind': kind,
+                 'player': symbol, 'action': action, 'detail': detail}
+        self.history.append(entry)
+        key = f"{kind}:{action}"
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if self.log_file:
+            self.log_file.write(json.dumps(entry) + '\n')
+        if action != 'pass':
+            match.notify('log', f"Policy {action} on {kind} from {symbol}: {detail}", 'warning')
+
+    def close(self):
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
+
+
+def add_policy_args(parser):
+    parser.add_argument('--move-policy', help="pass | flip[:rate] | random[:rate]")
+    parser.add_argument('--chat-policy', help="pass | flip[:rate[:bits]] | ber:rate | burst[:rate[:length]]")
+    parser.add_argument('--policy-script', help="JSON file with a list of scripted rules")
+    parser.add_argument('--policy-seed', type=int)
+    parser.add_argument('--policy-log', help="append policy decisions as JSON lines")
+
+
+def policy_from_args(args):
+    if not (args.move_policy or args.chat_policy or args.policy_script):
+        return None
+    move_policy = parse_policy(args.move_policy, 'move') if args.move_policy else None
+    chat_policy = parse_policy(args.chat_policy, 'chat') if args.chat_policy else None
+    if args.policy_script:
+        with open(args.policy_script) as f:
+            script = ScriptedPolicy(json.load(f))
+        move_policy = move_policy or script
+        chat_policy = chat_policy or script
+    return PolicyEngine(move_policy, chat_policy, args.policy_seed, args.policy_log)
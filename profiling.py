@@ -0,0 +1,179 @@
+import argparse
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+
+MODES = ('sample', 'cprofile')
+SHARED_PROFILER = sys.version_info >= (3, 12)
+TAGS = {'process_message': 'msg_type', 'handle_msg': 't', 'encode_message': 'method', 'decode_message': 'method',
+        'encode_blocks': 'method', 'decode_blocks': 'method', 'forward_chat': 'error_type'}
+
+
+def _clean(name):
+    return str(name).replace(';', ':').replace(' ', '_')
+
+
+def _frame_label(frame, labels):
+    code = frame.f_code
+    label = labels.get(code)
+    if label is None:
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        label = labels[code] = f'{module}:{code.co_name}'
+    var = TAGS.get(code.co_name)
+    if var:
+        value = frame.f_locals.get(var)
+        if value is not None:
+            return f'{label}[{_clean(value)}]'
+    return label
+
+
+class Sampler:
+    def __init__(self, prefix, interval=0.005):
+        self.prefix = prefix
+        self.interval = interval
+        self.stacks = Counter()
+        self.labels = {}
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame, self.labels))
+                    frame = frame.f_back
+                stack.append(_clean(names.get(ident, f'thread-{ident}')))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def tags(self):
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            for frame in set(stack.split(';')):
+                if frame.endswith(']'):
+                    totals[frame] += count
+        return totals
+
+    def close(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        path = f'{self.prefix}.collapsed'
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f'{stack} {count}\n')
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms, {len(self.stacks)} stacks -> {path}"]
+        lines += [f"  {count:>7}  {tag}" for tag, count in self.tags().most_common(15)]
+        return '\n'.join(lines)
+
+
+class ThreadProfiler:
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.profiles = []
+        self.lock = threading.Lock()
+        self.original_run = None
+        self.main = None
+
+    def add(self, name):
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append((_clean(name), profile))
+        return profile
+
+    def start(self):
+        if SHARED_PROFILER:
+            self.main = self.add('all-threads')
+            self.main.enable()
+            return self
+        original = self.original_run = threading.Thread.run
+        profiler = self
+
+        def run(thread):
+            profile = profiler.add(thread.name)
+            profile.enable()
+            try:
+                original(thread)
+            finally:
+                profile.disable()
+
+        threading.Thread.run = run
+        self.main = self.add(threading.current_thread().name)
+        self.main.enable()
+        return self
+
+    def close(self):
+        self.main.disable()
+        if self.original_run:
+            threading.Thread.run = self.original_run
+        lines = []
+        seen = Counter()
+        with self.lock:
+            profiles = list(self.profiles)
+        for name, profile in profiles:
+            seen[name] += 1
+            suffix = re.sub(r'[^\w-]+', '_', name) + (f'.{seen[name]}' if seen[name] > 1 else '')
+            path = f'{self.prefix}.{suffix}.pstats'
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            profile.dump_stats(path)
+            stats = pstats.Stats(profile)
+            lines.append(f"{path}: {stats.total_calls} calls, {stats.total_tt:.3f} s")
+        return '\n'.join(lines)
+
+
+def add_profile_args(parser):
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="profile every thread and write PREFIX.collapsed or PREFIX.<thread>.pstats on exit")
+    parser.add_argument('--profile-mode', choices=MODES, default='sample',
+                        help="sample: stack sampling tagged by message type and codec (flamegraph input); "
+                             "cprofile: deterministic per-thread cProfile (one shared profile on Python 3.12+)")
+    parser.add_argument('--profile-interval', type=float, default=0.005, help="seconds between stack samples")
+
+
+def profiler_from_args(args):
+    if not args.profile:
+        return None
+    if args.profile_mode == 'cprofile':
+        return ThreadProfiler(args.profile).start()
+    return Sampler(args.profile, args.profile_interval).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a collapsed-stack profile")
+    parser.add_argument('path')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    leaves, tags, total = Counter(), Counter(), 0
+    with open(args.path) as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            count = int(count)
+            frames = stack.split(';')
+            total += count
+            leaves[frames[-1]] += count
+            for frame in set(frames):
+                if frame.endswith(']'):
+                    tags[frame] += count
+    print(f"{total} samples")
+    for title, counter in (("Self time", leaves), ("By message type / codec", tags)):
+        print(title)
+        for frame, count in counter.most_common(args.top):
+            print(f"  {count / total:7.1%}  {frame}")
@@ -1,12 +1,19 @@
+import argparse
 import socket
 import threading
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, simpledialog, font
-import json
 import random
-import time
 from datetime import datetime
-from algorithms import flip_bit
+from framing import FrameReader, encode_frame
+from game import Match, add_hold_args
+from gui_events import GuiEventQueue, GuiProxy, RingLog
+from journal import add_journal_args, journal_from_args
+from metrics import add_metrics_args, metrics_from_args
+from policies import add_policy_args, policy_from_args
+from profiling import add_profile_args, profiler_from_args
+from spectators import add_spectator_args, serve_spectator
 
 
 COLORS = {
@@ -27,19 +34,27 @@ COLORS = {
 
 
 class MITMServer:
-    def __init__(self):
+    def __init__(self, policy=None, journal=None, spectator_port=None, metrics=None):
         self.host = 'localhost'
         self.port = 5000
+        self.spectator_port = spectator_port
         self.server_socket = None
+        self.spectator_socket = None
         self.clients = {}
         self.running = False
-        self.pending_move = None
-        self.pending_chat = None
-        self.game_board = ['' for _ in range(9)]
-        self.current_player = 'X'
-        self.gui = None
-        self.game_active = False
-        self.restart_votes = set()
+        self.binary_frames = True
+        self.send_lock = threading.Lock()
+        self.match = Match(1, self.send_to)
+        self.match.intercept = True
+        self.match.policy = policy
+        self.match.journal = journal
+        self.match.metrics = metrics
+        self.metrics = metrics
+        if metrics:
+            metrics.watch(self)
+        
+    def list_matches(self):
+        return [self.match]
         
     def start(self):
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -47,7 +62,10 @@ class MITMServer:
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(2)
         self.running = True
-        threading.Thread(target=self.accept_clients, daemon=True).start()
+        threading.Thread(target=self.accept_clients, name='accept_clients', daemon=True).start()
+        if self.spectator_port:
+            self.spectator_socket = socket.create_server((self.host, self.spectator_port), backlog=128)
+            threading.Thread(target=self.accept_spectators, name='accept_spectators', daemon=True).start()
         
     def accept_clients(self):
         symbols = ['X', 'O']
@@ -55,227 +73,84 @@ class MITMServer:
         while self.running and count < 2:
             try:
                 sock, addr = self.server_socket.accept()
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                 symbol = symbols[count]
                 pid = f"player_{count+1}"
                 self.clients[pid] = {'socket': sock, 'address': addr, 'symbol': symbol}
                 
-                self.send_to(sock, {'type': 'assign', 'symbol': symbol})
-                if self.gui:
-                    self.gui.log(f"Player {symbol} connected from {addr[0]}", 'success')
-                    self.gui.update_player_status(symbol, True)
+                self.match.add_player(symbol, sock, addr)
                 
-                threading.Thread(target=self.handle_client, args=(pid,), daemon=True).start()
+                threading.Thread(target=self.handle_client, args=(pid,), name=f'handle_client-{symbol}',
+                                 daemon=True).start()
                 count += 1
                 
                 if count == 2:
-                    self.start_game()
+                    self.match.start_game()
             except Exception as e:
                 if self.running:
                     print(f"Accept error: {e}")
     
-    def start_game(self):
-        self.game_board = ['' for _ in range(9)]
-        self.current_player = 'X'
-        self.game_active = True
-        self.restart_votes = set()
-        self.pending_move = None
-        
-        self.broadcast({'type': 'game_start', 'current': 'X', 'board': self.game_board})
-        
-        if self.gui:
-            self.gui.reset_board()
-            self.gui.log("Game started!", 'success')
-            self.gui.update_status("Game in progress")
+    def accept_spectators(self):
+        while self.running:
+            try:
+                sock, addr = self.spectator_socket.accept()
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                break
+            threading.Thread(target=self.handle_spectator, args=(sock,), name='spectator', daemon=True).start()
+    
+    def handle_spectator(self, sock):
+        try:
+            msgs = FrameReader().recv(sock)
+        except:
+            msgs = None
+        if not msgs:
+            sock.close()
+            return
+        serve_spectator(sock, self.match, lambda: self.running)
     
     def handle_client(self, pid):
         client = self.clients[pid]
+        reader = FrameReader()
+        metrics = self.metrics
         while self.running:
             try:
-                data = client['socket'].recv(4096)
-                if not data:
+                received = reader.received
+                msgs = reader.recv(client['socket'])
+                if msgs is None:
                     break
-                msg = json.loads(data.decode())
-                self.process_message(pid, msg)
-            except:
+                if metrics:
+                    metrics.read(reader.received - received)
+                for msg in msgs:
+                    if metrics:
+                        start = time.perf_counter()
+                    self.match.process_message(client['symbol'], msg)
+                    if metrics:
+                        metrics.handled(msg.get('type'), time.perf_counter() - start)
+            except OSError:
+                if metrics and self.running:
+                    metrics.error('receive')
+                break
+            except Exception as e:
+                if metrics:
+                    metrics.error('handler')
+                self.match.notify('log', f"Error handling {client['symbol']}: {e}", 'error')
                 break
         
-        if self.gui:
-            self.gui.update_player_status(client['symbol'], False)
-    
-    def process_message(self, pid, msg):
-        client = self.clients[pid]
-        symbol = client['symbol']
-        msg_type = msg.get('type')
-        
-        if msg_type == 'move':
-            if self.game_active:
-                self.pending_move = {
-                    'player_id': pid,
-                    'symbol': symbol,
-                    'position': msg['position'],
-                    'encoded': msg.get('encoded', {})
-                }
-                if self.gui:
-                    self.gui.show_pending_move(self.pending_move)
-                    
-        elif msg_type == 'chat':
-            self.pending_chat = {
-                'player_id': pid,
-                'symbol': symbol,
-                'text': msg['text'],
-                'method': msg['method'],
-                'encoded': msg['encoded']
-            }
-            if self.gui:
-                self.gui.show_pending_chat(self.pending_chat)
-                
-        elif msg_type == 'surrender':
-            winner = 'O' if symbol == 'X' else 'X'
-            self.end_round(winner, f"Player {symbol} surrendered")
-            
-        elif msg_type == 'vote_restart':
-            if self.game_active:
-                return
-            
-            self.restart_votes.add(symbol)
-            other = 'O' if symbol == 'X' else 'X'
-            
-            if self.gui:
-                self.gui.log(f"Player {symbol} voted for restart ({len(self.restart_votes)}/2)", 'info')
-            
-            if other not in self.restart_votes:
-                self.send_to_symbol(other, {
-                    'type': 'restart_vote',
-                    'from': symbol,
-                    'message': f'Player {symbol} wants to play again!'
-                })
-            
-            if len(self.restart_votes) >= 2:
-                if self.gui:
-                    self.gui.log("Both players voted! Starting new game...", 'success')
-                self.start_game()
+        if self.match.journal:
+            self.match.journal.disconnect(self.match.match_id, client['symbol'])
+        self.match.notify('update_player_status', client['symbol'], False)
     
     def send_to(self, sock, msg):
         try:
-            sock.send(json.dumps(msg).encode())
+            frame = encode_frame(msg, self.binary_frames)
+            with self.send_lock:
+                sock.sendall(frame)
+            if self.metrics:
+                self.metrics.sent(msg.get('type'), len(frame))
         except:
-            pass
-    
-    def send_to_symbol(self, symbol, msg):
-        for c in self.clients.values():
-            if c['symbol'] == symbol:
-                self.send_to(c['socket'], msg)
-                break
-    
-    def broadcast(self, msg):
-        for c in self.clients.values():
-            self.send_to(c['socket'], msg)
-    
-    def forward_move(self, move, modified=False, mod_type=None):
-        if not move or not self.game_active:
-            return
-        
-        pos = move['position']
-        symbol = move['symbol']
-        
-        if 0 <= pos <= 8 and self.game_board[pos] == '':
-            self.game_board[pos] = symbol
-            
-            self.broadcast({
-                'type': 'move_made',
-                'position': pos,
-                'symbol': symbol,
-                'modified': modified,
-                'mod_type': mod_type
-            })
-            
-            if self.gui:
-                self.gui.update_board(pos, symbol)
-            
-            winner = self.check_winner()
-            if winner:
-                if winner == 'Draw':
-                    self.end_round('Draw', "It's a draw!")
-                else:
-                    self.end_round(winner, f"Player {winner} wins!")
-            else:
-                self.current_player = 'O' if self.current_player == 'X' else 'X'
-                self.broadcast({'type': 'turn', 'current': self.current_player})
-        
-        self.pending_move = None
-        if self.gui:
-            self.gui.clear_pending_move()
-    
-    def forward_chat(self, chat, inject_error=False, error_type=None):
-        if not chat:
-            return
-        
-        encoded = chat['encoded']
-        if inject_error and error_type:
-            if error_type == 'flip_bit' and len(encoded) > 0:
-                pos = random.randint(0, len(encoded)-1)
-                encoded = flip_bit(encoded, pos)
-                if self.gui:
-                    self.gui.log(f"Flipped bit at position {pos}", 'warning')
-            elif error_type == 'flip_multi' and len(encoded) > 0:
-                for _ in range(min(3, len(encoded))):
-                    pos = random.randint(0, len(encoded)-1)
-                    encoded = flip_bit(encoded, pos)
-                if self.gui:
-                    self.gui.log("Flipped multiple bits", 'warning')
-        
-        other_symbol = 'O' if chat['symbol'] == 'X' else 'X'
-        self.send_to_symbol(other_symbol, {
-            'type': 'chat_msg',
-            'from': chat['symbol'],
-            'encoded': encoded,
-            'method': chat['method'],
-            'original': chat['text'],
-            'modified': inject_error
-        })
-        
-        self.pending_chat = None
-        if self.gui:
-            self.gui.clear_pending_chat()
-    
-    def end_round(self, winner, reason):
-        self.game_active = False
-        self.restart_votes = set()
-        
-        self.broadcast({
-            'type': 'round_over',
-            'winner': winner,
-            'reason': reason
-        })
-        
-        if self.gui:
-            self.gui.log(f"Round over: {reason}", 'info')
-            self.gui.update_status("Round ended")
-    
-    def server_restart(self, note=""):
-        self.broadcast({'type': 'server_restart', 'note': note})
-        time.sleep(0.1)
-        self.start_game()
-    
-    def server_end(self, note=""):
-        self.game_active = False
-        self.broadcast({'type': 'server_end', 'note': note})
-        if self.gui:
-            self.gui.log(f"Game ended: {note}", 'error')
-    
-    def check_winner(self):
-        b = self.game_board
-        lines = [
-            [0,1,2], [3,4,5], [6,7,8],
-            [0,3,6], [1,4,7], [2,5,8],
-            [0,4,8], [2,4,6]
-        ]
-        for line in lines:
-            if b[line[0]] == b[line[1]] == b[line[2]] != '':
-                return b[line[0]]
-        if '' not in b:
-            return 'Draw'
-        return None
+            if self.metrics:
+                self.metrics.error('send')
     
     def stop(self):
         self.running = False
@@ -286,6 +161,8 @@ class MITMServer:
                 pass
         if self.server_socket:
             self.server_socket.close()
+        if self.spectator_socket:
+            self.spectator_socket.close()
 
 
 class ModernButton(tk.Canvas):
@@ -322,12 +199,22 @@ class ModernButton(tk.Canvas):
             self.command()
 
 
+LOG_LINES = 2000
+OBSERVER_KEYS = {
+    'update_board': lambda pos, sym: ('cell', pos),
+    'update_status': lambda s: 'status',
+    'update_player_status': lambda symbol, connected: ('player', symbol),
+}
+
+
 class ServerGUI:
     def __init__(self, server):
         self.server = server
-        self.server.gui = self
+        self.match = None
+        self.proxy = None
         
         self.root = tk.Tk()
+        self.events = GuiEventQueue(self.root)
         self.root.title("MITM Control Panel")
         self.root.geometry("950x700")
         self.root.configure(bg=COLORS['bg_dark'])
@@ -344,7 +231,69 @@ class ServerGUI:
         self.small_font = font.Font(family='Consolas', size=9)
         
         self.setup_ui()
+        self.log_view = RingLog(self.log_text, self.events, LOG_LINES)
         
+    def attach(self, match):
+        if match is self.match:
+            return
+        if self.match:
+            self.detach()
+        if self.proxy:
+            self.proxy.active = False
+        self.match = match
+        if match is None:
+            self.match_var.set('')
+            self.reset_board()
+            return
+        with match.lock:
+            self.proxy = match.observer = GuiProxy(self, self.events, OBSERVER_KEYS)
+            match.intercept = True
+            board = list(match.game_board)
+            pending_move, pending_chat = match.pending_move, match.pending_chat
+            players = set(match.players)
+        self.match_var.set(str(match.match_id))
+        self.reset_board()
+        for pos, sym in enumerate(board):
+            if sym:
+                self.update_board(pos, sym)
+        for sym in ('X', 'O'):
+            self.update_player_status(sym, sym in players)
+        if pending_move:
+            self.show_pending_move(pending_move)
+        if pending_chat:
+            self.show_pending_chat(pending_chat)
+        self.log(f"Observing match {match.match_id}", 'info')
+    
+    def detach(self):
+        match, self.match = self.match, None
+        if match is None:
+            return
+        with match.lock:
+            match.observer = None
+            match.intercept = False
+            while match.pending_move:
+                match.forward_move(match.pending_move)
+            while match.pending_chat:
+                match.forward_chat(match.pending_chat)
+    
+    def refresh_matches(self):
+        matches = self.server.list_matches()
+        self.match_box['values'] = [str(m.match_id) for m in matches]
+        if self.match is not None and self.match not in matches:
+            self.log(f"Match {self.match.match_id} closed", 'warning')
+            self.match = None
+            self.attach(matches[0] if matches else None)
+        elif self.match is None and matches:
+            self.attach(matches[0])
+        self.root.after(1000, self.refresh_matches)
+    
+    def select_match(self):
+        wanted = self.match_var.get()
+        for m in self.server.list_matches():
+            if str(m.match_id) == wanted:
+                self.attach(m)
+                return
+    
     def setup_ui(self):
         # Header section
         header = tk.Frame(self.root, bg=COLORS['bg_dark'])
@@ -374,6 +323,13 @@ class ServerGUI:
                                 bg=COLORS['bg_dark'], fg=COLORS['text_secondary'])
         self.player_o.pack(side='right', padx=5)
         
+        self.match_var = tk.StringVar()
+        self.match_box = ttk.Combobox(status_frame, textvariable=self.match_var, width=8, state='readonly')
+        self.match_box.pack(side='right', padx=5)
+        self.match_box.bind('<<ComboboxSelected>>', lambda e: self.select_match())
+        tk.Label(status_frame, text="Match", font=self.subtitle_font,
+                bg=COLORS['bg_dark'], fg=COLORS['text_secondary']).pack(side='right')
+        
         # Main content area with grid for resizing
         main = tk.Frame(self.root, bg=COLORS['bg_dark'])
         main.grid(row=1, column=0, sticky='nsew', padx=20)
@@ -485,8 +441,7 @@ class ServerGUI:
         
     def log(self, msg, level='info'):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert('end', f"[{timestamp}] {msg}\n")
-        self.log_text.see('end')
+        self.log_view.write(f"[{timestamp}] {msg}\n")
     
     def update_status(self, s):
         self.status_lbl.config(text=f"● {s}")
@@ -512,6 +467,8 @@ class ServerGUI:
     def show_pending_chat(self, c):
         self.chat_pending.delete('1.0', 'end')
         info = f"From: {c['symbol']}  |  Method: {c['method']}  |  Text: {c['text'][:30]}..."
+        if self.match and len(self.match.chats) > 1:
+            info += f"  |  {len(self.match.chats) - 1} more queued"
         self.chat_pending.insert('1.0', info)
         self.log(f"Chat from {c['symbol']}: {c['text'][:20]}...", 'info')
     
@@ -529,65 +486,91 @@ class ServerGUI:
         self.clear_pending_move()
         self.clear_pending_chat()
     
+    def release(self, kind, edit=None):
+        if not (self.match and self.match.release_pending(kind, edit)):
+            messagebox.showinfo("Info", f"No pending {kind}")
+    
     def pass_move(self):
-        if self.server.pending_move:
+        def passed(m):
             self.log("Move passed through", 'success')
-            self.server.forward_move(self.server.pending_move)
-        else:
-            messagebox.showinfo("Info", "No pending move")
+        self.release('move', passed)
     
     def flip_move(self):
-        if self.server.pending_move:
-            m = self.server.pending_move
+        def flip(m):
+            board = self.match.game_board
             orig = m['position']
             new = (orig + random.randint(1, 8)) % 9
             for _ in range(9):
-                if self.server.game_board[new] == '':
+                if board[new] == '':
                     break
                 new = (new + 1) % 9
             m['position'] = new
             self.log(f"Position flipped: {orig} → {new}", 'warning')
-            self.server.forward_move(m, True, 'flip')
-        else:
-            messagebox.showinfo("Info", "No pending move")
+            return True, 'flip'
+        self.release('move', flip)
     
     def random_move(self):
-        if self.server.pending_move:
-            m = self.server.pending_move
+        def randomize(m):
             orig = m['position']
-            empty = [i for i, x in enumerate(self.server.game_board) if x == '']
+            empty = [i for i, x in enumerate(self.match.game_board) if x == '']
             if empty:
                 m['position'] = random.choice(empty)
                 self.log(f"Random position: {orig} → {m['position']}", 'warning')
-                self.server.forward_move(m, True, 'random')
-        else:
-            messagebox.showinfo("Info", "No pending move")
+                return True, 'random'
+        self.release('move', randomize)
     
     def forward_chat(self, inject, err_type):
-        if self.server.pending_chat:
+        def forward(c):
             if inject:
                 self.log(f"Injecting error: {err_type}", 'warning')
             else:
                 self.log("Chat passed through", 'success')
-            self.server.forward_chat(self.server.pending_chat, inject, err_type)
-        else:
-            messagebox.showinfo("Info", "No pending chat")
+            return inject, err_type
+        self.release('chat', forward)
     
     def restart_game(self):
+        if not self.match:
+            return
         note = simpledialog.askstring("Restart", "Note (optional):", parent=self.root) or ""
-        self.server.server_restart(note)
+        self.match.server_restart(note)
     
     def end_game(self):
+        if not self.match:
+            return
         note = simpledialog.askstring("End Game", "Note (optional):", parent=self.root) or ""
-        self.server.server_end(note)
+        self.match.server_end(note)
     
     def run(self):
         self.log("Server starting...", 'info')
         self.server.start()
         self.log(f"Listening on {self.server.host}:{self.server.port}", 'success')
-        self.root.protocol("WM_DELETE_WINDOW", lambda: [self.server.stop(), self.root.destroy()])
+        self.refresh_matches()
+        self.events.start()
+        self.root.protocol("WM_DELETE_WINDOW", lambda: [self.events.stop(), self.server.stop(), self.root.destroy()])
         self.root.mainloop()
 
 
 if __name__ == "__main__":
-    ServerGUI(MITMServer()).run()
+    parser = argparse.ArgumentParser(description="MITM server control panel")
+    add_policy_args(parser)
+    add_journal_args(parser)
+    add_spectator_args(parser)
+    add_hold_args(parser)
+    add_metrics_args(parser)
+    add_profile_args(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    journal = journal_from_args(args)
+    metrics = metrics_from_args(args)
+    server = MITMServer(policy_from_args(args), journal, args.spectator_port, metrics)
+    server.match.spectators.limit = args.spectator_queue
+    server.match.spectators.policy = args.spectator_policy
+    server.match.hold_timeout = args.hold_timeout
+    server.match.chats.limit = args.queue_limit
+    ServerGUI(server).run()
+    if journal:
+        journal.close()
+    if metrics:
+        metrics.exporter.close()
+    if profiler:
+        print(profiler.close())
@@ -0,0 +1,177 @@
+import argparse
+import socket
+import threading
+from collections import deque
+from framing import FrameReader, encode_frame
+
+POLICIES = ('coalesce', 'drop')
+
+
+class Subscriber:
+    __slots__ = ('handle', 'wakeup', 'queue', 'lock', 'stale', 'closed', 'sent', 'dropped', 'coalesced')
+
+    def __init__(self, handle, wakeup=None):
+        self.handle = handle
+        self.wakeup = wakeup
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.stale = True
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def wake(self):
+        if self.wakeup:
+            self.wakeup()
+
+
+class SpectatorHub:
+    def __init__(self, match, limit=256, policy='coalesce', binary=True):
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown spectator policy: {policy}')
+        self.match = match
+        self.limit = limit
+        self.policy = policy
+        self.binary = binary
+        self.subscribers = []
+        self.published = 0
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def subscribe(self, handle, wakeup=None):
+        sub = Subscriber(handle, wakeup)
+        with self.match.lock:
+            self.subscribers = self.subscribers + [sub]
+        sub.wake()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.match.lock:
+            self.subscribers = [s for s in self.subscribers if s is not sub]
+        sub.closed = True
+
+    def close(self, note=''):
+        self.publish({'type': 'spectate_end', 'match': self.match.match_id, 'note': note})
+        with self.match.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for sub in subscribers:
+            sub.closed = True
+            sub.wake()
+
+    def publish(self, msg):
+        subscribers = self.subscribers
+        if not subscribers:
+            return
+        frame = encode_frame(msg, self.binary)
+        self.published += 1
+        for sub in subscribers:
+            with sub.lock:
+                if sub.stale:
+                    continue
+                if len(sub.queue) >= self.limit:
+                    if self.policy == 'drop':
+                        sub.queue.popleft()
+                        sub.dropped += 1
+                    else:
+                        sub.queue.clear()
+                        sub.stale = True
+                        sub.coalesced += 1
+                if not sub.stale:
+                    sub.queue.append(frame)
+            sub.wake()
+
+    def snapshot(self):
+        match = self.match
+        return {'type': 'spectate_state', 'match': match.match_id, 'board': match.board.to_list(),
+                'key': match.board.key(), 'current': match.current_player, 'game_active': match.game_active,
+                'players': sorted(match.players), 'spectators': len(self.subscribers)}
+
+    def take(self, sub):
+        if sub.stale:
+            with self.match.lock:
+                with sub.lock:
+                    if sub.stale:
+                        sub.stale = False
+                        sub.queue.clear()
+                        sub.queue.append(encode_frame(self.snapshot(), self.binary))
+        with sub.lock:
+            frames = list(sub.queue)
+            sub.queue.clear()
+        sub.sent += len(frames)
+        return frames
+
+    def stats(self):
+        subscribers = self.subscribers
+        return {'spectators': len(subscribers), 'published': self.published,
+                'sent': sum(s.sent for s in subscribers),
+                'dropped': sum(s.dropped for s in subscribers),
+                'coalesced': sum(s.coalesced for s in subscribers)}
+
+
+def serve_spectator(sock, match, running=lambda: True):
+    ready = threading.Event()
+    hub = match.spectators
+    sub = hub.subscribe(sock, ready.set)
+    try:
+        while running() and not sub.closed:
+            ready.wait(1.0)
+            ready.clear()
+            for frame in hub.take(sub):
+                sock.sendall(frame)
+    except OSError:
+        pass
+    finally:
+        hub.unsubscribe(sub)
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+
+def add_spectator_args(parser):
+    parser.add_argument('--spectator-port', type=int, help="accept read-only spectators on this port")
+    parser.add_argument('--spectator-queue', type=int, default=256, help="frames buffered per spectator")
+    parser.add_argument('--spectator-policy', choices=POLICIES, default='coalesce',
+                        help="slow spectators: coalesce to a fresh snapshot, or drop the oldest frames")
+
+
+if __name__ == "__main__":
+    from game import BitBoard
+    parser = argparse.ArgumentParser(description="Watch a match as a read-only spectator")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--match', type=int, help="match id (default: newest)")
+    args = parser.parse_args()
+
+    sock = socket.create_connection((args.host, args.port))
+    sock.sendall(encode_frame({'type': 'spectate', 'match': args.match}))
+    reader = FrameReader()
+    board = BitBoard()
+    while True:
+        msgs = reader.recv(sock)
+        if msgs is None:
+            break
+        for msg in msgs:
+            t = msg.get('type')
+            if t == 'spectate_state':
+                board = BitBoard.from_key(msg['key'])
+                print(f"Match {msg['match']}: {board} current={msg['current']} spectators={msg['spectators']}")
+            elif t == 'game_start':
+                board = BitBoard.from_cells(msg.get('board', []))
+                print("New game")
+            elif t == 'move_made':
+                board.place(msg['position'], msg['symbol'])
+                if 'board' in msg and msg['board'] != board.key():
+                    board = BitBoard.from_key(msg['board'])
+                print(f"{msg['symbol']} -> {msg['position']}{' (modified)' if msg.get('modified') else ''}  {board}")
+            elif t == 'round_over':
+                print(f"Round over: {msg['reason']}")
+            elif t == 'chat_msg':
+                print(f"Chat from {msg['from']} ({msg['method']}): {msg['original']}")
+            elif t == 'spectate_end':
+                print(f"Match ended {msg.get('note', '')}")
+        if any(m.get('type') == 'spectate_end' for m in msgs):
+            break
+    sock.close()
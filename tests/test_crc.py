@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from algorithms import CRC, CRC_PRESETS, BitBuffer, calculate_crc, get_crc, verify_crc
+
+
+def legacy_calculate_crc(data, divisor="1011"):
+    crc_length = len(divisor) - 1
+    dividend = list(data + '0' * crc_length)
+    for i in range(len(data)):
+        if dividend[i] == '1':
+            for j in range(len(divisor)):
+                dividend[i + j] = str(int(dividend[i + j]) ^ int(divisor[j]))
+    return ''.join(dividend[-crc_length:])
+
+
+def legacy_verify_crc(data_with_crc, divisor="1011"):
+    dividend = list(data_with_crc)
+    for i in range(len(data_with_crc) - len(divisor) + 1):
+        if dividend[i] == '1':
+            for j in range(len(divisor)):
+                dividend[i + j] = str(int(dividend[i + j]) ^ int(divisor[j]))
+    remainder = ''.join(dividend[-(len(divisor)-1):])
+    return remainder == '0' * (len(divisor) - 1)
+
+
+def bitwise_crc(crc, data):
+    reg = crc.init
+    top = 1 << (crc.width - 1)
+    for byte in data:
+        if crc.refin:
+            byte = int(format(byte, '08b')[::-1], 2)
+        for k in range(7, -1, -1):
+            bit = (byte >> k) & 1
+            feedback = bool(reg & top) ^ bit
+            reg = (reg << 1) & crc.mask
+            if feedback:
+                reg ^= crc.poly
+    if crc.refout:
+        reg = int(format(reg, f'0{crc.width}b')[::-1], 2)
+    return reg ^ crc.xorout
+
+
+def random_bits(rnd, n):
+    return ''.join(rnd.choice('01') for _ in range(n))
+
+
+DIVISORS = ["1011", "11", "111010101", "10001000000100001", "100000100110000010001110110110111"]
+
+
+@pytest.mark.parametrize('divisor', DIVISORS)
+def test_string_api_matches_legacy_loop(divisor):
+    rnd = random.Random(divisor)
+    for n in list(range(0, 40)) + [63, 64, 65, 200, 517]:
+        data = random_bits(rnd, n)
+        assert calculate_crc(data, divisor) == legacy_calculate_crc(data, divisor)
+        framed = data + legacy_calculate_crc(data, divisor)
+        assert verify_crc(framed, divisor) == legacy_verify_crc(framed, divisor) is True
+        if framed:
+            bad = list(framed)
+            pos = rnd.randrange(len(bad))
+            bad[pos] = '1' if bad[pos] == '0' else '0'
+            bad = ''.join(bad)
+            assert verify_crc(bad, divisor) == legacy_verify_crc(bad, divisor)
+
+
+@pytest.mark.parametrize('divisor', DIVISORS)
+def test_packed_matches_string(divisor):
+    rnd = random.Random(divisor)
+    for n in (1, 7, 8, 9, 31, 64, 129, 1000):
+        data = random_bits(rnd, n)
+        packed = calculate_crc(BitBuffer.from_bits(data), divisor)
+        assert packed.to_bits() == legacy_calculate_crc(data, divisor)
+        assert verify_crc(BitBuffer.from_bits(data) + packed, divisor)
+
+
+@pytest.mark.parametrize('name', sorted(CRC_PRESETS))
+def test_presets_match_bitwise_reference(name):
+    crc = CRC_PRESETS[name]
+    rnd = random.Random(name)
+    for n in (0, 1, 2, 3, 4, 5, 15, 16, 17, 63, 64, 65, 300):
+        data = bytes(rnd.randrange(256) for _ in range(n))
+        assert crc.compute(data) == bitwise_crc(crc, data)
+        assert crc.finish(crc.update(crc.start(), data)) == bitwise_crc(crc, data)
+
+
+@pytest.mark.parametrize('name, check', [('crc8', 0xF4), ('crc16-ccitt', 0x29B1), ('crc16-xmodem', 0x31C3),
+                                         ('crc32', 0xCBF43926)])
+def test_preset_check_values(name, check):
+    assert get_crc(name).compute(b'123456789') == check
+
+
+def test_sliced_update_matches_bytewise():
+    for crc in (CRC(16, 0x1021, init=0xFFFF, slices=2), CRC(32, 0x04C11DB7, slices=4),
+                CRC(32, 0x04C11DB7, init=0xFFFFFFFF, refin=True, xorout=0xFFFFFFFF, slices=4)):
+        plain = CRC(crc.width, crc.poly, crc.init, crc.refin, crc.refout, crc.xorout, slices=1)
+        data = bytes(random.Random(crc.width).randrange(256) for _ in range(1031))
+        assert crc.slices > 1
+        assert crc.compute(data) == plain.compute(data) == bitwise_crc(plain, data)
+
+
+def test_combine():
+    crc = CRC(32, 0x04C11DB7)
+    rnd = random.Random(5)
+    a = bytes(rnd.randrange(256) for _ in range(100))
+    b = bytes(rnd.randrange(256) for _ in range(37))
+    assert crc.combine(crc.compute(a), crc.compute(b), len(b) * 8) == crc.compute(a + b)
+
+
+def test_invalid_divisor():
+    for divisor in ("", "1", "0101", "10a1"):
+        with pytest.raises(ValueError):
+            get_crc(divisor)
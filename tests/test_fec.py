@@ -0,0 +1,97 @@
+import itertools
+import random
+
+import pytest
+
+from algorithms import (RS_BLOCK, RS_NSYM, decode_message, encode_message, hamming72_decode, hamming72_encode,
+                        rs_decode, rs_encode, secded_decode, secded_encode)
+
+
+def flip(code, bits):
+    code = bytearray(code)
+    for bit in bits:
+        code[bit >> 3] ^= 0x80 >> (bit & 7)
+    return bytes(code)
+
+
+def test_secded_corrects_every_single_error():
+    data = bytes(range(0, 256, 17))
+    code = secded_encode(data)
+    for bit in range(len(code) * 8):
+        decoded, corrected, failed = secded_decode(flip(code, [bit]))
+        assert decoded == data
+        assert corrected == [bit // 8] and failed == []
+
+
+def test_secded_detects_every_double_error():
+    code = secded_encode(bytes(range(0, 256, 17)))
+    for index in range(len(code)):
+        for a, b in itertools.combinations(range(8), 2):
+            _, corrected, failed = secded_decode(flip(code, [index * 8 + a, index * 8 + b]))
+            assert failed == [index] and corrected == []
+
+
+@pytest.mark.parametrize('size', [8, 16, 5])
+def test_hamming72_corrects_every_single_error(size):
+    data = bytes(random.Random(size).randrange(256) for _ in range(size))
+    code = hamming72_encode(data)
+    assert len(code) == size + -(-size // 8)
+    for bit in range(len(code) * 8):
+        decoded, corrected, failed = hamming72_decode(flip(code, [bit]))
+        assert decoded == data
+        assert corrected == [bit // 72] and failed == []
+
+
+@pytest.mark.parametrize('size', [8, 3])
+def test_hamming72_detects_every_double_error(size):
+    data = bytes(random.Random(size).randrange(256) for _ in range(size))
+    code = hamming72_encode(data)
+    for a, b in itertools.combinations(range(len(code) * 8), 2):
+        _, corrected, failed = hamming72_decode(flip(code, [a, b]))
+        assert failed == [0] and corrected == []
+
+
+@pytest.mark.parametrize('size', [RS_BLOCK - RS_NSYM, 40, 600])
+def test_rs_corrects_up_to_half_the_parity_symbols(size):
+    rnd = random.Random(size)
+    data = bytes(rnd.randrange(256) for _ in range(size))
+    code = rs_encode(data)
+    blocks = [(i, min(i + RS_BLOCK, len(code))) for i in range(0, len(code), RS_BLOCK)]
+    for errors in range(RS_NSYM // 2 + 1):
+        for trial in range(20):
+            damaged = bytearray(code)
+            for start, end in blocks:
+                for pos in rnd.sample(range(start, end), errors):
+                    damaged[pos] ^= rnd.randrange(1, 256)
+            decoded, corrected, failed = rs_decode(damaged)
+            assert decoded == data and failed == []
+            assert corrected == (list(range(len(blocks))) if errors else [])
+
+
+def test_rs_never_passes_uncorrectable_blocks_silently():
+    rnd = random.Random(9)
+    data = bytes(rnd.randrange(256) for _ in range(100))
+    code = rs_encode(data)
+    for errors in range(RS_NSYM // 2 + 1, RS_NSYM + 1):
+        for trial in range(50):
+            damaged = bytearray(code)
+            for pos in rnd.sample(range(len(code)), errors):
+                damaged[pos] ^= rnd.randrange(1, 256)
+            decoded, corrected, failed = rs_decode(damaged)
+            assert failed == [0] or (corrected == [0] and decoded != data)
+            if failed:
+                assert decoded == bytes(damaged[:-RS_NSYM])
+
+
+@pytest.mark.parametrize('method', ['secded', 'hamming72', 'rs'])
+def test_messages_report_corrections(method):
+    text = 'forward error correction ' * 4
+    encoded = encode_message(text, method, packed=True)['encoded_data']
+    clean = decode_message(encoded, method)
+    assert clean['valid'] and not clean['errors_corrected'] and clean['decoded_text'] == text
+    damaged = encoded.copy()
+    damaged.flip(13)
+    result = decode_message(damaged, method)
+    assert result['valid'] and result['errors_corrected'] and result['decoded_text'] == text
+    truncated = decode_message(encoded[:len(encoded) - 3], method)
+    assert not truncated['valid'] and '5 trailing bits' in truncated['error_details']
@@ -0,0 +1,58 @@
+import random
+
+from algorithms import (BitBuffer, decode_hamming, decode_hamming_batch, decode_message, encode_hamming,
+                        encode_hamming_batch, encode_message)
+
+
+def per_codeword_encode(bits):
+    bits += '0' * (-len(bits) % 4)
+    return ''.join(encode_hamming(bits[i:i + 4]) for i in range(0, len(bits), 4))
+
+
+def test_encode_batch_matches_per_codeword():
+    batch = encode_hamming_batch(range(16))
+    assert list(batch) == [int(encode_hamming(format(n, '04b')), 2) for n in range(16)]
+    for n in range(16):
+        assert encode_hamming(BitBuffer.from_int(n, 4)).to_int() == batch[n]
+
+
+def test_decode_batch_matches_per_codeword():
+    data, syndromes = decode_hamming_batch(range(128))
+    for cw in range(128):
+        nibble, error_pos, corrected = decode_hamming(format(cw, '07b'))
+        assert (data[cw], syndromes[cw]) == (int(nibble, 2), error_pos)
+        packed = decode_hamming(BitBuffer.from_int(cw, 7))
+        assert (packed[0].to_int(), packed[1], packed[2]) == (int(nibble, 2), error_pos, corrected)
+
+
+def test_packed_batch_matches_per_codeword():
+    rnd = random.Random(3)
+    for nbits in (4, 8, 12, 16, 36, 800, 804):
+        bits = ''.join(rnd.choice('01') for _ in range(nbits))
+        encoded = encode_hamming_batch(BitBuffer.from_bits(bits))
+        assert encoded.to_bits() == per_codeword_encode(bits)
+        data, syndromes = decode_hamming_batch(encoded)
+        assert data.to_bits() == bits
+        assert not any(syndromes)
+
+
+def test_batch_corrects_one_flip_per_codeword():
+    rnd = random.Random(4)
+    bits = ''.join(rnd.choice('01') for _ in range(400))
+    encoded = encode_hamming_batch(BitBuffer.from_bits(bits))
+    flipped = encoded.copy()
+    positions = [7 * i + rnd.randrange(7) for i in range(0, len(encoded) // 7, 3)]
+    for pos in positions:
+        flipped.flip(pos)
+    data, syndromes = decode_hamming_batch(flipped)
+    assert data.to_bits() == bits
+    assert [i for i, s in enumerate(syndromes) if s] == [pos // 7 for pos in positions]
+    assert all(syndromes[pos // 7] == pos % 7 + 1 for pos in positions)
+
+
+def test_message_round_trip():
+    text = 'Hamming batch check: éÿ'
+    for packed in (False, True):
+        encoded = encode_message(text, 'hamming', packed=packed)
+        decoded = decode_message(encoded['encoded_data'], 'hamming')
+        assert decoded['decoded_text'] == text and decoded['valid']
@@ -0,0 +1,105 @@
+import random
+
+from algorithms import (MOVE_FRAME_BITS, binary_to_int, calculate_crc, calculate_parity, check_parity, decode_hamming,
+                        decode_move, decode_move_frame, decode_moves, encode_hamming, encode_move, encode_move_frame,
+                        encode_moves, int_to_binary, verify_crc)
+
+
+def legacy_encode_move(position, symbol):
+    pos_binary = int_to_binary(position, 4)
+    hamming = encode_hamming(pos_binary)
+    crc = calculate_crc(hamming)
+    parity = calculate_parity(hamming + crc)
+    return {'position': position, 'symbol': symbol, 'binary': pos_binary, 'hamming': hamming, 'crc': crc,
+            'parity': parity, 'full_data': hamming + crc + parity}
+
+
+def legacy_decode_move(full_data, expected_symbol=None):
+    result = {'valid': True, 'errors': [], 'corrections': [], 'position': None, 'symbol': expected_symbol}
+    if len(full_data) < 11:
+        result['valid'] = False
+        result['errors'].append('Data too short')
+        return result
+    hamming = full_data[:7]
+    crc = full_data[7:10]
+    parity = full_data[10] if len(full_data) > 10 else '0'
+    if not check_parity(hamming + crc + parity):
+        result['errors'].append('Parity check failed')
+    if not verify_crc(hamming + crc):
+        result['errors'].append('CRC check failed')
+    decoded_data, error_pos, was_corrected = decode_hamming(hamming)
+    if was_corrected:
+        result['corrections'].append(f'Hamming corrected bit at position {error_pos}')
+    if decoded_data:
+        result['position'] = binary_to_int(decoded_data)
+        if result['position'] > 8:
+            result['position'] = result['position'] % 9
+    if result['errors'] and not was_corrected:
+        result['valid'] = False
+    return result
+
+
+def status(result):
+    if not result['valid']:
+        return 2
+    return 1 if result['corrections'] else 0
+
+
+def test_encode_moves_matches_encode_move():
+    positions = list(range(16)) * 3
+    data = encode_moves(positions)
+    assert len(data) == 2 * len(positions)
+    for i, position in enumerate(positions):
+        frame = int.from_bytes(data[2 * i:2 * i + 2], 'big')
+        assert frame == encode_move_frame(position) == int(encode_move(position, 'X')['full_data'], 2)
+
+
+def test_decode_moves_matches_decode_move():
+    frames = list(range(1 << MOVE_FRAME_BITS))
+    positions, statuses = decode_moves(b''.join(f.to_bytes(2, 'big') for f in frames))
+    for frame in frames:
+        result = decode_move(format(frame, f'0{MOVE_FRAME_BITS}b'))
+        assert result == decode_move_frame(frame)
+        assert positions[frame] == result['position']
+        assert statuses[frame] == status(result)
+
+
+def test_decode_moves_rejects_high_bits():
+    frames = [encode_move_frame(4), 0x8000 | encode_move_frame(4), encode_move_frame(7), 0xFFFF]
+    positions, statuses = decode_moves(b''.join(f.to_bytes(2, 'big') for f in frames))
+    assert list(statuses) == [0, 2, 0, 2]
+    assert positions[0] == 4 and positions[2] == 7
+
+
+def test_moves_round_trip_with_single_flips():
+    rnd = random.Random(17)
+    positions = [rnd.randrange(9) for _ in range(500)]
+    data = bytearray(encode_moves(positions))
+    for i in range(len(positions)):
+        bit = rnd.randrange(MOVE_FRAME_BITS)
+        data[2 * i + (0 if bit < MOVE_FRAME_BITS - 8 else 1)] ^= 1 << (MOVE_FRAME_BITS - 1 - bit) % 8
+    decoded, statuses = decode_moves(bytes(data))
+    assert list(decoded) == positions
+    for i, code in enumerate(statuses):
+        assert code == status(decode_move_frame(bytes(data[2 * i:2 * i + 2])))
+    assert decode_moves(b'') == (b'', b'')
+
+
+def test_encode_table_matches_legacy():
+    for position in range(16):
+        for symbol in ('X', 'O'):
+            assert encode_move(position, symbol) == legacy_encode_move(position, symbol)
+    assert encode_move(20, 'X') == legacy_encode_move(20, 'X')
+    entry = encode_move(3, 'X')
+    entry['position'] = 99
+    assert encode_move(3, 'X')['position'] == 3
+
+
+def test_decode_table_matches_legacy():
+    for frame in range(1 << MOVE_FRAME_BITS):
+        bits = format(frame, f'0{MOVE_FRAME_BITS}b')
+        for symbol in (None, 'X', 'O'):
+            assert decode_move(bits, symbol) == legacy_decode_move(bits, symbol)
+        assert decode_move(bits + '0110') == legacy_decode_move(bits + '0110')
+    for short in ('', '1', '0101010101'):
+        assert decode_move(short, 'O') == legacy_decode_move(short, 'O')
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from algorithms import (STREAM_METHODS, BitBuffer, StreamDecoder, StreamEncoder, decode_message, decode_stream,
+                        encode_message, encode_stream, flip_bits)
+
+TEXTS = ['H', 'Hi', 'stream me', 'x' * 1000, 'y' * 600, ''.join(chr(i) for i in range(256)), 'non-latin ✓ text']
+
+
+def random_cuts(rnd, n, pieces):
+    return [0] + sorted(rnd.randrange(n + 1) for _ in range(pieces)) + [n]
+
+
+def compare_results(ref, got):
+    for key, value in ref.items():
+        assert got[key] == value, key
+
+
+@pytest.mark.parametrize('method', STREAM_METHODS)
+def test_chunked_encoding_matches_encode_message(method):
+    rnd = random.Random(method)
+    for text in TEXTS:
+        expected = encode_message(text, method, packed=True)
+        for pieces in (0, 1, 3, 17):
+            cuts = random_cuts(rnd, len(text), pieces)
+            encoder = StreamEncoder(method)
+            out = BitBuffer()
+            for a, b in zip(cuts, cuts[1:]):
+                out += encoder.update(text[a:b])
+            out += encoder.finalize()
+            assert out == expected['encoded_data']
+            assert encoder.control_info == expected['control_info']
+
+
+@pytest.mark.parametrize('method', STREAM_METHODS)
+def test_unaligned_bit_chunks(method):
+    rnd = random.Random(method)
+    binary = BitBuffer.from_text('unaligned chunks')
+    expected = encode_message('unaligned chunks', method, packed=True)['encoded_data']
+    cuts = random_cuts(rnd, binary.nbits, 9)
+    encoder = StreamEncoder(method)
+    out = BitBuffer()
+    for a, b in zip(cuts, cuts[1:]):
+        out += encoder.update(binary[a:b])
+    assert out + encoder.finalize() == expected
+
+
+@pytest.mark.parametrize('method', STREAM_METHODS)
+def test_decoder_matches_decode_message(method):
+    rnd = random.Random(method)
+    for trial in range(300):
+        text = ''.join(chr(rnd.randrange(256)) for _ in range(rnd.randrange(1, 600 if method == 'rs' else 60)))
+        encoded = encode_message(text, method)['encoded_data']
+        if trial % 3 == 1:
+            encoded = flip_bits(encoded, [rnd.randrange(len(encoded)) for _ in range(rnd.randrange(1, 4))])
+        elif trial % 3 == 2:
+            cut = rnd.randrange(len(encoded))
+            encoded = encoded[:cut] + encoded[cut + 1:]
+        ref = decode_message(encoded, method)
+        cuts = random_cuts(rnd, len(encoded), rnd.randrange(6))
+        decoder = StreamDecoder(method)
+        parts = [decoder.update(encoded[a:b]) for a, b in zip(cuts, cuts[1:])]
+        parts.append(decoder.finalize())
+        compare_results(ref, dict(decoder.result, decoded_text=b''.join(parts).decode('latin-1')))
+        assert decode_stream(encoded, method, chunk=rnd.choice([1, 3, 64])) == ref
+
+
+@pytest.mark.parametrize('method', STREAM_METHODS)
+def test_stream_round_trip(method):
+    for text in TEXTS:
+        for packed in (False, True):
+            encoded = encode_stream(text, method, packed, chunk=7)
+            assert encoded['encoded_data'] == encode_message(text, method, packed)['encoded_data']
+            result = decode_stream(encoded['encoded_data'], method, chunk=5)
+            assert result == decode_message(encoded['encoded_data'], method)
+            assert result['valid'] and (result['decoded_text'] == text or max(text) > '\xff')
+
+
+def test_stream_falls_back_for_block_framing():
+    for method, block_size in (('crc', 2), ('checksum', 3)):
+        encoded = encode_stream('fallback', method, block_size=block_size)
+        assert encoded == encode_message('fallback', method, block_size=block_size)
+        assert decode_stream(encoded['encoded_data'], method, block_size) == \
+            decode_message(encoded['encoded_data'], method, block_size)
+
+
+def test_misuse():
+    with pytest.raises(ValueError):
+        StreamEncoder('bogus')
+    encoder = StreamEncoder('crc')
+    encoder.finalize()
+    with pytest.raises(ValueError):
+        encoder.update('late')
+    decoder = StreamDecoder('crc')
+    decoder.finalize()
+    with pytest.raises(ValueError):
+        decoder.finalize()